@@ -1,6 +1,7 @@
 """
 Flask Application Factory
 """
+import click
 from flask import Flask, session, current_app
 from datetime import datetime
 from flask_cors import CORS
@@ -21,6 +22,10 @@ def create_app():
         }
     })
     
+    # gzip/Brotli for JSON and text responses
+    from app.compression import init_compression
+    init_compression(app)
+
     # Initialize database connection
     from app.database import init_db
     init_db()
@@ -38,6 +43,8 @@ def create_app():
     from app.routes.admin import admin_bp
     from app.routes.user import user_bp
     from app.routes.compare import compare_bp
+    from app.routes.analytics import analytics_bp
+    from app.routes.seasons import seasons_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(constructors_bp)
@@ -46,6 +53,51 @@ def create_app():
     app.register_blueprint(admin_bp)
     app.register_blueprint(user_bp)
     app.register_blueprint(compare_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(seasons_bp)
+
+    # Admin table metadata (pg_catalog); falls back to loading on first admin request
+    from app.admin_utils import init_schema_cache
+    try:
+        init_schema_cache()
+    except Exception as e:
+        print(f"✗ Could not preload schema metadata: {e}")
+
+    # NumPy analytics engine (ANALYTICS_ENGINE_ENABLED); routes fall back to SQL when it is off
+    from app.analytics_engine import init_analytics_engine
+    try:
+        if init_analytics_engine():
+            print("✓ Analytics engine loaded")
+    except Exception as e:
+        print(f"✗ Could not load analytics engine: {e}")
+
+    @app.cli.command('warm-circuit-cache')
+    def warm_circuit_cache():
+        """Prebuild /api/circuits/<id> snapshots (run at deploy)"""
+        from app.snapshot_utils import warm_circuit_snapshots
+        rebuilt, total = warm_circuit_snapshots()
+        print(f"✓ Circuit snapshots ready: {rebuilt} rebuilt, {total - rebuilt} already cached")
+
+    @app.cli.command('process-deletion-jobs')
+    def process_deletion_jobs():
+        """Run queued background deletions until the queue is empty"""
+        from app.deletion_jobs import run_worker
+        run_worker(stop_when_idle=True)
+        print("✓ Deletion queue drained")
+
+    @app.cli.command('recompute-standings')
+    @click.argument('year', type=int)
+    def recompute_standings(year):
+        """Rebuild the standings of a season's user races"""
+        from app.database import DatabaseConnection
+        from app.standings_engine import recompute_season
+        db = DatabaseConnection()
+        try:
+            written = recompute_season(db, year)
+            db.commit()
+        finally:
+            db.close()
+        print(f"✓ Standings for {year} rebuilt ({written} rows)")
 
     @app.before_request
     def enforce_session_timeout():
@@ -70,28 +122,18 @@ def create_app():
     @app.context_processor
     def inject_user_context():
         """Provide auth info to all templates by default"""
-        from app.admin_utils import is_admin as check_admin
-        current_is_admin = session.get('is_admin')
-        if session.get('user_id'):
-            refresh_needed = current_is_admin is None
-            if not refresh_needed and not current_is_admin:
-                refresh_needed = True
-            if refresh_needed:
-                refreshed = check_admin(session['user_id'])
-                if refreshed:
-                    session['is_admin'] = bool(refreshed)
-                    current_is_admin = session['is_admin']
-            current_app.logger.debug(
-                "Context inject: user=%s, session_admin=%s, refresh_needed=%s",
-                session.get('username'),
-                current_is_admin,
-                refresh_needed
-            )
+        from app.admin_utils import session_is_admin
+        current_is_admin = session_is_admin()
+        current_app.logger.debug(
+            "Context inject: user=%s, session_admin=%s",
+            session.get('username'),
+            current_is_admin
+        )
         return {
             'authenticated': 'username' in session,
             'current_username': session.get('username'),
             'current_email': session.get('email'),
-            'is_admin': current_is_admin or False
+            'is_admin': current_is_admin
         }
 
     return app
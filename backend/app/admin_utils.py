@@ -1,9 +1,12 @@
 """
 Admin utility functions and decorators
 """
+import threading
+import time
 from functools import wraps
-from flask import session, redirect, url_for, flash
+from flask import session, redirect, url_for, flash, current_app
 from app.database import DatabaseConnection
+from app.cache_utils import TTLCache
 
 def is_admin(user_id):
     """
@@ -43,13 +46,202 @@ def require_admin(f):
             flash('Please login to access this page.')
             return redirect(url_for('auth.login'))
         
-        if not session.get('is_admin', False):
+        if not session_is_admin():
             flash('Access denied. Admin privileges required.')
             return redirect(url_for('auth.index'))
         
         return f(*args, **kwargs)
     return decorated_function
 
+# ============================================
+# Session role cache
+# ============================================
+# The session cookie (signed with SECRET_KEY) carries the admin flag together with
+# the role version it was read at and an expiry, so page renders never query the
+# user table. Admin writes to "user" bump the version, which makes every cached
+# role in this process re-read on its next request; other workers pick the change
+# up once the entry expires (ROLE_CACHE_TTL_SECONDS).
+
+_role_version = 0
+_role_version_lock = threading.Lock()
+
+
+def bump_role_version():
+    """Invalidate every cached session role (call after changing "user".is_admin)"""
+    global _role_version
+    with _role_version_lock:
+        _role_version += 1
+
+
+def cache_session_role(admin_flag):
+    """Store a freshly read admin flag in the session"""
+    ttl = current_app.config.get('ROLE_CACHE_TTL_SECONDS', 60)
+    session['is_admin'] = bool(admin_flag)
+    session['role_cache'] = {'version': _role_version, 'expires_at': time.time() + ttl}
+
+
+def session_is_admin():
+    """
+    Admin flag for the logged-in user, from the session unless stale
+
+    Returns:
+        bool: True if the current user is an admin
+    """
+    if 'user_id' not in session:
+        return False
+    cached = session.get('role_cache')
+    if (cached and 'is_admin' in session
+            and cached.get('version') == _role_version
+            and cached.get('expires_at', 0) > time.time()):
+        return session['is_admin']
+    cache_session_role(is_admin(session['user_id']))
+    return session['is_admin']
+
+# ============================================
+# Schema metadata cache
+# ============================================
+# Built once from pg_catalog (at startup, or on first use) and shared by every
+# admin route. Call invalidate_schema_cache() after a migration.
+
+# Preferred columns for labelling rows in FK dropdowns, in order
+DISPLAY_COLUMN_CANDIDATES = ('name', 'full_name', 'official_name', 'username')
+
+_schema_cache = None
+_schema_lock = threading.Lock()
+
+_COLUMNS_QUERY = """
+    SELECT
+        cl.relname AS table_name,
+        a.attname AS column_name,
+        format_type(a.atttypid, NULL) AS data_type,
+        NOT a.attnotnull AS nullable,
+        pg_get_expr(ad.adbin, ad.adrelid) AS column_default
+    FROM pg_class cl
+    JOIN pg_namespace n ON n.oid = cl.relnamespace
+    JOIN pg_attribute a ON a.attrelid = cl.oid AND a.attnum > 0 AND NOT a.attisdropped
+    LEFT JOIN pg_attrdef ad ON ad.adrelid = cl.oid AND ad.adnum = a.attnum
+    WHERE cl.relkind IN ('r', 'p')
+        AND n.nspname = current_schema()
+    ORDER BY cl.relname, a.attnum
+"""
+
+_CONSTRAINTS_QUERY = """
+    SELECT
+        con.contype,
+        cl.relname AS table_name,
+        a.attname AS column_name,
+        fcl.relname AS foreign_table_name,
+        fa.attname AS foreign_column_name
+    FROM pg_constraint con
+    JOIN pg_class cl ON cl.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = cl.relnamespace
+    CROSS JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+    LEFT JOIN pg_class fcl ON fcl.oid = con.confrelid
+    LEFT JOIN pg_attribute fa ON fa.attrelid = con.confrelid AND fa.attnum = con.confkey[k.ord]
+    WHERE con.contype IN ('p', 'f')
+        AND n.nspname = current_schema()
+    ORDER BY cl.relname, con.conname, k.ord
+"""
+
+# Leading column of every index: the columns the admin browser may sort and filter on
+_INDEXED_COLUMNS_QUERY = """
+    SELECT DISTINCT
+        cl.relname AS table_name,
+        a.attname AS column_name
+    FROM pg_index i
+    JOIN pg_class cl ON cl.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = cl.relnamespace
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+    WHERE n.nspname = current_schema()
+"""
+
+
+def load_schema_metadata():
+    """
+    Read columns, primary keys and foreign keys of every table from pg_catalog
+    
+    Returns:
+        dict: table name -> {'columns', 'primary_key', 'foreign_keys', 'indexed_columns', 'display_column'}
+    """
+    db = DatabaseConnection()
+    try:
+        db.execute(_COLUMNS_QUERY)
+        tables = {}
+        for row in db.fetchall():
+            table = tables.setdefault(row['table_name'], {
+                'columns': [],
+                'primary_key': [],
+                'foreign_keys': {},
+                'indexed_columns': [],
+                'display_column': 'id'
+            })
+            table['columns'].append({
+                'name': row['column_name'],
+                'type': row['data_type'],
+                'nullable': row['nullable'],
+                'default': row['column_default']
+            })
+
+        db.execute(_CONSTRAINTS_QUERY)
+        for row in db.fetchall():
+            table = tables.get(row['table_name'])
+            if table is None:
+                continue
+            if row['contype'] == 'p':
+                table['primary_key'].append(row['column_name'])
+            else:
+                table['foreign_keys'][row['column_name']] = {
+                    'table': row['foreign_table_name'],
+                    'column': row['foreign_column_name']
+                }
+
+        db.execute(_INDEXED_COLUMNS_QUERY)
+        for row in db.fetchall():
+            table = tables.get(row['table_name'])
+            if table is not None:
+                table['indexed_columns'].append(row['column_name'])
+        db.conn.rollback()
+
+        for table in tables.values():
+            names = {c['name'] for c in table['columns']}
+            table['display_column'] = next(
+                (c for c in DISPLAY_COLUMN_CANDIDATES if c in names), 'id'
+            )
+        return tables
+    finally:
+        db.close()
+
+
+def init_schema_cache():
+    """Build the schema metadata cache (called at startup)"""
+    global _schema_cache
+    metadata = load_schema_metadata()
+    with _schema_lock:
+        _schema_cache = metadata
+    return metadata
+
+
+def invalidate_schema_cache():
+    """Drop cached metadata; the next lookup reloads it from pg_catalog"""
+    global _schema_cache
+    with _schema_lock:
+        _schema_cache = None
+
+
+def get_schema_metadata(table_name):
+    """
+    Get cached metadata for a table
+    
+    Returns:
+        dict: {'columns', 'primary_key', 'foreign_keys', 'indexed_columns', 'display_column'} or None
+    """
+    metadata = _schema_cache
+    if metadata is None:
+        metadata = init_schema_cache()
+    return metadata.get(table_name)
+
+
 def get_table_schema(table_name):
     """
     Get schema information for a table
@@ -60,37 +252,12 @@ def get_table_schema(table_name):
     Returns:
         list: List of column information dictionaries
     """
-    db = DatabaseConnection()
     try:
-        # Get column information
-        query = """
-            SELECT 
-                column_name,
-                data_type,
-                is_nullable,
-                column_default
-            FROM information_schema.columns
-            WHERE table_name = %s
-            ORDER BY ordinal_position
-        """
-        db.execute(query, (table_name,))
-        columns = db.fetchall()
-        
-        # Convert to list of dicts
-        result = []
-        for col in columns:
-            result.append({
-                'name': col['column_name'],
-                'type': col['data_type'],
-                'nullable': col['is_nullable'] == 'YES',
-                'default': col['column_default']
-            })
-        return result
+        metadata = get_schema_metadata(table_name)
+        return metadata['columns'] if metadata else []
     except Exception as e:
         print(f"Error getting table schema: {e}")
         return []
-    finally:
-        db.close()
 
 def get_foreign_keys(table_name):
     """
@@ -102,110 +269,193 @@ def get_foreign_keys(table_name):
     Returns:
         dict: Dictionary mapping column names to referenced tables
     """
-    db = DatabaseConnection()
     try:
-        query = """
-            SELECT
-                kcu.column_name,
-                ccu.table_name AS foreign_table_name,
-                ccu.column_name AS foreign_column_name
-            FROM information_schema.table_constraints AS tc
-            JOIN information_schema.key_column_usage AS kcu
-                ON tc.constraint_name = kcu.constraint_name
-            JOIN information_schema.constraint_column_usage AS ccu
-                ON ccu.constraint_name = tc.constraint_name
-            WHERE tc.constraint_type = 'FOREIGN KEY'
-                AND tc.table_name = %s
-        """
-        db.execute(query, (table_name,))
-        fks = db.fetchall()
-        
-        result = {}
-        for fk in fks:
-            result[fk['column_name']] = {
-                'table': fk['foreign_table_name'],
-                'column': fk['foreign_column_name']
-            }
-        return result
+        metadata = get_schema_metadata(table_name)
+        return metadata['foreign_keys'] if metadata else {}
     except Exception as e:
         print(f"Error getting foreign keys: {e}")
         return {}
-    finally:
-        db.close()
 
-def get_table_data(table_name, limit=100, offset=0, id_column='id'):
+def get_display_column(table_name):
+    """Column used to label rows of `table_name` in FK dropdowns"""
+    try:
+        metadata = get_schema_metadata(table_name)
+        return metadata['display_column'] if metadata else 'id'
+    except Exception:
+        return 'id'
+
+def get_table_page(table_name, columns, id_column='id', sort_column=None, descending=False,
+                   filter_column=None, filter_value=None, after=None, before=None, limit=50):
     """
-    Get data from a table with pagination
+    Get one page of a table using keyset navigation on (sort_column, id_column)
+    
+    Cost depends on the page size, not on how deep the page is. Callers must
+    only pass column names taken from the cached schema metadata.
     
     Args:
         table_name: Name of the table
-        limit: Maximum number of records to return
-        offset: Number of records to skip
-        id_column: Column to use for ordering (default: 'id')
+        columns: Columns to select (must include id_column and sort_column)
+        id_column: Unique column used as the tie-breaker
+        sort_column: Indexed NOT NULL column to order by (default: id_column)
+        descending: Sort direction
+        filter_column / filter_value: Optional equality filter on an indexed column
+        after: (sort_value, id) of the last row on the previous page
+        before: (sort_value, id) of the first row on the next page
+        limit: Page size
         
     Returns:
-        tuple: (records, total_count)
+        tuple: (records, has_previous, has_next)
     """
+    sort_column = sort_column or id_column
+    column_list = ', '.join(f'"{c}"' for c in columns)
+    where = []
+    params = []
+
+    if filter_column and filter_value not in (None, ''):
+        where.append(f'"{filter_column}" = %s')
+        params.append(filter_value)
+
+    # Walking backwards (Previous) flips the comparison and the order, then the page is reversed
+    backwards = before is not None
+    cursor = before if backwards else after
+    forward_op = '<' if descending else '>'
+    op = {'>': '<', '<': '>'}[forward_op] if backwards else forward_op
+    order = 'DESC' if descending != backwards else 'ASC'
+
+    if cursor is not None:
+        sort_value, id_value = cursor
+        if sort_column == id_column:
+            where.append(f'"{id_column}" {op} %s')
+            params.append(id_value)
+        else:
+            # The first conjunct lets the planner use the index on sort_column
+            where.append(
+                f'"{sort_column}" {op}= %s AND ("{sort_column}" {op} %s OR "{id_column}" {op} %s)'
+            )
+            params.extend([sort_value, sort_value, id_value])
+
+    order_by = f'"{id_column}" {order}' if sort_column == id_column else f'"{sort_column}" {order}, "{id_column}" {order}'
+    query = f'SELECT {column_list} FROM "{table_name}"'
+    if where:
+        query += ' WHERE ' + ' AND '.join(where)
+    query += f' ORDER BY {order_by} LIMIT %s'
+    params.append(limit + 1)
+
     db = DatabaseConnection()
     try:
-        # Get total count
-        count_query = f'SELECT COUNT(*) FROM "{table_name}"'
-        db.execute(count_query)
-        count_result = db.fetchone()
-        total_count = count_result[0] if count_result else 0
-        
-        # Get records - try to order by id_column, fallback to first column if it doesn't exist
-        try:
-            query = f'SELECT * FROM "{table_name}" ORDER BY "{id_column}" LIMIT %s OFFSET %s'
-            db.execute(query, (limit, offset))
-        except:
-            # Fallback: order by first column
-            query = f'SELECT * FROM "{table_name}" LIMIT %s OFFSET %s'
-            db.execute(query, (limit, offset))
-        
+        db.execute(query, tuple(params))
         records = db.fetchall()
-        
-        return records, total_count
+        db.conn.rollback()
     except Exception as e:
         print(f"Error getting table data: {e}")
-        return [], 0
+        return [], False, False
     finally:
         db.close()
 
-def get_referenced_table_options(table_name, display_column='name'):
+    has_more = len(records) > limit
+    records = records[:limit]
+    if backwards:
+        records.reverse()
+        return records, has_more, True
+    return records, cursor is not None, has_more
+
+def estimate_row_count(table_name, filter_column=None, filter_value=None):
     """
-    Get options for a foreign key dropdown
+    Planner row estimate for the (optionally filtered) table, instead of an exact COUNT(*)
     
-    Args:
-        table_name: Name of the referenced table
-        display_column: Column to display in dropdown (default: 'name')
-        
     Returns:
-        list: List of (id, display_value) tuples
+        int: Estimated number of rows
     """
+    query = f'EXPLAIN (FORMAT JSON) SELECT 1 FROM "{table_name}"'
+    params = None
+    if filter_column and filter_value not in (None, ''):
+        query += f' WHERE "{filter_column}" = %s'
+        params = (filter_value,)
+
     db = DatabaseConnection()
     try:
-        # Try to get id and display column
-        query = f'SELECT id, {display_column} FROM "{table_name}" ORDER BY {display_column}'
-        db.execute(query)
-        options = db.fetchall()
-        
-        result = []
-        for opt in options:
-            result.append({
-                'id': opt['id'],
-                'display': opt.get(display_column, opt['id'])
-            })
-        return result
-    except Exception:
-        # Fallback to just id
-        try:
-            query = f'SELECT id FROM "{table_name}" ORDER BY id'
-            db.execute(query)
-            options = db.fetchall()
-            return [{'id': opt['id'], 'display': opt['id']} for opt in options]
-        except Exception:
-            return []
+        db.execute(query, params)
+        plan = db.fetchone()[0]
+        db.conn.rollback()
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        print(f"Error estimating row count: {e}")
+        return 0
     finally:
         db.close()
 
+# ============================================
+# Foreign key options
+# ============================================
+# Each referenced table is loaded once as (id, display) tuples sorted by display
+# and searched in memory; admin writes to a table drop its entry.
+
+fk_option_cache = TTLCache(ttl_seconds=300, max_entries=32)
+
+
+class _OptionIndex:
+    """Sorted (id, display) tuples of one table plus an id -> position lookup"""
+
+    def __init__(self, options):
+        self.options = options
+        self.positions = {option_id: i for i, (option_id, _) in enumerate(options)}
+        self.search_keys = [f"{display} {option_id}".lower() for option_id, display in options]
+
+
+def _load_option_index(table_name):
+    display_column = get_display_column(table_name)
+    db = DatabaseConnection()
+    try:
+        db.execute(f'SELECT id, "{display_column}" AS display FROM "{table_name}" ORDER BY 2, 1')
+        options = [(str(row['id']), str(row['display'] if row['display'] is not None else row['id']))
+                   for row in db.fetchall()]
+        db.conn.rollback()
+        return _OptionIndex(options)
+    finally:
+        db.close()
+
+
+def _option_index(table_name):
+    return fk_option_cache.get_or_load(table_name, lambda: _load_option_index(table_name))
+
+
+def search_referenced_options(table_name, q=None, after=None, limit=25):
+    """
+    Get one page of options for a foreign key dropdown
+    
+    Args:
+        table_name: Name of the referenced table
+        q: Case-insensitive substring to match against the display value or id
+        after: Id of the last option on the previous page
+        limit: Page size
+        
+    Returns:
+        tuple: (list of {'id', 'display'} dicts, id to pass as `after` for the next page or None)
+    """
+    index = _option_index(table_name)
+    start = index.positions.get(str(after), -1) + 1 if after else 0
+    needle = (q or '').strip().lower()
+
+    page = []
+    for position in range(start, len(index.options)):
+        if needle and needle not in index.search_keys[position]:
+            continue
+        if len(page) == limit:
+            return page, page[-1]['id']
+        option_id, display = index.options[position]
+        page.append({'id': option_id, 'display': display})
+    return page, None
+
+
+def get_option_label(table_name, option_id):
+    """Display value for one referenced row (used to pre-select the current value)"""
+    if option_id is None:
+        return None
+    index = _option_index(table_name)
+    position = index.positions.get(str(option_id))
+    return index.options[position][1] if position is not None else str(option_id)
+
+
+def invalidate_referenced_options(table_name):
+    """Drop cached options after a write to `table_name`"""
+    fk_option_cache.invalidate(table_name)
@@ -0,0 +1,538 @@
+"""
+In-process columnar analytics over race results and standings (NumPy, off by default)
+
+With ANALYTICS_ENGINE_ENABLED set, `init_analytics_engine()` loads the deduplicated
+race_data rows, both standings tables and the race calendar into NumPy arrays at
+startup. Driver, constructor and circuit ids become categorical codes assigned in
+sorted id order, races are sorted by (year, round), and result and standings rows
+are grouped by race. A year range is then one contiguous slice found with two
+binary searches. Points are stored as integer hundredths so that sums are exact.
+
+Write endpoints call `notify_change()`. The loaded snapshot is ignored from then
+on and a replacement is built in a background thread. Until it lands, and when
+the snapshot is older than ANALYTICS_ENGINE_MAX_AGE_SECONDS (which covers writes
+made by other processes), `get_snapshot()` returns None and routes use their SQL
+path. Each query method returns rows with the same keys and value types as its
+query file, so both paths produce the same JSON.
+"""
+import threading
+import time
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+from app.config import Config
+from app.database import DatabaseConnection
+
+# Tables whose writes change what the engine serves
+ANALYTICS_TABLES = {
+    'race', 'race_data', 'driver', 'constructor',
+    'race_driver_standing', 'race_constructor_standing',
+}
+RELOAD_RETRY_SECONDS = 30
+
+_RACES_SQL = """
+    SELECT id, year, round, circuit_id, COALESCE(is_real, FALSE)
+    FROM race
+    WHERE deleted_at IS NULL
+    ORDER BY year, round
+"""
+_DRIVERS_SQL = """
+    SELECT id, name, full_name, COALESCE(is_real, FALSE)
+    FROM driver
+    WHERE deleted_at IS NULL
+"""
+_CONSTRUCTORS_SQL = """
+    SELECT id, name
+    FROM constructor
+    WHERE deleted_at IS NULL
+"""
+# One row per (race, driver), picked like driver_leaderboard.sql's rd_dedup
+_RESULTS_SQL = """
+    WITH rd_dedup AS (
+        SELECT DISTINCT ON (race_id, driver_id) *
+        FROM race_data
+        ORDER BY race_id, driver_id, is_real DESC, created_at DESC, id DESC
+    )
+    SELECT rd.race_id, rd.driver_id, rd.constructor_id, rd.position_display_order,
+           COALESCE((rd.race_points * 100)::BIGINT, 0), rd.race_points IS NOT NULL,
+           COALESCE(rd.race_pole_position, FALSE), COALESCE(rd.is_real, FALSE)
+    FROM rd_dedup rd
+    JOIN race r        ON r.id = rd.race_id        AND r.deleted_at IS NULL
+    JOIN driver d      ON d.id = rd.driver_id      AND d.deleted_at IS NULL
+    JOIN constructor c ON c.id = rd.constructor_id AND c.deleted_at IS NULL
+"""
+_DRIVER_STANDINGS_SQL = """
+    SELECT s.race_id, s.driver_id, s.position_number, (s.points * 100)::BIGINT
+    FROM race_driver_standing s
+    JOIN race r   ON r.id = s.race_id   AND r.deleted_at IS NULL
+    JOIN driver d ON d.id = s.driver_id AND d.deleted_at IS NULL
+"""
+_CONSTRUCTOR_STANDINGS_SQL = """
+    SELECT s.race_id, s.constructor_id, s.position_number, (s.points * 100)::BIGINT
+    FROM race_constructor_standing s
+    JOIN race r        ON r.id = s.race_id        AND r.deleted_at IS NULL
+    JOIN constructor c ON c.id = s.constructor_id AND c.deleted_at IS NULL
+"""
+
+
+def _fetch(conn, sql):
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+
+def _column(rows, index, dtype):
+    return np.fromiter((row[index] for row in rows), dtype=dtype, count=len(rows))
+
+
+def _codes(rows, index, positions):
+    """Categorical codes for column `index` of `rows`"""
+    return np.fromiter((positions[row[index]] for row in rows), dtype=np.int32, count=len(rows))
+
+
+def _offsets(sorted_groups, group_count):
+    """Start offset of every group in an array sorted by group (group_count + 1 entries)"""
+    return np.searchsorted(sorted_groups, np.arange(group_count + 1))
+
+
+def _group_index(groups, group_count):
+    """(row order, offsets) listing the rows of each group, original order kept within a group"""
+    order = np.argsort(groups, kind='stable')
+    return order, _offsets(groups[order], group_count)
+
+
+def _first_per_group(sorted_groups):
+    """Mask of the first row of each run in an array sorted by group"""
+    first = np.ones(sorted_groups.size, dtype=bool)
+    first[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    return first
+
+
+def _sum_cents(groups, cents, size):
+    return np.rint(np.bincount(groups, weights=cents, minlength=size)).astype(np.int64)
+
+
+def _points(cents):
+    """Integer hundredths -> Decimal with two places, as NUMERIC(8,2) sums come back"""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+class _Standings:
+    """One standings table grouped by race (entity codes, positions, points)"""
+
+    def __init__(self, rows, race_positions, entity_positions, race_count):
+        rows = [row for row in rows if row[0] in race_positions]
+        race = _codes(rows, 0, race_positions)
+        order = np.argsort(race, kind='stable')
+        self.race = race[order]
+        self.entity = _codes(rows, 1, entity_positions)[order]
+        # position_number is nullable (excluded entries); 0 stands for NULL
+        self.position = np.fromiter((row[2] or 0 for row in rows), dtype=np.int32, count=len(rows))[order]
+        self.points = _column(rows, 3, np.int64)[order]
+        self.race_starts = _offsets(self.race, race_count)
+
+
+class AnalyticsSnapshot:
+    """Immutable column arrays for one load of the tables"""
+
+    def __init__(self, conn, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+        races = _fetch(conn, _RACES_SQL)
+        drivers = sorted(_fetch(conn, _DRIVERS_SQL))
+        constructors = sorted(_fetch(conn, _CONSTRUCTORS_SQL))
+
+        # Dictionaries: code -> id / display values
+        self.driver_ids = [row[0] for row in drivers]
+        self.driver_names = [row[1] for row in drivers]
+        self.driver_full_names = [row[2] for row in drivers]
+        self.driver_is_real = _column(drivers, 3, bool)
+        self.driver_positions = {driver_id: code for code, driver_id in enumerate(self.driver_ids)}
+        # Rank of each driver's full_name, for name-ordered output
+        name_order = sorted(range(len(drivers)), key=lambda code: self.driver_full_names[code])
+        self.driver_name_rank = np.empty(len(drivers), dtype=np.int32)
+        self.driver_name_rank[name_order] = np.arange(len(drivers), dtype=np.int32)
+
+        self.constructor_ids = [row[0] for row in constructors]
+        self.constructor_names = [row[1] for row in constructors]
+        self.constructor_positions = {cid: code for code, cid in enumerate(self.constructor_ids)}
+
+        self.circuit_ids = sorted({row[3] for row in races})
+        self.circuit_positions = {cid: code for code, cid in enumerate(self.circuit_ids)}
+
+        # Calendar, sorted by (year, round)
+        self.race_ids = _column(races, 0, np.int64)
+        self.race_year = _column(races, 1, np.int32)
+        self.race_round = _column(races, 2, np.int32)
+        self.race_circuit = _codes(races, 3, self.circuit_positions)
+        self.race_is_real = _column(races, 4, bool)
+        race_positions = {race_id: index for index, race_id in enumerate(self.race_ids.tolist())}
+        race_count = len(races)
+
+        # Results, sorted by race then finishing order
+        results = [row for row in _fetch(conn, _RESULTS_SQL) if row[0] in race_positions]
+        race = _codes(results, 0, race_positions)
+        position = _column(results, 3, np.int32)
+        order = np.lexsort((position, race))
+        self.res_race = race[order]
+        self.res_driver = _codes(results, 1, self.driver_positions)[order]
+        self.res_constructor = _codes(results, 2, self.constructor_positions)[order]
+        self.res_position = position[order]
+        self.res_points = _column(results, 4, np.int64)[order]
+        self.res_has_points = _column(results, 5, bool)[order]
+        self.res_pole = _column(results, 6, bool)[order]
+        self.res_is_real = _column(results, 7, bool)[order]
+        self.result_starts = _offsets(self.res_race, race_count)
+
+        # Secondary indexes over the results
+        self.circuit_order, self.circuit_starts = _group_index(
+            self.race_circuit[self.res_race], len(self.circuit_ids)
+        )
+        self.driver_order, self.driver_starts = _group_index(self.res_driver, len(self.driver_ids))
+
+        self.driver_standings = _Standings(
+            _fetch(conn, _DRIVER_STANDINGS_SQL), race_positions, self.driver_positions, race_count
+        )
+        self.constructor_standings = _Standings(
+            _fetch(conn, _CONSTRUCTOR_STANDINGS_SQL), race_positions, self.constructor_positions, race_count
+        )
+
+    def _race_range(self, year_from, year_to):
+        """[first, last) race indexes for an inclusive year range (None = open)"""
+        first = 0 if year_from is None else int(np.searchsorted(self.race_year, year_from, 'left'))
+        last = len(self.race_ids) if year_to is None else int(np.searchsorted(self.race_year, year_to, 'right'))
+        return first, max(first, last)
+
+    def _result_slice(self, year_from, year_to):
+        first, last = self._race_range(year_from, year_to)
+        return slice(int(self.result_starts[first]), int(self.result_starts[last]))
+
+    def year_bounds(self):
+        """{'min_year', 'max_year'} of the calendar (None when there are no races)"""
+        if not self.race_year.size:
+            return {'min_year': None, 'max_year': None}
+        return {'min_year': int(self.race_year[0]), 'max_year': int(self.race_year[-1])}
+
+    def leaderboard(self, year_from, year_to, limit):
+        """Same rows as driver_leaderboard.sql"""
+        rows = self._result_slice(year_from, year_to)
+        race = self.res_race[rows]
+        driver = self.res_driver[rows]
+        scope = self.res_is_real[rows] & self.race_is_real[race] & self.driver_is_real[driver]
+        race, driver = race[scope], driver[scope]
+        points = self.res_points[rows][scope]
+        has_points = self.res_has_points[rows][scope]
+        position = self.res_position[rows][scope]
+        if not race.size:
+            return []
+        n = len(self.driver_ids)
+
+        total = _sum_cents(driver, points, n)
+        scored = np.bincount(driver[has_points], minlength=n) > 0
+
+        # Race winner: most points, then best valid position, then driver id
+        position_key = np.where(position > 0, position, 9999)
+        order = np.lexsort((driver, position_key, -points, race))
+        winners = driver[order][_first_per_group(race[order])]
+        wins = np.bincount(winners, minlength=n)
+
+        # Champion: most points in each season
+        season_key = self.race_year[race].astype(np.int64) * n + driver
+        keys, inverse = np.unique(season_key, return_inverse=True)
+        season_points = _sum_cents(inverse, points, keys.size)
+        key_year, key_driver = keys // n, keys % n
+        order = np.lexsort((key_driver, -season_points, key_year))
+        champions = key_driver[order][_first_per_group(key_year[order])]
+        titles = np.bincount(champions, minlength=n)
+
+        ranked = np.flatnonzero(np.bincount(driver, minlength=n))
+        ranked = ranked[np.lexsort((
+            self.driver_name_rank[ranked], -total[ranked], -wins[ranked], -titles[ranked]
+        ))][:limit]
+        return [
+            {
+                'id': self.driver_ids[code],
+                'full_name': self.driver_full_names[code],
+                'championship_wins': int(titles[code]),
+                'race_wins': int(wins[code]),
+                # SUM over only NULL (coalesced to 0) points has no decimal places
+                'total_points': _points(total[code]) if scored[code] else Decimal(0),
+            }
+            for code in ranked.tolist()
+        ]
+
+    def season_totals(self, year, entity_type):
+        """Same rows as analytics_season_totals.sql"""
+        rows = self._result_slice(year, year)
+        race = self.res_race[rows]
+        position = self.res_position[rows]
+        if entity_type == 'driver':
+            entity = self.res_driver[rows]
+            ids, names, standings = self.driver_ids, self.driver_names, self.driver_standings
+        else:
+            entity = self.res_constructor[rows]
+            ids, names, standings = self.constructor_ids, self.constructor_names, self.constructor_standings
+        if not entity.size:
+            return []
+        n = len(ids)
+
+        # Two cars of one constructor count as one race
+        entries = np.unique(entity.astype(np.int64) * len(self.race_ids) + race) // len(self.race_ids)
+        races = np.bincount(entries, minlength=n)
+        wins = np.bincount(entity[position == 1], minlength=n)
+        podiums = np.bincount(entity[position <= 3], minlength=n)
+        poles = np.bincount(entity[self.res_pole[rows]], minlength=n)
+        total = _sum_cents(entity, self.res_points[rows], n)
+
+        # Standings after the season's last round that has any
+        champ_position = np.full(n, -1, dtype=np.int64)
+        champ_points = np.full(n, -1, dtype=np.int64)
+        first, last = self._race_range(year, year)
+        with_rows = np.flatnonzero(np.diff(standings.race_starts[first:last + 1]))
+        if with_rows.size:
+            final = first + int(with_rows[-1])
+            final_rows = slice(int(standings.race_starts[final]), int(standings.race_starts[final + 1]))
+            champ_position[standings.entity[final_rows]] = standings.position[final_rows]
+            champ_points[standings.entity[final_rows]] = standings.points[final_rows]
+
+        ranked = np.flatnonzero(races)
+        ranked = ranked[np.lexsort((ranked, -wins[ranked], -total[ranked]))]
+        return [
+            {
+                'entity_id': ids[code],
+                'name': names[code],
+                'races': int(races[code]),
+                'wins': int(wins[code]),
+                'podiums': int(podiums[code]),
+                'poles': int(poles[code]),
+                'points': _points(total[code]),
+                'championship_position': int(champ_position[code]) if champ_position[code] > 0 else None,
+                'championship_points': _points(champ_points[code]) if champ_points[code] >= 0 else None,
+            }
+            for code in ranked.tolist()
+        ]
+
+    def circuit_history(self, circuit_id, limit):
+        """Same rows as analytics_circuit_history.sql"""
+        circuit = self.circuit_positions.get(circuit_id)
+        if circuit is None:
+            return []
+        rows = self.circuit_order[self.circuit_starts[circuit]:self.circuit_starts[circuit + 1]]
+        if not rows.size:
+            return []
+        driver = self.res_driver[rows]
+        position = self.res_position[rows]
+        year = self.race_year[self.res_race[rows]]
+        n = len(self.driver_ids)
+
+        races = np.bincount(driver, minlength=n)
+        wins = np.bincount(driver[position == 1], minlength=n)
+        podiums = np.bincount(driver[position <= 3], minlength=n)
+        poles = np.bincount(driver[self.res_pole[rows]], minlength=n)
+        total = _sum_cents(driver, self.res_points[rows], n)
+        position_sum = np.bincount(driver, weights=position, minlength=n).astype(np.int64)
+        best = np.full(n, np.iinfo(np.int32).max, dtype=np.int32)
+        np.minimum.at(best, driver, position)
+        first_year = np.full(n, np.iinfo(np.int32).max, dtype=np.int32)
+        np.minimum.at(first_year, driver, year)
+        last_year = np.zeros(n, dtype=np.int32)
+        np.maximum.at(last_year, driver, year)
+
+        ranked = np.flatnonzero(races)
+        ranked = ranked[np.lexsort((ranked, -total[ranked], -podiums[ranked], -wins[ranked]))][:limit]
+        return [
+            {
+                'driver_id': self.driver_ids[code],
+                'driver_name': self.driver_full_names[code],
+                'races': int(races[code]),
+                'wins': int(wins[code]),
+                'podiums': int(podiums[code]),
+                'poles': int(poles[code]),
+                'best_finish': int(best[code]),
+                'avg_finish': (Decimal(int(position_sum[code])) / races[code]).quantize(
+                    Decimal('0.1'), rounding=ROUND_HALF_UP
+                ),
+                'points': _points(total[code]),
+                'first_year': int(first_year[code]),
+                'last_year': int(last_year[code]),
+            }
+            for code in ranked.tolist()
+        ]
+
+    def head_to_head(self, driver_a, driver_b, year_from, year_to):
+        """Same rows as analytics_head_to_head.sql"""
+        code_a = self.driver_positions.get(driver_a)
+        code_b = self.driver_positions.get(driver_b)
+        if code_a is None or code_b is None:
+            return []
+        first, last = self._race_range(year_from, year_to)
+
+        def driver_rows(code):
+            rows = self.driver_order[self.driver_starts[code]:self.driver_starts[code + 1]]
+            race = self.res_race[rows]
+            in_range = (race >= first) & (race < last)
+            return rows[in_range], race[in_range]
+
+        rows_a, race_a = driver_rows(code_a)
+        rows_b, race_b = driver_rows(code_b)
+        shared, index_a, index_b = np.intersect1d(race_a, race_b, assume_unique=True, return_indices=True)
+        if not shared.size:
+            return []
+        rows_a, rows_b = rows_a[index_a], rows_b[index_b]
+        position_a, position_b = self.res_position[rows_a], self.res_position[rows_b]
+
+        years, season = np.unique(self.race_year[shared], return_inverse=True)
+        races = np.bincount(season, minlength=years.size)
+        a_ahead = np.bincount(season[position_a < position_b], minlength=years.size)
+        b_ahead = np.bincount(season[position_b < position_a], minlength=years.size)
+        a_points = _sum_cents(season, self.res_points[rows_a], years.size)
+        b_points = _sum_cents(season, self.res_points[rows_b], years.size)
+        return [
+            {
+                'year': int(years[i]),
+                'races': int(races[i]),
+                'a_ahead': int(a_ahead[i]),
+                'b_ahead': int(b_ahead[i]),
+                'a_points': _points(a_points[i]),
+                'b_points': _points(b_points[i]),
+            }
+            for i in range(years.size)
+        ]
+
+
+_snapshot = None
+_enabled = False
+_data_version = 0
+_reloading = False
+_last_failure = None
+_state_lock = threading.Lock()
+# Unpublished snapshot from load_snapshot(), reused while its version is current
+_loaded_snapshot = None
+_load_lock = threading.Lock()
+
+
+def _reload():
+    """Build a snapshot for the current data version and publish it"""
+    global _snapshot, _reloading, _last_failure
+    version = _data_version
+    db = None
+    try:
+        # Checked out inside the try: a failed checkout must also clear _reloading
+        db = DatabaseConnection()
+        snapshot = AnalyticsSnapshot(db.conn, version)
+        db.commit()
+        _snapshot = snapshot
+        _last_failure = None
+    except Exception as e:
+        if db is not None:
+            try:
+                db.conn.rollback()
+            except Exception:
+                pass
+        _last_failure = time.monotonic()
+        print(f"✗ Analytics engine reload failed: {e}")
+        raise
+    finally:
+        if db is not None:
+            db.close()
+        with _state_lock:
+            _reloading = False
+
+
+def _schedule_reload():
+    global _reloading
+    with _state_lock:
+        if not _enabled or _reloading:
+            return
+        if _last_failure is not None and time.monotonic() - _last_failure < RELOAD_RETRY_SECONDS:
+            return
+        _reloading = True
+
+    def run():
+        try:
+            _reload()
+        except Exception:
+            pass  # already logged; get_snapshot() keeps returning None until a retry succeeds
+    threading.Thread(target=run, name='analytics-reload', daemon=True).start()
+
+
+def init_analytics_engine():
+    """
+    Load the first snapshot (call once at startup)
+
+    If the load fails the engine stays enabled: routes use SQL and get_snapshot()
+    retries the load after RELOAD_RETRY_SECONDS.
+
+    Returns:
+        bool: True when the engine is enabled and loaded
+    """
+    global _enabled, _reloading
+    if not Config.ANALYTICS_ENGINE_ENABLED:
+        return False
+    with _state_lock:
+        _enabled = True
+        _reloading = True
+    _reload()
+    return True
+
+
+def notify_change(table_name=None):
+    """Mark the loaded data (and results memoized by data_version()) stale after a write"""
+    global _data_version
+    if table_name is not None and table_name not in ANALYTICS_TABLES:
+        return
+    with _state_lock:
+        _data_version += 1
+    _schedule_reload()
+
+
+def data_version():
+    """Counter bumped by every notify_change() in this process (for memoizing derived results)"""
+    return _data_version
+
+
+def get_snapshot():
+    """
+    The current snapshot, or None when the engine is off, loading or stale
+
+    Usage:
+        snapshot = get_snapshot()
+        rows = snapshot.leaderboard(1950, 2024, 10) if snapshot else run_the_sql()
+    """
+    snapshot = _snapshot
+    if not _enabled:
+        return None
+    if (snapshot is None or snapshot.version != _data_version
+            or time.monotonic() - snapshot.loaded_at > Config.ANALYTICS_ENGINE_MAX_AGE_SECONDS):
+        _schedule_reload()
+        return None
+    return snapshot
+
+
+def load_snapshot():
+    """
+    The current snapshot, or a loaded one when the engine is off or stale
+
+    A snapshot loaded here is not published to get_snapshot(). It is kept for the
+    current data_version() (and ANALYTICS_ENGINE_MAX_AGE_SECONDS), so callers
+    with different memo keys share one load; concurrent callers wait for it.
+    """
+    global _loaded_snapshot
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return snapshot
+    with _load_lock:
+        snapshot = _loaded_snapshot
+        if (snapshot is not None and snapshot.version == _data_version
+                and time.monotonic() - snapshot.loaded_at <= Config.ANALYTICS_ENGINE_MAX_AGE_SECONDS):
+            return snapshot
+        _loaded_snapshot = None
+        version = _data_version
+        db = DatabaseConnection()
+        try:
+            snapshot = AnalyticsSnapshot(db.conn, version)
+            db.commit()
+        finally:
+            db.close()
+        _loaded_snapshot = snapshot
+        return snapshot
@@ -0,0 +1,192 @@
+"""
+Bulk admin operations: filter-based delete, column-wide update and CSV upsert
+
+Each operation runs in a single transaction on one connection and works through
+the matching rows in primary-key chunks, yielding a progress dict after every
+chunk so the route can stream it to the browser. Nothing is committed unless
+every chunk succeeds.
+"""
+import csv
+import io
+from app.database import DatabaseConnection
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Filter operators offered in the bulk forms -> SQL template for one column
+FILTER_OPERATORS = {
+    'eq': '"{col}" = %s',
+    'ne': '"{col}" <> %s',
+    'lt': '"{col}" < %s',
+    'lte': '"{col}" <= %s',
+    'gt': '"{col}" > %s',
+    'gte': '"{col}" >= %s',
+    'is_null': '"{col}" IS NULL',
+    'not_null': '"{col}" IS NOT NULL',
+}
+
+
+def build_filter(column, operator, value):
+    """
+    Turn a validated (column, operator, value) into a WHERE fragment
+
+    Returns:
+        tuple: (sql, params)
+    """
+    template = FILTER_OPERATORS[operator]
+    sql = template.format(col=column)
+    params = [value] if '%s' in template else []
+    return sql, params
+
+
+def _chunks(db, table_name, id_column, statement, where_sql, where_params, set_params, chunk_size):
+    """
+    Apply `statement` to the rows matching `where_sql`, `chunk_size` rows at a time
+
+    `statement` is 'DELETE' or an 'UPDATE ... SET ...' fragment; each chunk is picked by
+    keyset on id_column so already processed rows are never rescanned.
+    """
+    last_id = None
+    processed = 0
+    while True:
+        cursor_sql = f' AND "{id_column}" > %s' if last_id is not None else ''
+        cursor_params = [last_id] if last_id is not None else []
+        batch = (
+            f'SELECT "{id_column}" FROM "{table_name}" WHERE {where_sql}{cursor_sql} '
+            f'ORDER BY "{id_column}" LIMIT %s'
+        )
+        if statement == 'DELETE':
+            query = (
+                f'WITH batch AS ({batch}) '
+                f'DELETE FROM "{table_name}" t USING batch b WHERE t."{id_column}" = b."{id_column}" '
+                f'RETURNING t."{id_column}"'
+            )
+            params = where_params + cursor_params + [chunk_size]
+        else:
+            query = (
+                f'WITH batch AS ({batch}) '
+                f'UPDATE "{table_name}" t SET {statement} FROM batch b WHERE t."{id_column}" = b."{id_column}" '
+                f'RETURNING t."{id_column}"'
+            )
+            params = where_params + cursor_params + [chunk_size] + set_params
+        db.execute(query, tuple(params))
+        ids = [row[0] for row in db.fetchall()]
+        if not ids:
+            return
+        processed += len(ids)
+        last_id = max(ids)
+        yield processed
+
+
+def bulk_delete(table_name, id_column, where_sql, where_params, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Delete every row matching the filter; yields progress dicts, the last one has 'done'"""
+    db = DatabaseConnection()
+    try:
+        processed = 0
+        for processed in _chunks(db, table_name, id_column, 'DELETE', where_sql, list(where_params), [], chunk_size):
+            yield {'processed': processed}
+        db.commit()
+        yield {'done': True, 'processed': processed}
+    except Exception as e:
+        db.conn.rollback()
+        yield {'done': True, 'error': str(e), 'processed': 0}
+    finally:
+        db.close()
+
+
+def bulk_update(table_name, id_column, set_column, set_value, where_sql, where_params,
+                chunk_size=DEFAULT_CHUNK_SIZE):
+    """Set one column on every row matching the filter; yields progress dicts"""
+    db = DatabaseConnection()
+    try:
+        if set_value is None:
+            statement, set_params = f'"{set_column}" = NULL', []
+        else:
+            statement, set_params = f'"{set_column}" = %s', [set_value]
+        processed = 0
+        for processed in _chunks(db, table_name, id_column, statement, where_sql, list(where_params),
+                                 set_params, chunk_size):
+            yield {'processed': processed}
+        db.commit()
+        yield {'done': True, 'processed': processed}
+    except Exception as e:
+        db.conn.rollback()
+        yield {'done': True, 'error': str(e), 'processed': 0}
+    finally:
+        db.close()
+
+
+def csv_upsert(table_name, conflict_columns, table_columns, csv_text, chunk_size=DEFAULT_CHUNK_SIZE,
+               protected_columns=()):
+    """
+    Insert or update rows from CSV text (first line is the header)
+
+    Rows are COPYed into a temporary staging table, then moved with
+    INSERT ... ON CONFLICT (conflict_columns) DO UPDATE in chunks.
+
+    Args:
+        table_name: Target table
+        conflict_columns: Primary key columns (must all appear in the header)
+        table_columns: Column names of the target table (validates the header)
+        csv_text: CSV content
+        protected_columns: Columns a CSV may not write (e.g. password hashes)
+    """
+    header = next(csv.reader(io.StringIO(csv_text)), None)
+    if not header:
+        yield {'done': True, 'error': 'CSV file is empty', 'processed': 0}
+        return
+    header = [h.strip() for h in header]
+    unknown = [h for h in header if h not in table_columns]
+    missing = [c for c in conflict_columns if c not in header]
+    protected = [h for h in header if h in protected_columns]
+    if unknown or missing or protected:
+        problems = []
+        if unknown:
+            problems.append(f"unknown columns: {', '.join(unknown)}")
+        if missing:
+            problems.append(f"missing key columns: {', '.join(missing)}")
+        if protected:
+            problems.append(f"columns that cannot be bulk-written: {', '.join(protected)}")
+        yield {'done': True, 'error': '; '.join(problems), 'processed': 0}
+        return
+
+    column_list = ', '.join(f'"{c}"' for c in header)
+    conflict_list = ', '.join(f'"{c}"' for c in conflict_columns)
+    updates = [c for c in header if c not in conflict_columns]
+    if updates:
+        on_conflict = 'DO UPDATE SET ' + ', '.join(f'"{c}" = EXCLUDED."{c}"' for c in updates)
+    else:
+        on_conflict = 'DO NOTHING'
+
+    db = DatabaseConnection()
+    try:
+        # Staging table with the target's column types but none of its constraints
+        db.execute(
+            f'CREATE TEMP TABLE bulk_stage ON COMMIT DROP AS '
+            f'SELECT {column_list} FROM "{table_name}" WITH NO DATA'
+        )
+        db.execute('ALTER TABLE bulk_stage ADD COLUMN bulk_row BIGSERIAL')
+        db.cursor.copy_expert(
+            f'COPY bulk_stage ({column_list}) FROM STDIN WITH (FORMAT csv, HEADER true)',
+            io.StringIO(csv_text)
+        )
+        db.execute('SELECT COUNT(*) FROM bulk_stage')
+        staged = db.fetchone()[0]
+        yield {'staged': staged, 'processed': 0}
+
+        processed = 0
+        for start in range(0, staged, chunk_size):
+            db.execute(
+                f'INSERT INTO "{table_name}" ({column_list}) '
+                f'SELECT {column_list} FROM bulk_stage WHERE bulk_row > %s AND bulk_row <= %s '
+                f'ON CONFLICT ({conflict_list}) {on_conflict}',
+                (start, start + chunk_size)
+            )
+            processed = min(start + chunk_size, staged)
+            yield {'staged': staged, 'processed': processed}
+        db.commit()
+        yield {'done': True, 'staged': staged, 'processed': processed}
+    except Exception as e:
+        db.conn.rollback()
+        yield {'done': True, 'error': str(e), 'processed': 0}
+    finally:
+        db.close()
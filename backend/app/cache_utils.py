@@ -0,0 +1,93 @@
+"""
+In-process caches for read-mostly API results
+"""
+import threading
+import time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe key/value cache whose entries expire after `ttl_seconds`
+
+    Usage:
+        audit_cache = TTLCache(ttl_seconds=60)
+        rows = audit_cache.get_or_load('all', load_rows)
+    """
+
+    def __init__(self, ttl_seconds, max_entries=256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._loading = {}  # key -> lock held while get_or_load() fills it
+        # Bumped by invalidate() so a load that started before it is not stored
+        self._generation = 0
+        self._key_generations = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key, value):
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            # Drop the entry closest to expiry
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            del self._entries[oldest]
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def _generation_of(self, key):
+        return self._generation, self._key_generations.get(key, 0)
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for `key`, calling `loader()` to fill a miss
+
+        Concurrent misses on the same key call `loader()` once; the other callers
+        wait and get its value. Any value, None included, is cached, unless
+        `invalidate()` dropped the key while `loader()` ran: the value may have
+        been read before the change, so it is returned but not stored.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key, _MISSING)
+                if value is _MISSING:
+                    with self._lock:
+                        generation = self._generation_of(key)
+                    value = loader()
+                    with self._lock:
+                        if self._generation_of(key) == generation:
+                            self._store(key, value)
+                return value
+        finally:
+            with self._lock:
+                if self._loading.get(key) is key_lock:
+                    del self._loading[key]
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when `key` is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._generation += 1
+                self._key_generations.clear()
+            else:
+                self._entries.pop(key, None)
+                self._key_generations[key] = self._key_generations.get(key, 0) + 1
@@ -0,0 +1,87 @@
+"""
+Response compression (gzip, and Brotli when the `brotli` package is installed)
+
+`init_compression(app)` registers an after_request hook that compresses JSON and
+text responses larger than COMPRESSION_MIN_BYTES for clients whose Accept-Encoding
+allows it. Compressed bodies are kept in a TTLCache keyed by a digest of the
+uncompressed body, so responses that are themselves served from a cache (circuit
+snapshots, the audit and race index caches, repeated list pages) are compressed
+once and then only hashed on later requests.
+"""
+import gzip
+import hashlib
+from flask import request
+from app.cache_utils import TTLCache
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+}
+
+# (encoding, body digest) -> compressed bytes
+compressed_cache = TTLCache(ttl_seconds=600, max_entries=256)
+
+
+def _compress(body, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(body, quality=config['COMPRESSION_BROTLI_QUALITY'])
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=config['COMPRESSION_GZIP_LEVEL'], mtime=0)
+
+
+def choose_encoding(accept_encodings):
+    """Best encoding the client accepts: 'br', 'gzip' or None"""
+    candidates = ('br', 'gzip') if brotli is not None else ('gzip',)
+    best, best_quality = None, 0
+    for encoding in candidates:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressed_body(body, encoding, config):
+    """Compressed bytes for `body`, reusing earlier work for an identical body"""
+    key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+    return compressed_cache.get_or_load(key, lambda: _compress(body, encoding, config))
+
+
+def init_compression(app):
+    """Register the compression hook on the app"""
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        if not config['COMPRESSION_ENABLED']:
+            return response
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < config['COMPRESSION_MIN_BYTES']:
+            return response
+
+        response.set_data(compressed_body(body, encoding, config))
+        response.headers['Content-Encoding'] = encoding
+        if response.headers.get('ETag'):
+            # Not byte-identical to the uncompressed body any more, but the same
+            # resource: weak comparison (If-None-Match) still matches the view's tag
+            tag, _ = response.get_etag()
+            response.set_etag(tag, weak=True)
+        return response
@@ -32,6 +32,24 @@ class Config:
 
     # Session + security
     SESSION_TIMEOUT_MINUTES = int(os.getenv('SESSION_TIMEOUT_MINUTES', '30'))
+    # How long a session trusts its cached admin flag before re-reading it
+    ROLE_CACHE_TTL_SECONDS = int(os.getenv('ROLE_CACHE_TTL_SECONDS', '60'))
+
+    # Response compression (see app/compression.py)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True') == 'True'
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+
+    # In-process NumPy analytics engine (see app/analytics_engine.py)
+    ANALYTICS_ENGINE_ENABLED = os.getenv('ANALYTICS_ENGINE_ENABLED', 'False') == 'True'
+    # Reload at least this often, to pick up writes made by other processes
+    ANALYTICS_ENGINE_MAX_AGE_SECONDS = int(os.getenv('ANALYTICS_ENGINE_MAX_AGE_SECONDS', '300'))
+
+    # Championship projections (see app/title_projection.py); 0 workers simulates in-process
+    PROJECTION_WORKERS = int(os.getenv('PROJECTION_WORKERS', str(min(4, os.cpu_count() or 1))))
+    PROJECTION_MAX_SIMULATIONS = int(os.getenv('PROJECTION_MAX_SIMULATIONS', '50000'))
+    PROJECTION_MAX_BUDGET_MS = int(os.getenv('PROJECTION_MAX_BUDGET_MS', '10000'))
 
     # Email / SMTP (Mailtrap or similar free provider)
     MAIL_ENABLED = os.getenv('MAIL_ENABLED', 'True') == 'True'
@@ -100,24 +100,49 @@ class DatabaseConnection:
             self.conn = get_db_connection()
             self.cursor = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     
+    def _reconnect(self):
+        """Drop the lost connection and check out a fresh one"""
+        if self.cursor:
+            try:
+                self.cursor.close()
+            except:
+                pass
+        if self.conn:
+            try:
+                db_pool.putconn(self.conn, close=True)
+            except:
+                pass
+        self._get_connection()
+
     def execute(self, query, params=None):
         try:
             return self.cursor.execute(query, params)
         except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
             # Connection lost, reconnect and retry
-            if self.cursor:
-                try:
-                    self.cursor.close()
-                except:
-                    pass
-            if self.conn:
-                try:
-                    db_pool.putconn(self.conn, close=True)
-                except:
-                    pass
-            self._get_connection()
+            self._reconnect()
             return self.cursor.execute(query, params)
     
+    def _fetch_tuples(self, query, params):
+        with self.conn.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.description, cursor.fetchall()
+
+    def query_tuples(self, query, params=None):
+        """
+        Run a query on a plain tuple cursor (no DictRow per row)
+
+        Reconnects and retries once on a lost connection, like execute().
+
+        Returns:
+            tuple: (cursor.description, list of row tuples)
+        """
+        try:
+            return self._fetch_tuples(query, params)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # Connection lost, reconnect and retry
+            self._reconnect()
+            return self._fetch_tuples(query, params)
+
     def fetchone(self):
         return self.cursor.fetchone()
     
@@ -129,17 +154,7 @@ class DatabaseConnection:
             self.conn.commit()
         except (psycopg2.OperationalError, psycopg2.InterfaceError):
             # Connection lost, reconnect
-            if self.cursor:
-                try:
-                    self.cursor.close()
-                except:
-                    pass
-            if self.conn:
-                try:
-                    db_pool.putconn(self.conn, close=True)
-                except:
-                    pass
-            self._get_connection()
+            self._reconnect()
             self.conn.commit()
     
     def close(self):
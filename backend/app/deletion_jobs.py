@@ -0,0 +1,217 @@
+"""
+Background deletion of users, drivers, constructors and races
+
+Routes tombstone the entity (deleted_at = NOW(), which every read filters on) and
+call `enqueue_deletion()` in the same transaction, then `start_worker()`. The worker
+removes dependent rows in batches of DELETE_BATCH_SIZE, committing and sleeping
+between batches so race_data and the standings tables are never locked for long,
+and finally deletes the entity row itself. Progress is recorded on the
+deletion_job row after every batch.
+
+A failed attempt puts the job back in the queue with an exponential backoff
+(RETRY_BASE_SECONDS, doubled per attempt); only after MAX_JOB_ATTEMPTS is it
+marked failed. Every batch is idempotent, so a retry simply carries on.
+"""
+import threading
+import time
+from app.database import DatabaseConnection
+
+DELETE_BATCH_SIZE = 500
+DELETE_BATCH_PAUSE_SECONDS = 0.2
+WORKER_IDLE_SECONDS = 5
+# A running job whose progress has not moved for this long is assumed orphaned
+STALE_JOB_MINUTES = 10
+MAX_JOB_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+
+ENTITY_TABLES = {
+    'user': '"user"',
+    'driver': 'driver',
+    'constructor': 'constructor',
+    'race': 'race',
+}
+
+# Rows that cascade from each entity, deleted in this order before the entity itself
+DEPENDENTS = {
+    'race': [
+        ('race_data', 'race_id'),
+        ('race_driver_standing', 'race_id'),
+        ('race_constructor_standing', 'race_id'),
+    ],
+    'driver': [
+        ('race_data', 'driver_id'),
+        ('race_driver_standing', 'driver_id'),
+    ],
+    'constructor': [
+        ('race_data', 'constructor_id'),
+        ('race_constructor_standing', 'constructor_id'),
+    ],
+}
+
+
+def enqueue_deletion(db, entity_type, entity_id, requested_by):
+    """
+    Queue a deletion job (the caller commits, together with its tombstone update)
+
+    For a user, everything the user owns is tombstoned here as well so it
+    disappears from reads straight away.
+
+    Returns:
+        int: deletion_job id
+    """
+    if entity_type == 'user':
+        for table in ('race', 'driver', 'constructor'):
+            db.execute(
+                f'UPDATE {table} SET deleted_at = NOW() WHERE user_id = %s AND deleted_at IS NULL',
+                (entity_id,)
+            )
+    db.execute("""
+        INSERT INTO deletion_job (entity_type, entity_id, requested_by)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (entity_type, entity_id) WHERE status IN ('queued', 'running')
+        DO UPDATE SET entity_type = EXCLUDED.entity_type
+        RETURNING id
+    """, (entity_type, str(entity_id), requested_by))
+    return db.fetchone()['id']
+
+
+def get_deletion_job(job_id):
+    """Return a deletion_job row as a dict, or None"""
+    db = DatabaseConnection()
+    try:
+        db.execute("""
+            SELECT id, entity_type, entity_id, requested_by, status, rows_deleted, attempts,
+                   next_attempt_at, error, created_at, started_at, finished_at
+            FROM deletion_job
+            WHERE id = %s
+        """, (job_id,))
+        row = db.fetchone()
+        return dict(row) if row else None
+    finally:
+        db.close()
+
+
+def _deletion_steps(db, entity_type, entity_id):
+    """(table, column, value) deletes for one job, dependents first"""
+    steps = []
+    if entity_type == 'user':
+        steps.append(('race_data', 'user_id', entity_id))
+        for owned_type in ('race', 'driver', 'constructor'):
+            db.execute(f'SELECT id FROM {owned_type} WHERE user_id = %s ORDER BY id', (entity_id,))
+            for row in db.fetchall():
+                steps.extend(_deletion_steps(db, owned_type, row['id']))
+    else:
+        steps.extend((table, column, entity_id) for table, column in DEPENDENTS[entity_type])
+    steps.append((ENTITY_TABLES[entity_type], 'id', entity_id))
+    return steps
+
+
+def _claim_next_job(db):
+    db.execute("""
+        UPDATE deletion_job
+        SET status = 'running', attempts = attempts + 1,
+            started_at = COALESCE(started_at, NOW()), updated_at = NOW()
+        WHERE id = (
+            SELECT id FROM deletion_job
+            WHERE (status = 'queued' AND (next_attempt_at IS NULL OR next_attempt_at <= NOW()))
+               OR (status = 'running' AND updated_at < NOW() - make_interval(mins => %s))
+            ORDER BY created_at, id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, entity_type, entity_id, attempts
+    """, (STALE_JOB_MINUTES,))
+    job = db.fetchone()
+    db.commit()
+    return job
+
+
+def run_next_job():
+    """
+    Claim and run one queued job
+
+    Returns:
+        bool: False when the queue was empty
+    """
+    db = DatabaseConnection()
+    try:
+        job = _claim_next_job(db)
+        if job is None:
+            return False
+        try:
+            for table, column, value in _deletion_steps(db, job['entity_type'], job['entity_id']):
+                while True:
+                    db.execute(f"""
+                        DELETE FROM {table}
+                        WHERE ctid = ANY(ARRAY(
+                            SELECT ctid FROM {table} WHERE {column} = %s LIMIT %s
+                        ))
+                    """, (value, DELETE_BATCH_SIZE))
+                    deleted = db.cursor.rowcount
+                    db.execute("""
+                        UPDATE deletion_job
+                        SET rows_deleted = rows_deleted + %s, updated_at = NOW()
+                        WHERE id = %s
+                    """, (deleted, job['id']))
+                    db.commit()
+                    if deleted < DELETE_BATCH_SIZE:
+                        break
+                    time.sleep(DELETE_BATCH_PAUSE_SECONDS)
+            db.execute("""
+                UPDATE deletion_job
+                SET status = 'done', finished_at = NOW(), updated_at = NOW()
+                WHERE id = %s
+            """, (job['id'],))
+            db.commit()
+        except Exception as e:
+            db.conn.rollback()
+            if job['attempts'] < MAX_JOB_ATTEMPTS:
+                delay = RETRY_BASE_SECONDS * 2 ** (job['attempts'] - 1)
+                db.execute("""
+                    UPDATE deletion_job
+                    SET status = 'queued', error = %s, updated_at = NOW(),
+                        next_attempt_at = NOW() + make_interval(secs => %s)
+                    WHERE id = %s
+                """, (str(e), delay, job['id']))
+                print(f"✗ Deletion job {job['id']} attempt {job['attempts']} failed, retrying in {delay}s: {e}")
+            else:
+                db.execute("""
+                    UPDATE deletion_job
+                    SET status = 'failed', error = %s, finished_at = NOW(), updated_at = NOW()
+                    WHERE id = %s
+                """, (str(e), job['id']))
+                print(f"✗ Deletion job {job['id']} failed after {job['attempts']} attempts: {e}")
+            db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def run_worker(stop_when_idle=False):
+    """Process jobs until the queue is empty (stop_when_idle) or forever"""
+    while True:
+        try:
+            ran = run_next_job()
+        except Exception as e:
+            print(f"✗ Deletion worker error: {e}")
+            ran = False
+        if not ran:
+            if stop_when_idle:
+                return
+            _wakeup.wait(WORKER_IDLE_SECONDS)
+            _wakeup.clear()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def start_worker():
+    """Make sure this process has a worker thread and wake it up"""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=run_worker, name='deletion-worker', daemon=True)
+            _worker.start()
+    _wakeup.set()
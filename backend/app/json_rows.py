@@ -0,0 +1,181 @@
+"""
+Fast result-set to JSON encoding for the API routes
+
+Routes fetch plain tuples with `DatabaseConnection.query_tuples()` and hand them to
+`encode_rows()`, which writes each row straight into the JSON text using one
+serializer per column, chosen once from the column's type OID. This avoids a
+DictRow, a dict and a generic `default=` lookup per value.
+
+The default 'flask' style produces the same values as `jsonify`: Decimal becomes a
+string and dates use the HTTP date format. Keys are sorted and the output is
+always compact, so it is byte-identical to `jsonify` only when that is compact
+too: with DEBUG=True jsonify pretty-prints, and the bodies differ in whitespace.
+`json_response()` builds the envelope around pre-encoded row arrays.
+"""
+import json
+import math
+from functools import lru_cache
+from flask import current_app
+from werkzeug.http import http_date
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+# PostgreSQL type OIDs -> serializer kind
+_TYPE_KINDS = {
+    16: 'bool',
+    20: 'int', 21: 'int', 23: 'int', 26: 'int',
+    700: 'float', 701: 'float',
+    1700: 'numeric',
+    18: 'text', 19: 'text', 25: 'text', 1042: 'text', 1043: 'text',
+    1082: 'date', 1114: 'date', 1184: 'date',
+}
+
+
+def _encode_bool(value):
+    return 'true' if value else 'false'
+
+
+def _encode_float(value):
+    if math.isfinite(value):
+        return float.__repr__(value)
+    return 'NaN' if math.isnan(value) else ('Infinity' if value > 0 else '-Infinity')
+
+
+def _encode_native_numeric(value):
+    return _encode_float(float(value))
+
+
+def _encode_flask_numeric(value):
+    return '"' + str(value) + '"'
+
+
+# Race dates repeat heavily across rows and http_date() is slow, so it is memoized.
+# (Equal values always format the same here: http_date() normalizes to UTC.)
+@lru_cache(maxsize=4096)
+def _encode_flask_date(value):
+    return '"' + http_date(value) + '"'
+
+
+def _encode_iso_date(value):
+    return '"' + value.isoformat() + '"'
+
+
+def _encode_other(value):
+    return current_app.json.dumps(value, separators=(',', ':'))
+
+
+# style -> kind -> value serializer ('native' matches what compare_drivers used to build by hand)
+_ENCODERS = {
+    'flask': {
+        'bool': _encode_bool, 'int': int.__repr__, 'float': _encode_float,
+        'numeric': _encode_flask_numeric, 'text': _encode_string, 'date': _encode_flask_date,
+    },
+    'native': {
+        'bool': _encode_bool, 'int': int.__repr__, 'float': _encode_float,
+        'numeric': _encode_native_numeric, 'text': _encode_string, 'date': _encode_iso_date,
+    },
+}
+
+# style -> kind -> Python value converter, for rows the route reshapes before encoding
+_CONVERTERS = {
+    'native': {
+        'numeric': float,
+        'date': lambda value: value.isoformat(),
+    },
+}
+
+
+def _columns_key(description):
+    return tuple((column.name, column.type_code) for column in description)
+
+
+@lru_cache(maxsize=256)
+def _row_layout(columns, style):
+    """
+    Sorted (index, '"key":', serializer) per output column
+
+    Like dict(DictRow), a duplicated column name keeps its last occurrence.
+    """
+    encoders = _ENCODERS[style]
+    last_index = {name: i for i, (name, _) in enumerate(columns)}
+    return tuple(
+        (index, _encode_string(name) + ':', encoders.get(_TYPE_KINDS.get(columns[index][1]), _encode_other))
+        for name, index in sorted(last_index.items())
+    )
+
+
+class RawJSON(str):
+    """Already encoded JSON text, embedded verbatim by `json_response()`"""
+
+
+def encode_rows(description, rows, style='flask'):
+    """
+    Encode tuple rows as a JSON array of objects
+
+    Args:
+        description: cursor.description of the query
+        rows: Sequence of tuples
+        style: 'flask' (same values as jsonify) or 'native' (Decimal as number, ISO dates)
+
+    Returns:
+        RawJSON: the array text
+    """
+    layout = _row_layout(_columns_key(description), style)
+    parts = []
+    for row in rows:
+        fields = []
+        for index, prefix, encode in layout:
+            value = row[index]
+            fields.append(prefix + ('null' if value is None else encode(value)))
+        parts.append('{' + ','.join(fields) + '}')
+    return RawJSON('[' + ','.join(parts) + ']')
+
+
+def encode_row(description, row, style='flask'):
+    """Encode a single tuple row as a JSON object (detail endpoints)"""
+    return RawJSON(encode_rows(description, (row,), style)[1:-1])
+
+
+def convert_row(description, row, style='native'):
+    """Turn one tuple row into a dict of JSON-ready values (for reshaped responses)"""
+    converters = _CONVERTERS[style]
+    result = {}
+    for column, value in zip(description, row):
+        convert = converters.get(_TYPE_KINDS.get(column.type_code))
+        result[column.name] = value if value is None or convert is None else convert(value)
+    return result
+
+
+def column_value(description, rows, name, default=None):
+    """Value of column `name` in the first row (e.g. COUNT(*) OVER () totals)"""
+    if not rows:
+        return default
+    for index, column in enumerate(description):
+        if column.name == name:
+            return rows[0][index]
+    return default
+
+
+def _encode_value(value):
+    if isinstance(value, RawJSON):
+        return value
+    if isinstance(value, dict):
+        return '{' + ','.join(
+            _encode_string(str(key)) + ':' + _encode_value(value[key])
+            for key in sorted(value)
+        ) + '}'
+    return current_app.json.dumps(value, separators=(',', ':'))
+
+
+def json_response(payload, status=200):
+    """
+    Like jsonify(payload), but RawJSON values (e.g. from encode_rows) are embedded as-is
+
+    The body is compact even in debug mode, where jsonify would indent it.
+
+    Usage:
+        description, rows = db.query_tuples(sql, params)
+        return json_response({'races': encode_rows(description, rows), 'pagination': {...}})
+    """
+    body = (_encode_value(payload) + '\n').encode('ascii')
+    return current_app.response_class(body, status=status, mimetype='application/json')
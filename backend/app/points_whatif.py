@@ -0,0 +1,173 @@
+"""
+"What if" re-scoring of real seasons under another points system
+
+`rescore_history(system)` gives every classified finish in the real races the
+points of `system`, computed as one lookup over the result arrays of an analytics
+snapshot. It then ranks every season (points first, then countback on wins,
+seconds, ...) and compares each champion with the official one: the position 1
+driver after the season's last round in race_driver_standing.
+
+Results are memoized per (points system hash, analytics data version), so a
+repeated system costs only a dictionary lookup until the data changes. A new
+system re-scores the snapshot load_snapshot() keeps for that data version, so it
+does not reload the tables.
+
+A fastest-lap bonus cannot be modelled because race_data has no fastest lap
+column. The supported bonus is a per-race pole position bonus.
+"""
+import hashlib
+import json
+from decimal import Decimal
+import numpy as np
+from app.analytics_engine import load_snapshot, data_version
+from app.cache_utils import TTLCache
+
+# Presets offered to the UI; points for P1, P2, ...
+POINTS_SYSTEMS = {
+    '2010': {'label': '2010 onwards (25-18-15-12-10-8-6-4-2-1)', 'points': [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]},
+    '2003': {'label': '2003-2009 (10-8-6-5-4-3-2-1)', 'points': [10, 8, 6, 5, 4, 3, 2, 1]},
+    '1991': {'label': '1991-2002 (10-6-4-3-2-1)', 'points': [10, 6, 4, 3, 2, 1]},
+    '1961': {'label': '1961-1990 (9-6-4-3-2-1)', 'points': [9, 6, 4, 3, 2, 1]},
+}
+MAX_SCORING_POSITIONS = 30
+MAX_POINTS_PER_POSITION = 100
+
+# The TTL bounds staleness from writes made by other processes (cf. ANALYTICS_ENGINE_MAX_AGE_SECONDS)
+whatif_cache = TTLCache(ttl_seconds=300, max_entries=64)
+
+
+def _cents(value):
+    return int((Decimal(str(value)) * 100).to_integral_value())
+
+
+def parse_points_system(points, pole_bonus=0):
+    """
+    Validate a points table and pole bonus
+
+    Returns:
+        tuple: (system dict {'points': [...], 'pole_bonus': ...} in hundredths, error or None)
+    """
+    try:
+        points = [_cents(value) for value in points]
+        pole_bonus = _cents(pole_bonus or 0)
+    except (ArithmeticError, ValueError, TypeError):
+        return None, 'Points must be numbers'
+    if not points or len(points) > MAX_SCORING_POSITIONS:
+        return None, f'Give between 1 and {MAX_SCORING_POSITIONS} scoring positions'
+    if any(not 0 <= value <= MAX_POINTS_PER_POSITION * 100 for value in points + [pole_bonus]):
+        return None, f'Points must be between 0 and {MAX_POINTS_PER_POSITION}'
+    return {'points': points, 'pole_bonus': pole_bonus}, None
+
+
+def system_hash(system):
+    """Stable short hash of a parsed points system"""
+    canonical = json.dumps([system['points'], system['pole_bonus']], separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('ascii')).hexdigest()[:16]
+
+
+def _points(cents):
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def _final_official_standings(snapshot):
+    """{year: (champion code, points)} from the last round of each season with standings"""
+    standings = snapshot.driver_standings
+    has_rows = np.flatnonzero(np.diff(standings.race_starts))
+    champions = {}
+    for race in has_rows.tolist():
+        year = int(snapshot.race_year[race])
+        rows = slice(int(standings.race_starts[race]), int(standings.race_starts[race + 1]))
+        leader = np.flatnonzero(standings.position[rows] == 1)
+        if leader.size:
+            # Later rounds of the same year overwrite earlier ones
+            index = rows.start + int(leader[0])
+            champions[year] = (int(standings.entity[index]), int(standings.points[index]))
+        else:
+            champions.pop(year, None)
+    return champions
+
+
+def _rescore(snapshot, system):
+    real = snapshot.res_is_real & snapshot.race_is_real[snapshot.res_race]
+    race = snapshot.res_race[real]
+    driver = snapshot.res_driver[real]
+    position = snapshot.res_position[real]
+    pole = snapshot.res_pole[real]
+    if not race.size:
+        return {'seasons': [], 'title_changes': []}
+    n = len(snapshot.driver_ids)
+
+    # Points per finish: lookup[position] (0 for unclassified and non-scoring places)
+    lookup = np.zeros(MAX_SCORING_POSITIONS + 2, dtype=np.int64)
+    lookup[1:len(system['points']) + 1] = system['points']
+    points = lookup[np.clip(position, 0, MAX_SCORING_POSITIONS + 1)] + pole * system['pole_bonus']
+
+    # Season table: one entry per (year, driver)
+    year = snapshot.race_year[race]
+    keys, entry = np.unique(year.astype(np.int64) * n + driver, return_inverse=True)
+    entry_year, entry_driver = keys // n, keys % n
+    entry_points = np.rint(np.bincount(entry, weights=points, minlength=keys.size)).astype(np.int64)
+
+    # Countback on places 1..depth
+    depth = int(min(max(position.max(initial=0), 1), MAX_SCORING_POSITIONS))
+    placed = (position > 0) & (position <= depth)
+    finishes = np.zeros((depth, keys.size), dtype=np.int64)
+    np.add.at(finishes, (position[placed] - 1, entry[placed]), 1)
+
+    order = np.lexsort(
+        [entry_driver] + [-finishes[place] for place in range(depth - 1, -1, -1)] + [-entry_points, entry_year]
+    )
+    first = np.ones(order.size, dtype=bool)
+    first[1:] = entry_year[order][1:] != entry_year[order][:-1]
+    champions = order[first]
+
+    official = _final_official_standings(snapshot)
+    seasons = []
+    official_titles = np.zeros(n, dtype=np.int64)
+    whatif_titles = np.zeros(n, dtype=np.int64)
+    for champion in champions.tolist():
+        season = int(entry_year[champion])
+        if season not in official:
+            continue
+        official_code, official_points = official[season]
+        whatif_code = int(entry_driver[champion])
+        official_titles[official_code] += 1
+        whatif_titles[whatif_code] += 1
+        # Where the official champion ends up under the new system
+        season_order = order[entry_year[order] == season]
+        official_rank = np.flatnonzero(entry_driver[season_order] == official_code)
+        seasons.append({
+            'year': season,
+            'official_champion_id': snapshot.driver_ids[official_code],
+            'official_champion': snapshot.driver_full_names[official_code],
+            'official_points': _points(official_points),
+            'whatif_champion_id': snapshot.driver_ids[whatif_code],
+            'whatif_champion': snapshot.driver_full_names[whatif_code],
+            'whatif_points': _points(entry_points[champion]),
+            'official_champion_whatif_position': int(official_rank[0]) + 1 if official_rank.size else None,
+            'changed': whatif_code != official_code,
+        })
+
+    changed = np.flatnonzero(official_titles != whatif_titles)
+    changed = changed[np.lexsort((changed, -(whatif_titles[changed] - official_titles[changed])))]
+    title_changes = [
+        {
+            'driver_id': snapshot.driver_ids[code],
+            'driver_name': snapshot.driver_full_names[code],
+            'official_titles': int(official_titles[code]),
+            'whatif_titles': int(whatif_titles[code]),
+        }
+        for code in changed.tolist()
+    ]
+    return {'seasons': seasons, 'title_changes': title_changes}
+
+
+def rescore_history(system):
+    """
+    Re-score every real season under `system` (from parse_points_system)
+
+    Returns:
+        dict: {'seasons': [per-season champion diff], 'title_changes': [drivers whose title count moves]}
+    """
+    key = (system_hash(system), data_version())
+    return whatif_cache.get_or_load(key, lambda: _rescore(load_snapshot(), system))
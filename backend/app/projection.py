@@ -0,0 +1,57 @@
+"""
+Column projection for list and detail queries (`?fields=`)
+
+A `Projection` whitelists the fields one query can return, the SQL expression
+behind each and the join it needs. Query files keep `{columns}` and `{joins}`
+placeholders; `render()` fills them with only the requested fields and the joins
+those fields depend on. Filters must not reference optional joins.
+"""
+
+
+class Projection:
+    """
+    Usage:
+        RACE_FIELDS = Projection(
+            fields={'id': ('r.id', None), 'circuit_name': ('c.full_name', 'circuit')},
+            joins={'circuit': ('LEFT JOIN circuit c ON r.circuit_id = c.id', None)},
+            always=('id',)
+        )
+        names, error = RACE_FIELDS.parse(request.args.get('fields'))
+        sql = RACE_FIELDS.render(get_sql_query('select_races.sql'), names)
+    """
+
+    def __init__(self, fields, joins=None, always=()):
+        # fields: {output name: (SQL expression, join name or None)}, in output order
+        # joins:  {join name: (JOIN clause, join it builds on or None)}, in join order
+        self.fields = fields
+        self.joins = joins or {}
+        self.always = tuple(always)
+
+    def parse(self, raw_fields):
+        """
+        Validate a comma-separated `fields` value
+
+        Returns:
+            tuple: (list of field names in whitelist order, error message or None);
+                   an empty or missing value selects every field
+        """
+        if not raw_fields:
+            return list(self.fields), None
+        requested = {name.strip() for name in raw_fields.split(',') if name.strip()}
+        unknown = sorted(requested - set(self.fields))
+        if unknown:
+            return None, f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(self.fields)}"
+        requested.update(self.always)
+        return [name for name in self.fields if name in requested], None
+
+    def render(self, template, names):
+        """Fill `{columns}` and `{joins}` in a query template for the given fields"""
+        needed = set()
+        for name in names:
+            join = self.fields[name][1]
+            while join and join not in needed:
+                needed.add(join)
+                join = self.joins[join][1]
+        columns = ',\n    '.join(f'{self.fields[name][0]} AS {name}' for name in names)
+        joins = '\n'.join(clause for join, (clause, _) in self.joins.items() if join in needed)
+        return template.format(columns=columns, joins=joins)
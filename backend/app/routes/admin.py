@@ -1,12 +1,44 @@
 """
 Admin panel routes for CRUD operations
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+import json
+from flask import (
+    Blueprint, render_template, request, redirect, url_for, flash, session, jsonify,
+    Response, stream_with_context
+)
 from app.database import DatabaseConnection
-from app.admin_utils import require_admin, get_table_schema, get_foreign_keys, get_table_data, get_referenced_table_options
+from app.bulk_utils import FILTER_OPERATORS, build_filter, bulk_delete, bulk_update, csv_upsert
+from app.admin_utils import (
+    require_admin, get_table_schema, get_foreign_keys, get_table_page, estimate_row_count,
+    search_referenced_options, get_option_label, invalidate_referenced_options,
+    get_schema_metadata, init_schema_cache, bump_role_version
+)
+from app.analytics_engine import notify_change
+from app.routes.seasons import invalidate_season_progression
+from app.routes.compare import invalidate_race_index
 
 admin_bp = Blueprint('admin', __name__)
 
+
+def _invalidate_caches(table_name):
+    """Drop caches that depend on a table after an admin write to it"""
+    invalidate_referenced_options(table_name)
+    notify_change(table_name)
+    if table_name in ('race', 'driver', 'constructor', 'race_driver_standing', 'race_constructor_standing'):
+        invalidate_season_progression()
+    if table_name == 'race':
+        invalidate_race_index()
+    if table_name == 'user':
+        # is_admin may have changed; cached session roles must be re-read
+        bump_role_version()
+
+
+# Columns the bulk forms may not write: passwords are only set through the
+# single-row forms, which bcrypt-hash them
+BULK_PROTECTED_COLUMNS = {
+    'user': ('password_hash',),
+}
+
 # Available tables for admin panel
 AVAILABLE_TABLES = {
     'circuit': {
@@ -52,28 +84,78 @@ def admin_panel():
     """Admin panel main page - table selection"""
     return render_template('admin.html', tables=AVAILABLE_TABLES)
 
+@admin_bp.route('/admin/schema-cache/refresh', methods=['POST'])
+@require_admin
+def admin_refresh_schema_cache():
+    """Reload cached table metadata after a migration"""
+    try:
+        init_schema_cache()
+        flash('Schema metadata reloaded.')
+    except Exception as e:
+        flash(f'Error reloading schema metadata: {str(e)}', 'error')
+    return redirect(url_for('admin.admin_panel'))
+
+# Columns shown in the admin table view
+LIST_COLUMNS = 10
+
+
 @admin_bp.route('/admin/<table_name>')
 @require_admin
 def admin_table_list(table_name):
-    """List all records in a table"""
+    """Browse a table page by page (keyset navigation, estimated counts)"""
     if table_name not in AVAILABLE_TABLES:
         flash('Invalid table name.')
         return redirect(url_for('admin.admin_panel'))
     
-    # Get pagination parameters
-    page = request.args.get('page', 1, type=int)
     per_page = 50
-    offset = (page - 1) * per_page
-    
-    # Get table data
     id_column = AVAILABLE_TABLES[table_name]['id_column']
-    records, total_count = get_table_data(table_name, limit=per_page, offset=offset, id_column=id_column)
-    
-    # Get table schema for display
-    schema = get_table_schema(table_name)
-    
-    # Calculate pagination
-    total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 1
+    metadata = get_schema_metadata(table_name) or {'columns': [], 'indexed_columns': []}
+    schema = metadata['columns'][:LIST_COLUMNS]
+    indexed = set(metadata['indexed_columns'])
+
+    # Sorting and filtering are limited to indexed columns; sorting also needs NOT NULL for the cursor
+    sortable = [c['name'] for c in metadata['columns'] if c['name'] in indexed and not c['nullable']]
+    filterable = [c['name'] for c in metadata['columns'] if c['name'] in indexed]
+
+    sort_column = request.args.get('sort', id_column)
+    if sort_column not in sortable:
+        sort_column = id_column
+    descending = request.args.get('dir') == 'desc'
+    filter_column = request.args.get('filter_col')
+    filter_value = request.args.get('filter_value', '').strip()
+    if filter_column not in filterable or not filter_value:
+        filter_column, filter_value = None, None
+
+    after = before = None
+    if request.args.get('after_id') is not None:
+        after = (request.args.get('after'), request.args.get('after_id'))
+    elif request.args.get('before_id') is not None:
+        before = (request.args.get('before'), request.args.get('before_id'))
+
+    # Project only what the view renders, plus the cursor columns
+    columns = [c['name'] for c in schema]
+    for extra in (id_column, sort_column):
+        if extra not in columns:
+            columns.append(extra)
+
+    records, has_previous, has_next = get_table_page(
+        table_name, columns, id_column=id_column, sort_column=sort_column, descending=descending,
+        filter_column=filter_column, filter_value=filter_value, after=after, before=before, limit=per_page
+    )
+    total_count = estimate_row_count(table_name, filter_column, filter_value)
+
+    # Query args carried by every navigation link
+    view_args = {'sort': sort_column, 'dir': 'desc' if descending else 'asc'}
+    if filter_column:
+        view_args.update(filter_col=filter_column, filter_value=filter_value)
+
+    next_args = previous_args = None
+    if records and has_next:
+        last = records[-1]
+        next_args = dict(view_args, after=last[sort_column], after_id=last[id_column])
+    if records and has_previous:
+        first = records[0]
+        previous_args = dict(view_args, before=first[sort_column], before_id=first[id_column])
     
     return render_template(
         'admin_table.html',
@@ -81,12 +163,60 @@ def admin_table_list(table_name):
         table_info=AVAILABLE_TABLES[table_name],
         records=records,
         schema=schema,
-        page=page,
-        total_pages=total_pages,
         total_count=total_count,
-        per_page=per_page
+        per_page=per_page,
+        sortable=sortable,
+        filterable=filterable,
+        sort_column=sort_column,
+        descending=descending,
+        filter_column=filter_column,
+        filter_value=filter_value,
+        view_args=view_args,
+        next_args=next_args,
+        previous_args=previous_args
     )
 
+def _selected_fk_options(foreign_keys, values):
+    """Map each FK column to its currently selected {'id', 'display'} option (or None)"""
+    selected = {}
+    for col_name, fk_info in foreign_keys.items():
+        value = values.get(col_name) if values is not None else None
+        if value in (None, ''):
+            selected[col_name] = None
+            continue
+        selected[col_name] = {'id': str(value), 'display': get_option_label(fk_info['table'], value)}
+    return selected
+
+
+def _referenced_tables():
+    """Tables that FK dropdowns of the admin tables point at"""
+    tables = set()
+    for table_name in AVAILABLE_TABLES:
+        tables.update(fk['table'] for fk in get_foreign_keys(table_name).values())
+    return tables
+
+
+@admin_bp.route('/admin/api/options/<table_name>')
+@require_admin
+def admin_fk_options(table_name):
+    """
+    Search options for a foreign key dropdown
+    
+    Query args: q (substring of the display value or id), after (last id of the previous page), limit
+    """
+    if table_name not in _referenced_tables():
+        return jsonify({'error': 'Invalid table name'}), 404
+    limit = min(max(request.args.get('limit', 25, type=int), 1), 100)
+    try:
+        options, next_after = search_referenced_options(
+            table_name, q=request.args.get('q'), after=request.args.get('after'), limit=limit
+        )
+        return jsonify({'options': options, 'next_after': next_after})
+    except Exception as e:
+        print(f"Error loading options for {table_name}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @admin_bp.route('/admin/<table_name>/create', methods=['GET', 'POST'])
 @require_admin
 def admin_table_create(table_name):
@@ -100,12 +230,8 @@ def admin_table_create(table_name):
         schema = get_table_schema(table_name)
         foreign_keys = get_foreign_keys(table_name)
         
-        # Get options for foreign key dropdowns
-        fk_options = {}
-        for col_name, fk_info in foreign_keys.items():
-            # Determine display column
-            display_col = 'name' if 'name' in [c['name'] for c in get_table_schema(fk_info['table'])] else 'id'
-            fk_options[col_name] = get_referenced_table_options(fk_info['table'], display_col)
+        # FK dropdowns only carry the submitted value; options load on demand from the options API
+        fk_options = _selected_fk_options(foreign_keys, request.form if request.method == 'POST' else None)
         
         if request.method == 'POST':
             # Build INSERT query
@@ -171,6 +297,7 @@ def admin_table_create(table_name):
             try:
                 db.execute(query, tuple(params))
                 db.commit()
+                _invalidate_caches(table_name)
                 flash(f'{AVAILABLE_TABLES[table_name]["display_name"]} created successfully!')
                 return redirect(url_for('admin.admin_table_list', table_name=table_name))
             except Exception as e:
@@ -201,12 +328,6 @@ def admin_table_edit(table_name, record_id):
         foreign_keys = get_foreign_keys(table_name)
         id_column = AVAILABLE_TABLES[table_name]['id_column']
         
-        # Get options for foreign key dropdowns
-        fk_options = {}
-        for col_name, fk_info in foreign_keys.items():
-            display_col = 'name' if 'name' in [c['name'] for c in get_table_schema(fk_info['table'])] else 'id'
-            fk_options[col_name] = get_referenced_table_options(fk_info['table'], display_col)
-        
         # Get existing record
         query = f'SELECT * FROM "{table_name}" WHERE {id_column} = %s'
         db.execute(query, (record_id,))
@@ -216,6 +337,9 @@ def admin_table_edit(table_name, record_id):
             flash('Record not found.')
             return redirect(url_for('admin.admin_table_list', table_name=table_name))
         
+        # FK dropdowns only carry the current value; options load on demand from the options API
+        fk_options = _selected_fk_options(foreign_keys, request.form if request.method == 'POST' else record)
+        
         if request.method == 'POST':
             # Build UPDATE query
             updates = []
@@ -270,6 +394,7 @@ def admin_table_edit(table_name, record_id):
             try:
                 db.execute(query, tuple(params))
                 db.commit()
+                _invalidate_caches(table_name)
                 flash(f'{AVAILABLE_TABLES[table_name]["display_name"]} updated successfully!')
                 return redirect(url_for('admin.admin_table_list', table_name=table_name))
             except Exception as e:
@@ -312,6 +437,7 @@ def admin_table_delete(table_name, record_id):
         try:
             db.execute(delete_query, (record_id,))
             db.commit()
+            _invalidate_caches(table_name)
             flash(f'{AVAILABLE_TABLES[table_name]["display_name"]} deleted successfully!')
         except Exception as e:
             db.conn.rollback()
@@ -321,3 +447,103 @@ def admin_table_delete(table_name, record_id):
     finally:
         db.close()
 
+
+# ============================================
+# Bulk operations
+# ============================================
+
+def _stream_progress(table_name, progress):
+    """Stream progress dicts as NDJSON; drop dependent caches once the action commits"""
+    def generate():
+        for item in progress:
+            if item.get('done') and not item.get('error'):
+                _invalidate_caches(table_name)
+            yield json.dumps(item) + '\n'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _bulk_filter(column_names):
+    """Validated WHERE fragment from the bulk form, or an error message"""
+    filter_column = request.form.get('filter_col')
+    operator = request.form.get('filter_op')
+    if filter_column not in column_names:
+        return None, 'Choose a column to filter on.'
+    if operator not in FILTER_OPERATORS:
+        return None, 'Choose a filter operator.'
+    return build_filter(filter_column, operator, request.form.get('filter_value', '')), None
+
+
+@admin_bp.route('/admin/<table_name>/bulk')
+@require_admin
+def admin_table_bulk(table_name):
+    """Bulk delete / update / CSV upsert page"""
+    if table_name not in AVAILABLE_TABLES:
+        flash('Invalid table name.')
+        return redirect(url_for('admin.admin_panel'))
+    metadata = get_schema_metadata(table_name) or {'columns': [], 'primary_key': []}
+    return render_template(
+        'admin_bulk.html',
+        table_name=table_name,
+        table_info=AVAILABLE_TABLES[table_name],
+        schema=metadata['columns'],
+        primary_key=metadata['primary_key'],
+        protected_columns=BULK_PROTECTED_COLUMNS.get(table_name, ()),
+        operators=FILTER_OPERATORS
+    )
+
+
+@admin_bp.route('/admin/<table_name>/bulk/delete', methods=['POST'])
+@require_admin
+def admin_bulk_delete(table_name):
+    """Delete every row matching a filter (streams NDJSON progress)"""
+    if table_name not in AVAILABLE_TABLES:
+        return jsonify({'error': 'Invalid table name'}), 404
+    column_names = [c['name'] for c in get_table_schema(table_name)]
+    where, error = _bulk_filter(column_names)
+    if error:
+        return jsonify({'error': error}), 400
+    id_column = AVAILABLE_TABLES[table_name]['id_column']
+    return _stream_progress(table_name, bulk_delete(table_name, id_column, *where))
+
+
+@admin_bp.route('/admin/<table_name>/bulk/update', methods=['POST'])
+@require_admin
+def admin_bulk_update(table_name):
+    """Set one column on every row matching a filter (streams NDJSON progress)"""
+    if table_name not in AVAILABLE_TABLES:
+        return jsonify({'error': 'Invalid table name'}), 404
+    id_column = AVAILABLE_TABLES[table_name]['id_column']
+    column_names = [c['name'] for c in get_table_schema(table_name)]
+    where, error = _bulk_filter(column_names)
+    if error:
+        return jsonify({'error': error}), 400
+    set_column = request.form.get('set_col')
+    if set_column not in column_names or set_column == id_column:
+        return jsonify({'error': 'Choose a column to update.'}), 400
+    if set_column in BULK_PROTECTED_COLUMNS.get(table_name, ()):
+        return jsonify({'error': f'{set_column} cannot be bulk-updated; edit the record instead.'}), 400
+    set_value = None if request.form.get('set_null') else request.form.get('set_value', '')
+    return _stream_progress(
+        table_name, bulk_update(table_name, id_column, set_column, set_value, *where)
+    )
+
+
+@admin_bp.route('/admin/<table_name>/bulk/upsert', methods=['POST'])
+@require_admin
+def admin_bulk_upsert(table_name):
+    """Insert or update rows from an uploaded CSV (streams NDJSON progress)"""
+    if table_name not in AVAILABLE_TABLES:
+        return jsonify({'error': 'Invalid table name'}), 404
+    upload = request.files.get('csv_file')
+    if not upload or not upload.filename:
+        return jsonify({'error': 'Choose a CSV file.'}), 400
+    try:
+        csv_text = upload.read().decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return jsonify({'error': 'CSV file must be UTF-8.'}), 400
+    metadata = get_schema_metadata(table_name)
+    column_names = [c['name'] for c in metadata['columns']]
+    return _stream_progress(
+        table_name, csv_upsert(table_name, metadata['primary_key'], column_names, csv_text,
+                               protected_columns=BULK_PROTECTED_COLUMNS.get(table_name, ()))
+    )
@@ -0,0 +1,158 @@
+from flask import Blueprint, jsonify, request
+from app.database import DatabaseConnection
+from app.json_rows import encode_rows, json_response
+from app.analytics_engine import get_snapshot
+from app.points_whatif import POINTS_SYSTEMS, parse_points_system, rescore_history, system_hash
+import os
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# Path to SQL queries
+QUERIES_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'database', 'queries')
+
+
+def load_sql_query(filename):
+    """Load SQL query from file"""
+    filepath = os.path.join(QUERIES_DIR, filename)
+    with open(filepath, 'r') as f:
+        return f.read()
+
+
+def _analytics_response(key, compute, query_file, params, **envelope):
+    """
+    Serve rows from the analytics engine when it is current, otherwise from the query file
+
+    Both paths return the same JSON; the X-Analytics-Source header says which one ran.
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        envelope[key] = compute(snapshot)
+        source = 'engine'
+    else:
+        db = DatabaseConnection()
+        try:
+            description, rows = db.query_tuples(load_sql_query(query_file), params)
+        finally:
+            db.close()
+        envelope[key] = encode_rows(description, rows)
+        source = 'sql'
+    response = json_response(envelope)
+    response.headers['X-Analytics-Source'] = source
+    return response
+
+
+# ============================================
+# Analytics API Endpoints
+# ============================================
+
+@analytics_bp.route('/api/analytics/seasons/<int:year>/totals')
+def season_totals(year):
+    """Races, wins, podiums, poles and points per driver or constructor in one season
+    Query params: type (driver|constructor, default driver)
+    """
+    entity_type = request.args.get('type', 'driver')
+    if entity_type not in ('driver', 'constructor'):
+        return jsonify({'error': "type must be 'driver' or 'constructor'"}), 400
+    try:
+        return _analytics_response(
+            'totals',
+            lambda snapshot: snapshot.season_totals(year, entity_type),
+            'analytics_season_totals.sql',
+            {'year': year, 'entity_type': entity_type},
+            year=year, type=entity_type
+        )
+    except Exception as e:
+        print(f"Error fetching season totals: {e}")
+        return jsonify({'error': 'Internal Server Error'}), 500
+
+
+@analytics_bp.route('/api/analytics/circuits/<circuit_id>/history')
+def circuit_history(circuit_id):
+    """Every driver's record at a circuit
+    Query params: limit (1-100, default 25)
+    """
+    limit = min(max(request.args.get('limit', 25, type=int), 1), 100)
+    try:
+        return _analytics_response(
+            'drivers',
+            lambda snapshot: snapshot.circuit_history(circuit_id, limit),
+            'analytics_circuit_history.sql',
+            {'circuit_id': circuit_id, 'limit': limit},
+            circuit_id=circuit_id
+        )
+    except Exception as e:
+        print(f"Error fetching circuit history: {e}")
+        return jsonify({'error': 'Internal Server Error'}), 500
+
+
+@analytics_bp.route('/api/analytics/head-to-head')
+def head_to_head():
+    """Season-by-season comparison of two drivers in the races they shared
+    Query params: driver_a, driver_b (required), year_from, year_to
+    """
+    driver_a = request.args.get('driver_a')
+    driver_b = request.args.get('driver_b')
+    year_from = request.args.get('year_from', type=int)
+    year_to = request.args.get('year_to', type=int)
+    if not driver_a or not driver_b:
+        return jsonify({'error': 'driver_a and driver_b are required'}), 400
+    if driver_a == driver_b:
+        return jsonify({'error': 'driver_a and driver_b must differ'}), 400
+    if year_from is not None and year_to is not None and year_from > year_to:
+        return jsonify({'error': 'year_from must be <= year_to'}), 400
+    try:
+        return _analytics_response(
+            'seasons',
+            lambda snapshot: snapshot.head_to_head(driver_a, driver_b, year_from, year_to),
+            'analytics_head_to_head.sql',
+            {'driver_a': driver_a, 'driver_b': driver_b, 'year_from': year_from, 'year_to': year_to},
+            driver_a=driver_a, driver_b=driver_b
+        )
+    except Exception as e:
+        print(f"Error fetching head-to-head: {e}")
+        return jsonify({'error': 'Internal Server Error'}), 500
+
+
+@analytics_bp.route('/api/analytics/what-if/points')
+def points_what_if():
+    """Every real season re-scored under another points system, compared with the official champions
+    Query params: system (preset key, see POINTS_SYSTEMS) or points (comma-separated, P1 first),
+                  pole_bonus (points for pole position, default 0), year_from, year_to
+    """
+    preset = request.args.get('system')
+    raw_points = request.args.get('points')
+    if preset:
+        if preset not in POINTS_SYSTEMS:
+            return jsonify({'error': f"Unknown system. Allowed: {', '.join(POINTS_SYSTEMS)}"}), 400
+        points = POINTS_SYSTEMS[preset]['points']
+    elif raw_points:
+        points = [value.strip() for value in raw_points.split(',') if value.strip()]
+    else:
+        return jsonify({'error': 'Give a system or a points list', 'systems': POINTS_SYSTEMS}), 400
+    system, error = parse_points_system(points, request.args.get('pole_bonus', 0))
+    if error:
+        return jsonify({'error': error}), 400
+    year_from = request.args.get('year_from', type=int)
+    year_to = request.args.get('year_to', type=int)
+
+    try:
+        result = rescore_history(system)
+        seasons = [
+            season for season in result['seasons']
+            if (year_from is None or season['year'] >= year_from)
+            and (year_to is None or season['year'] <= year_to)
+        ]
+        return json_response({
+            'system': {
+                'hash': system_hash(system),
+                'points': [value / 100 for value in system['points']],
+                'pole_bonus': system['pole_bonus'] / 100
+            },
+            'seasons': seasons,
+            'champions_changed': sum(season['changed'] for season in seasons),
+            # Title counts cover every season, whatever the year filter
+            'title_changes': result['title_changes']
+        })
+    except Exception as e:
+        print(f"Error re-scoring seasons: {e}")
+        return jsonify({'error': 'Internal Server Error'}), 500
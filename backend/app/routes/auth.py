@@ -6,6 +6,10 @@ from datetime import datetime, timedelta
 from app.database import DatabaseConnection
 from collections.abc import Mapping
 from app.email_utils import send_verification_email
+from app.admin_utils import cache_session_role, session_is_admin
+from app.deletion_jobs import enqueue_deletion, start_worker
+from app.analytics_engine import notify_change
+from app.routes.seasons import invalidate_season_progression
 from app.config import Config
 
 auth_bp = Blueprint('auth', __name__)
@@ -36,7 +40,7 @@ def index():
     If user is logged in, shows dashboard
     If user is not logged in, shows landing page with login/register options
     """
-    is_admin = session.get('is_admin', False)
+    is_admin = session_is_admin()
     current_app.logger.debug("Index view: user=%s, is_admin=%s", session.get('username'), is_admin)
     if 'username' in session:
         # User is logged in, show dashboard
@@ -57,7 +61,7 @@ def learn_more_page():
         'learn_more.html',
         authenticated=authenticated,
         username=session.get('username'),
-        is_admin=session.get('is_admin', False)
+        is_admin=session_is_admin()
     )
 
 @auth_bp.route('/register', methods=['GET', 'POST'])
@@ -143,10 +147,10 @@ def login():
         try:
             user = None
             if username_or_email:
-                db.execute('SELECT * FROM "user" WHERE username = %s', (username_or_email,))
+                db.execute('SELECT * FROM "user" WHERE username = %s AND deleted_at IS NULL', (username_or_email,))
                 user = db.fetchone()
                 if not user:
-                    db.execute('SELECT * FROM "user" WHERE email = %s', (username_or_email,))
+                    db.execute('SELECT * FROM "user" WHERE email = %s AND deleted_at IS NULL', (username_or_email,))
                     user = db.fetchone()
             if user and bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
                 if not user.get('email_verified'):
@@ -170,7 +174,7 @@ def login():
                             is_admin = user.is_admin if hasattr(user, 'is_admin') else False
                         except:
                             is_admin = False
-                session['is_admin'] = bool(is_admin)
+                cache_session_role(is_admin)
                 current_app.logger.info("Login success: user=%s is_admin=%s", session['username'], session['is_admin'])
                 flash('Login successful!')
                 if session['is_admin']:
@@ -269,7 +273,7 @@ def profile():
                     is_admin = False
         
         # Also update session with current is_admin status
-        session['is_admin'] = bool(is_admin)
+        cache_session_role(is_admin)
         
         return render_template('profile.html',
                              user=user,
@@ -384,9 +388,14 @@ def delete_account():
             flash('Password is incorrect.')
             return redirect(url_for('auth.profile'))
         
-        # Delete user account
-        db.execute('DELETE FROM "user" WHERE id = %s', (session['user_id'],))
+        # Tombstone the account (it can no longer log in) and queue the removal of
+        # the account and everything it owns
+        db.execute('UPDATE "user" SET deleted_at = NOW() WHERE id = %s', (session['user_id'],))
+        enqueue_deletion(db, 'user', session['user_id'], session['user_id'])
         db.commit()
+        notify_change()  # the user's races, drivers and constructors were tombstoned
+        invalidate_season_progression()
+        start_worker()
         
         # Clear session
         session.clear()
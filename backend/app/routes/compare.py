@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify, render_template, request
 from app.database import DatabaseConnection
+from app.cache_utils import TTLCache
+from app.json_rows import encode_rows, convert_row, json_response
 import os
 
 compare_bp = Blueprint('compare', __name__)
@@ -15,6 +17,17 @@ def load_sql_query(filename):
         return f.read()
 
 
+# (circuit, year) -> race ids; races are rarely added, clients cache it too and
+# fall back to /api/validate-race on a miss
+race_index_cache = TTLCache(ttl_seconds=60, max_entries=1)
+RACE_INDEX_MAX_AGE = 300
+
+
+def invalidate_race_index():
+    """Drop the cached race index after a race is created, moved or deleted"""
+    race_index_cache.invalidate()
+
+
 @compare_bp.route('/compare-data')
 def compare_data():
     """Compare data page"""
@@ -68,7 +81,7 @@ def validate_race():
         query = """
             SELECT id, official_name, date, laps
             FROM race
-            WHERE circuit_id = %s AND year = %s
+            WHERE circuit_id = %s AND year = %s AND deleted_at IS NULL
         """
         db.execute(query, (circuit_id, int(year)))
         race = db.fetchone()
@@ -83,6 +96,102 @@ def validate_race():
         db.close()
 
 
+def _load_race_index():
+    db = DatabaseConnection()
+    try:
+        db.execute("""
+            SELECT circuit_id, year, id
+            FROM race
+            WHERE deleted_at IS NULL
+            ORDER BY circuit_id, year, round
+        """)
+        index = {}
+        for row in db.fetchall():
+            index.setdefault(row['circuit_id'], {}).setdefault(str(row['year']), []).append(row['id'])
+        return index
+    finally:
+        db.close()
+
+
+@compare_bp.route('/api/race-index')
+def get_race_index():
+    """
+    Map every circuit and year to its race ids (in round order)
+
+    Response: {"success": true, "races": {"monza": {"1950": [7], ...}, ...}}
+    """
+    try:
+        index = race_index_cache.get_or_load('all', _load_race_index)
+        response = jsonify({'success': True, 'races': index})
+        response.cache_control.public = True
+        response.cache_control.max_age = RACE_INDEX_MAX_AGE
+        return response
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@compare_bp.route('/api/races/<int:race_id>/entry-list')
+def get_race_entry_list(race_id):
+    """
+    Return a race and its full constructor -> drivers entry list in one round trip
+
+    Response:
+    {
+        "success": true,
+        "race": {"id", "official_name", "date", "laps", "year", "circuit_id"},
+        "constructors": [{"id", "name", "full_name", "drivers": [{"id", "name", "full_name", "abbreviation"}]}]
+    }
+    """
+    db = DatabaseConnection()
+    try:
+        db.execute("""
+            SELECT id, official_name, date, laps, year, circuit_id
+            FROM race
+            WHERE id = %s AND deleted_at IS NULL
+        """, (race_id,))
+        race = db.fetchone()
+        if not race:
+            return jsonify({'success': False, 'error': 'Race not found'}), 404
+
+        db.execute("""
+            SELECT DISTINCT
+                c.id AS constructor_id, c.name AS constructor_name, c.full_name AS constructor_full_name,
+                d.id AS driver_id, d.name AS driver_name, d.full_name AS driver_full_name, d.abbreviation
+            FROM race_data rd
+            JOIN constructor c ON rd.constructor_id = c.id AND c.deleted_at IS NULL
+            JOIN driver d ON rd.driver_id = d.id AND d.deleted_at IS NULL
+            WHERE rd.race_id = %s
+            ORDER BY c.name ASC, d.name ASC
+        """, (race_id,))
+
+        constructors = {}
+        for row in db.fetchall():
+            entry = constructors.get(row['constructor_id'])
+            if entry is None:
+                entry = constructors[row['constructor_id']] = {
+                    'id': row['constructor_id'],
+                    'name': row['constructor_name'],
+                    'full_name': row['constructor_full_name'],
+                    'drivers': []
+                }
+            entry['drivers'].append({
+                'id': row['driver_id'],
+                'name': row['driver_name'],
+                'full_name': row['driver_full_name'],
+                'abbreviation': row['abbreviation']
+            })
+
+        return jsonify({
+            'success': True,
+            'race': dict(race),
+            'constructors': list(constructors.values())
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
+
+
 @compare_bp.route('/api/constructors-by-race')
 def get_constructors_by_race():
     """Get constructors that participated in a specific race"""
@@ -96,13 +205,12 @@ def get_constructors_by_race():
         query = """
             SELECT DISTINCT c.id, c.name, c.full_name
             FROM race_data rd
-            JOIN constructor c ON rd.constructor_id = c.id
+            JOIN constructor c ON rd.constructor_id = c.id AND c.deleted_at IS NULL
             WHERE rd.race_id = %s
             ORDER BY c.name ASC
         """
-        db.execute(query, (int(race_id),))
-        constructors = [dict(row) for row in db.fetchall()]
-        return jsonify({'success': True, 'constructors': constructors})
+        description, rows = db.query_tuples(query, (int(race_id),))
+        return json_response({'success': True, 'constructors': encode_rows(description, rows)})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
     finally:
@@ -123,13 +231,12 @@ def get_drivers_by_race_constructor():
         query = """
             SELECT DISTINCT d.id, d.name, d.full_name, d.abbreviation
             FROM race_data rd
-            JOIN driver d ON rd.driver_id = d.id
+            JOIN driver d ON rd.driver_id = d.id AND d.deleted_at IS NULL
             WHERE rd.race_id = %s AND rd.constructor_id = %s
             ORDER BY d.name ASC
         """
-        db.execute(query, (int(race_id), constructor_id))
-        drivers = [dict(row) for row in db.fetchall()]
-        return jsonify({'success': True, 'drivers': drivers})
+        description, rows = db.query_tuples(query, (int(race_id), constructor_id))
+        return json_response({'success': True, 'drivers': encode_rows(description, rows)})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
     finally:
@@ -199,24 +306,13 @@ def compare_drivers():
             data['circuit_id']             # CTE9: circuit_id
         )
         
-        db.execute(query, params)
-        
-        result = db.fetchone()
+        description, rows = db.query_tuples(query, params)
         
-        if not result:
+        if not rows:
             return jsonify({'success': False, 'error': 'No comparison data found'}), 404
         
-        # Convert to dict and handle Decimal/date types for JSON serialization
-        comparison = {}
-        for key, value in dict(result).items():
-            if value is None:
-                comparison[key] = None
-            elif hasattr(value, 'isoformat'):  # date/datetime
-                comparison[key] = value.isoformat()
-            elif hasattr(value, '__float__'):  # Decimal
-                comparison[key] = float(value)
-            else:
-                comparison[key] = value
+        # Decimal -> float and date -> ISO string, picked once per column type
+        comparison = convert_row(description, rows[0])
         
         # Structure the response for easier frontend consumption
         response = {
@@ -1,6 +1,12 @@
 import os
-from flask import Blueprint, render_template, session, jsonify, request, current_app
+from flask import Blueprint, render_template, session, jsonify, request, current_app, url_for
 from app.database import DatabaseConnection
+from app.cache_utils import TTLCache
+from app.json_rows import encode_rows, column_value, json_response
+from app.admin_utils import session_is_admin
+from app.deletion_jobs import enqueue_deletion, start_worker
+from app.analytics_engine import notify_change
+from app.routes.seasons import invalidate_season_progression
 
 constructors_bp = Blueprint("constructors", __name__)
 
@@ -19,7 +25,7 @@ def constructors_page():
         "constructors.html",
         authenticated=authenticated,
         username=session.get('username'),
-        is_admin=session.get('is_admin', False)
+        is_admin=session_is_admin()
     )       
 
 # API route fetches the data
@@ -41,6 +47,8 @@ def get_constructors_data():
     offset = (page - 1) * per_page
 
     is_above_avg = request.args.get('above_avg') == 'true'
+    # top share of the constructor's country, only with above_avg (10, 25 or 50 percent)
+    raw_top_pct = request.args.get('top_pct', type=int)
 
     if is_above_avg:
             sql_file = 'constructors_above_avg.sql'
@@ -58,6 +66,8 @@ def get_constructors_data():
         'limit': per_page,
         'offset': offset
     }
+    if is_above_avg:
+        filters['top_pct'] = raw_top_pct if raw_top_pct in (10, 25, 50) else None
 
     if filters['champs_min']:
         try: filters['champs_min'] = int(filters['champs_min'])
@@ -67,16 +77,13 @@ def get_constructors_data():
     try:
         # load the sql from the file
         sql_query = get_sql_query(sql_file)
-        db.execute(sql_query, filters)
-        results = db.fetchall()
+        description, rows = db.query_tuples(sql_query, filters)
 
-        data = [dict(row) for row in results]
-        
-        total_items = data[0]['full_count'] if data else 0
+        total_items = column_value(description, rows, 'full_count', 0)
         total_pages = (total_items + per_page - 1) // per_page
 
-        return jsonify({
-            'constructors': data,
+        return json_response({
+            'constructors': encode_rows(description, rows),
             'pagination': {
                 'current_page': page,
                 'total_pages': total_pages,
@@ -99,7 +106,7 @@ def get_constructor_countries():
         query = """
             SELECT DISTINCT co.name 
             FROM country co
-            JOIN constructor c ON co.id = c.country_id
+            JOIN constructor c ON co.id = c.country_id AND c.deleted_at IS NULL
             ORDER BY co.name ASC
         """
         db.execute(query)
@@ -191,7 +198,7 @@ def get_constructor_by_id(constructor_id):
                 co.name as nationality
             FROM constructor c
             LEFT JOIN country co ON c.country_id = co.id
-            WHERE c.id = %s
+            WHERE c.id = %s AND c.deleted_at IS NULL
         """
         db.execute(query, (constructor_id,))
         constructor = db.fetchone()
@@ -268,7 +275,7 @@ def edit_constructor_page(constructor_id):
     db = DatabaseConnection()
     try:
         # 1. Fetch the existing record
-        db.execute("SELECT * FROM constructor WHERE id = %s", (constructor_id,))
+        db.execute("SELECT * FROM constructor WHERE id = %s AND deleted_at IS NULL", (constructor_id,))
         record = db.fetchone()
         
         if not record:
@@ -339,6 +346,8 @@ def update_constructor(constructor_id):
         
         db.execute(update_query, data)
         db.commit()
+        notify_change('constructor')
+        invalidate_season_progression()
         
         return jsonify({'success': True, 'message': 'Constructor updated successfully'})
     except Exception as e:
@@ -355,30 +364,64 @@ def delete_constructor(constructor_id):
     try:
         user_id = session.get('user_id')
         
-        # Only allow deletion of user-created constructors
-        query = "DELETE FROM constructor WHERE id = %s AND user_id = %s AND id LIKE 'uc-%%'"
+        # Only allow deletion of user-created constructors; tombstone now and let
+        # the deletion worker remove the constructor and its results
+        query = """
+            UPDATE constructor SET deleted_at = NOW()
+            WHERE id = %s AND user_id = %s AND id LIKE 'uc-%%' AND deleted_at IS NULL
+        """
         db.execute(query, (constructor_id, user_id))
         
         if db.cursor.rowcount == 0:
             return jsonify({'success': False, 'error': 'Permission denied or record not found'}), 403
             
+        job_id = enqueue_deletion(db, 'constructor', constructor_id, user_id)
         db.commit()
-        return jsonify({'success': True})
+        notify_change('constructor')
+        invalidate_season_progression()
+        start_worker()
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('user.deletion_job_status', job_id=job_id)
+        }), 202
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
     finally:
         db.close()
 
 
+TRACK_TYPES = ('RACE', 'ROAD', 'STREET')
+
+
 @constructors_bp.route("/api/stats/track-performance")
 def get_track_performance_stats():
+    """Rank constructors (or drivers with mode=driver) by points on one track type"""
+    raw_track_type = (request.args.get('track_type') or 'STREET').upper()
+    raw_mode = request.args.get('mode', 'constructor')
+    year_from = request.args.get('year_from', type=int)
+    year_to = request.args.get('year_to', type=int)
+    limit = request.args.get('limit', 10, type=int)
+
+    if raw_track_type not in TRACK_TYPES:
+        return jsonify({'error': f"track_type must be one of {', '.join(TRACK_TYPES)}"}), 400
+    if raw_mode not in ('constructor', 'driver'):
+        return jsonify({'error': "mode must be 'constructor' or 'driver'"}), 400
+
+    params = {
+        'entity_type': raw_mode,
+        'track_type': raw_track_type,
+        'year_from': year_from,
+        'year_to': year_to,
+        'limit': max(1, min(limit, 100))
+    }
+
     db = DatabaseConnection()
     try:
-        sql_query = get_sql_query('constructor_track_performance.sql')
-        db.execute(sql_query) 
-        results = db.fetchall()
+        sql_query = get_sql_query('track_type_performance.sql')
+        description, rows = db.query_tuples(sql_query, params)
         
-        return jsonify([dict(row) for row in results])
+        return json_response(encode_rows(description, rows))
     
     except Exception as e:
         print(f"Error fetching track stats: {e}")
@@ -387,18 +430,53 @@ def get_track_performance_stats():
         db.close()
 
 
+AUDIT_DIMENSIONS = ('constructor', 'driver', 'circuit', 'user_data')
+
+# The audit scans every entity table; one result serves all dimensions and pages for a minute
+audit_cache = TTLCache(ttl_seconds=60, max_entries=1)
+
+
+def _load_activity_audit():
+    db = DatabaseConnection()
+    try:
+        db.execute(get_sql_query('activity_audit.sql'))
+        rows = [dict(row) for row in db.fetchall()]
+    finally:
+        db.close()
+
+    by_dimension = {dimension: [] for dimension in AUDIT_DIMENSIONS}
+    for row in rows:
+        by_dimension[row.pop('dimension')].append(row)
+    return by_dimension
+
+
 @constructors_bp.route("/api/stats/activity-audit")
 def get_activity_audit_stats():
-    db = DatabaseConnection()
+    """Paginated audit findings for one dimension, plus counts for every dimension"""
+    dimension = request.args.get('dimension', 'constructor')
+    if dimension not in AUDIT_DIMENSIONS:
+        return jsonify({'error': f"dimension must be one of {', '.join(AUDIT_DIMENSIONS)}"}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+
     try:
-        sql_query = get_sql_query('constructor_activity_audit.sql')
-        db.execute(sql_query)
-        results = db.fetchall()
-        
-        return jsonify([dict(row) for row in results])
+        audit = audit_cache.get_or_load('all', _load_activity_audit)
+        rows = audit[dimension]
+        total_items = len(rows)
+        offset = (page - 1) * per_page
+
+        return jsonify({
+            'dimension': dimension,
+            'data': rows[offset:offset + per_page],
+            'summary': {name: len(found) for name, found in audit.items()},
+            'pagination': {
+                'current_page': page,
+                'total_pages': (total_items + per_page - 1) // per_page,
+                'total_items': total_items
+            }
+        })
     
     except Exception as e:
         print(f"Error fetching activity audit: {e}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
\ No newline at end of file
+
@@ -10,6 +10,12 @@ from flask import (
     url_for
 )
 from app.database import DatabaseConnection
+from app.deletion_jobs import enqueue_deletion, start_worker
+from app.json_rows import encode_rows, column_value, json_response
+from app.admin_utils import session_is_admin
+from app.analytics_engine import get_snapshot, notify_change
+from app.projection import Projection
+from app.routes.seasons import invalidate_season_progression
 
 drivers_bp = Blueprint("drivers", __name__)
 
@@ -34,12 +40,47 @@ def drivers_page():
         "drivers.html",
         authenticated=("username" in session),
         username=session.get("username"),
-        is_admin=session.get("is_admin", False)
+        is_admin=session_is_admin()
     )
 
 # ---------------------------------------------------------
 # API → DRIVER LIST (REAL + CUSTOM, FILTER + PAGINATION)
 # ---------------------------------------------------------
+# ?fields= whitelist; the two country joins are added only for their fields
+DRIVER_FIELDS = Projection(
+    fields={
+        "id": ("d.id", None),
+        "name": ("d.name", None),
+        "first_name": ("d.first_name", None),
+        "last_name": ("d.last_name", None),
+        "full_name": ("d.full_name", None),
+        "abbreviation": ("d.abbreviation", None),
+        "permanent_number": ("d.permanent_number", None),
+        "gender": ("d.gender", None),
+        "date_of_birth": ("d.date_of_birth", None),
+        "date_of_death": ("d.date_of_death", None),
+        "place_of_birth": ("d.place_of_birth", None),
+        "country_of_birth": ("cb.name", "country_of_birth"),
+        "nationality": ("n.name", "nationality"),
+        "best_championship_position": ("d.best_championship_position", None),
+        "best_race_result": ("d.best_race_result", None),
+        "total_championship_wins": ("d.total_championship_wins", None),
+        "total_race_starts": ("d.total_race_starts", None),
+        "total_race_wins": ("d.total_race_wins", None),
+        "total_race_laps": ("d.total_race_laps", None),
+        "total_podiums": ("d.total_podiums", None),
+        "total_points": ("d.total_points", None),
+        "total_pole_positions": ("d.total_pole_positions", None),
+        "is_real": ("d.is_real", None),
+    },
+    joins={
+        "country_of_birth": ("JOIN country cb ON cb.id = d.country_of_birth_country_id", None),
+        "nationality": ("JOIN country n ON n.id = d.nationality_country_id", None),
+    },
+    always=("id",)
+)
+
+
 @drivers_bp.route("/api/drivers")
 def get_drivers_data():
 
@@ -48,6 +89,10 @@ def get_drivers_data():
     offset = (page - 1) * per_page
     is_real_param = request.args.get("is_real")
 
+    fields, error = DRIVER_FIELDS.parse(request.args.get("fields"))
+    if error:
+        return jsonify({"error": error}), 400
+
     if is_real_param == "true":
             is_real = True
     elif is_real_param == "false":
@@ -76,17 +121,14 @@ def get_drivers_data():
 
     db = DatabaseConnection()
     try:
-        sql = get_sql_query("select_drivers.sql")
-        db.execute(sql, filters)
-
-        rows = db.fetchall()
-        results = [dict(r) for r in rows]
+        sql = DRIVER_FIELDS.render(get_sql_query("select_drivers.sql"), fields)
+        description, rows = db.query_tuples(sql, filters)
 
-        total_items = results[0]["full_count"] if results else 0
+        total_items = column_value(description, rows, "full_count", 0)
         total_pages = (total_items + per_page - 1) // per_page
 
-        return jsonify({
-            "drivers": results,
+        return json_response({
+            "drivers": encode_rows(description, rows),
             "pagination": {
                 "current_page": page,
                 "total_pages": total_pages,
@@ -282,14 +324,26 @@ def delete_driver(driver_id):
     try:
         user_id = session.get('user_id')
 
-        query = "DELETE FROM driver WHERE id = %s AND user_id = %s AND id LIKE 'ud-%%'"
+        # Tombstone now; the deletion worker removes the driver and its results
+        query = """
+            UPDATE driver SET deleted_at = NOW()
+            WHERE id = %s AND user_id = %s AND id LIKE 'ud-%%' AND deleted_at IS NULL
+        """
         db.execute(query, (driver_id, user_id))
 
         if db.cursor.rowcount == 0:
             return jsonify({'success': False, 'error': 'Permission denied or record not found'}), 403
 
+        job_id = enqueue_deletion(db, 'driver', driver_id, user_id)
         db.commit()
-        return jsonify({'success': True})
+        notify_change('driver')
+        invalidate_season_progression()
+        start_worker()
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('user.deletion_job_status', job_id=job_id)
+        }), 202
 
     except Exception as e:
         # (özellikle FK hatasını burada yakalayacağız)
@@ -317,6 +371,7 @@ def edit_driver_form_page(driver_id):
             WHERE id = %s
               AND user_id = %s
               AND is_real = FALSE
+              AND deleted_at IS NULL
             """,
             (driver_id, session.get("user_id"))
         )
@@ -462,6 +517,8 @@ def update_driver(driver_id):
 
         db.execute(update_query, params)
         db.commit()
+        notify_change('driver')
+        invalidate_season_progression()
 
         return jsonify({"success": True})
 
@@ -475,7 +532,7 @@ def update_driver(driver_id):
 
 @drivers_bp.route("/api/driver-leaderboard", methods=["GET"])
 def driver_leaderboard():
-    db = DatabaseConnection()
+    db = None
     try:
         year_from = request.args.get("year_from", type=int)
         year_to   = request.args.get("year_to", type=int)
@@ -485,10 +542,18 @@ def driver_leaderboard():
         if limit not in (10, 25, 50):
             limit = 10
 
+        # Analytics engine (if enabled and current) answers without a DB checkout
+        snapshot = get_snapshot()
+        if snapshot is None:
+            db = DatabaseConnection()
+
         # year_from/year_to boşsa: DB'den min-max al
         if year_from is None or year_to is None:
-            db.execute("SELECT MIN(year) AS min_year, MAX(year) AS max_year FROM race;")
-            r = db.fetchone()
+            if snapshot is not None:
+                r = snapshot.year_bounds()
+            else:
+                db.execute("SELECT MIN(year) AS min_year, MAX(year) AS max_year FROM race WHERE deleted_at IS NULL;")
+                r = db.fetchone()
 
             # race tablosu boşsa güvenli fallback
             min_year = r["min_year"] if r and r["min_year"] is not None else 1950
@@ -502,20 +567,23 @@ def driver_leaderboard():
         if year_from > year_to:
             return jsonify({"error": "year_from must be <= year_to"}), 400
 
+        if snapshot is not None:
+            return json_response(snapshot.leaderboard(year_from, year_to, limit))
+
         sql = get_sql_query("driver_leaderboard.sql")
 
-        db.execute(sql, {
+        description, rows = db.query_tuples(sql, {
             "year_from": year_from,
             "year_to": year_to,
             "limit": limit
         })
 
-        rows = db.fetchall()
-        return jsonify([dict(r) for r in rows])
+        return json_response(encode_rows(description, rows))
 
     except Exception as e:
         print("LEADERBOARD ERROR:", e)
         return jsonify({"error": "Leaderboard error"}), 500
 
     finally:
-        db.close()
+        if db is not None:
+            db.close()
@@ -1,6 +1,15 @@
 import os
-from flask import Blueprint, render_template, session, jsonify, request, current_app
+from flask import Blueprint, render_template, session, jsonify, request, current_app, Response, url_for
 from app.database import DatabaseConnection
+from app.snapshot_utils import get_circuit_snapshot
+from app.admin_utils import session_is_admin
+from app.deletion_jobs import enqueue_deletion, start_worker
+from app.analytics_engine import notify_change
+from app.routes.seasons import invalidate_season_progression
+from app.routes.compare import invalidate_race_index
+from app.standings_engine import schedule_recompute
+from app.json_rows import encode_rows, encode_row, column_value, json_response
+from app.projection import Projection
 
 races_bp = Blueprint("races", __name__)
 
@@ -18,7 +27,7 @@ def races_page():
         "races.html",
         authenticated=authenticated,
         username=session.get('username'),
-        is_admin=session.get('is_admin', False)
+        is_admin=session_is_admin()
     )
 
 
@@ -30,7 +39,7 @@ def race_stats_page():
         "race_stats.html",
         authenticated=authenticated,
         username=session.get('username'),
-        is_admin=session.get('is_admin', False)
+        is_admin=session_is_admin()
     )
 
 
@@ -42,7 +51,7 @@ def race_detail_page(race_id):
         "race_detail.html",
         authenticated=authenticated,
         username=session.get('username'),
-        is_admin=session.get('is_admin', False),
+        is_admin=session_is_admin(),
         race_id=race_id
     )
 
@@ -54,9 +63,42 @@ def circuit_detail_page(circuit_id):
         "circuit_detail.html",
         authenticated=authenticated,
         username=session.get('username'),
-        is_admin=session.get('is_admin', False),
+        is_admin=session_is_admin(),
         circuit_id=circuit_id
     )
+
+
+# Fields for /api/races and /api/races/<id> (?fields=); circuit/country are joined only when asked for
+RACE_FIELDS = Projection(
+    fields={
+        'id': ('r.id', None),
+        'circuit_id': ('r.circuit_id', None),
+        'year': ('r.year', None),
+        'round': ('r.round', None),
+        'date': ('r.date', None),
+        'official_name': ('r.official_name', None),
+        'qualifying_format': ('r.qualifying_format', None),
+        'laps': ('r.laps', None),
+        'qualifying_date': ('r.qualifying_date', None),
+        'is_real': ('r.is_real', None),
+        'circuit_name': ('c.full_name', 'circuit'),
+        'circuit_country': ('co.name', 'country'),
+        'circuit_place_name': ('c.place_name', 'circuit'),
+        'circuit_length': ('c.length', 'circuit'),
+        'circuit_turns': ('c.turns', 'circuit'),
+        'circuit_type': ('c.type', 'circuit'),
+        'circuit_direction': ('c.direction', 'circuit'),
+        'circuit_total_races': ('c.total_races_held', 'circuit'),
+        'circuit_latitude': ('c.latitude', 'circuit'),
+        'circuit_longitude': ('c.longitude', 'circuit'),
+    },
+    joins={
+        'circuit': ('LEFT JOIN circuit c ON r.circuit_id = c.id', None),
+        'country': ('LEFT JOIN country co ON c.country_id = co.id', 'circuit'),
+    },
+    always=('id',)
+)
+
 # API route fetches the data
 @races_bp.route("/api/races")
 def get_races_data():
@@ -74,6 +116,10 @@ def get_races_data():
     per_page = 12
     offset = (page - 1) * per_page
 
+    fields, error = RACE_FIELDS.parse(request.args.get('fields'))
+    if error:
+        return jsonify({'error': error}), 400
+
     # Handle is_real filter: 'true' = real only, 'false' = user-generated only, None = all
     if raw_is_real == 'true':
         is_real_value = True
@@ -101,17 +147,14 @@ def get_races_data():
     db = DatabaseConnection()
     try:
         # load the sql from the file
-        sql_query = get_sql_query('select_races.sql')
-        db.execute(sql_query, filters)
-        results = db.fetchall()
+        sql_query = RACE_FIELDS.render(get_sql_query('select_races.sql'), fields)
+        description, rows = db.query_tuples(sql_query, filters)
 
-        data = [dict(row) for row in results]
-        
-        total_items = data[0]['full_count'] if data else 0
+        total_items = column_value(description, rows, 'full_count', 0)
         total_pages = (total_items + per_page - 1) // per_page
 
-        return jsonify({
-            'races': data,
+        return json_response({
+            'races': encode_rows(description, rows),
             'pagination': {
                 'current_page': page,
                 'total_pages': total_pages,
@@ -132,15 +175,13 @@ def get_circuits_list():
     """API endpoint to get all circuits for dropdown filter"""
     db = DatabaseConnection()
     try:
-        db.execute("""
+        description, rows = db.query_tuples("""
             SELECT c.id, c.full_name, c.place_name, co.name as country_name
             FROM circuit c
             LEFT JOIN country co ON c.country_id = co.id
             ORDER BY c.full_name ASC
         """)
-        results = db.fetchall()
-        circuits = [dict(row) for row in results]
-        return jsonify({'circuits': circuits})
+        return json_response({'circuits': encode_rows(description, rows)})
     except Exception as e:
         print(f"Error fetching circuits: {e}")
         return jsonify({'error': 'Internal Server Error'}), 500
@@ -173,14 +214,12 @@ def get_race_data():
     db = DatabaseConnection()
     try:
         sql_query = get_sql_query('select_race_data.sql')
-        db.execute(sql_query, params)
-        rows = db.fetchall()
-        data = [dict(row) for row in rows]
-        total_items = data[0]['full_count'] if data else 0
+        description, rows = db.query_tuples(sql_query, params)
+        total_items = column_value(description, rows, 'full_count', 0)
         total_pages = (total_items + per_page - 1) // per_page
 
-        return jsonify({
-            'race_data': data,
+        return json_response({
+            'race_data': encode_rows(description, rows),
             'pagination': {
                 'current_page': raw_page,
                 'total_pages': total_pages,
@@ -194,16 +233,76 @@ def get_race_data():
         db.close()
 
 
+# Fields for /api/race_results_full/<id> (?fields=); every join except race_data is optional
+RACE_RESULT_FIELDS = Projection(
+    fields={
+        # Race info
+        'race_id': ('r.id', None),
+        'race_year': ('r.year', None),
+        'race_round': ('r.round', None),
+        'race_name': ('r.official_name', None),
+        'race_date': ('r.date', None),
+        'total_laps': ('r.laps', None),
+        'qualifying_format': ('r.qualifying_format', None),
+        # Circuit and its country
+        'circuit_id': ('r.circuit_id', None),
+        'circuit_name': ('cir.full_name', 'circuit'),
+        'circuit_place': ('cir.place_name', 'circuit'),
+        'circuit_type': ('cir.type', 'circuit'),
+        'circuit_length_km': ('cir.length', 'circuit'),
+        'circuit_turns': ('cir.turns', 'circuit'),
+        'circuit_direction': ('cir.direction', 'circuit'),
+        'country_id': ('cir.country_id', 'circuit'),
+        'country_name': ('co.name', 'circuit_country'),
+        'country_code': ('co.alpha3_code', 'circuit_country'),
+        # Race result
+        'result_id': ('rd.id', None),
+        'finish_position': ('rd.position_display_order', None),
+        'driver_number': ('rd.driver_number', None),
+        'race_points': ('rd.race_points', None),
+        'race_pole_position': ('rd.race_pole_position', None),
+        'quali_position': ('rd.race_qualification_position_number', None),
+        'grid_position': ('rd.race_grid_position_number', None),
+        # Driver
+        'driver_id': ('rd.driver_id', None),
+        'driver_name': ('d.full_name', 'driver'),
+        'driver_abbr': ('d.abbreviation', 'driver'),
+        'driver_nationality_id': ('d.nationality_country_id', 'driver'),
+        'driver_nationality': ('dco.name', 'driver_country'),
+        # Constructor
+        'constructor_id': ('rd.constructor_id', None),
+        'constructor_name': ('con.full_name', 'constructor'),
+        'constructor_short_name': ('con.name', 'constructor'),
+    },
+    joins={
+        'circuit': ('INNER JOIN circuit cir ON r.circuit_id = cir.id', None),
+        'circuit_country': ('INNER JOIN country co ON cir.country_id = co.id', 'circuit'),
+        'driver': ('INNER JOIN driver d ON rd.driver_id = d.id', None),
+        'constructor': ('INNER JOIN constructor con ON rd.constructor_id = con.id', None),
+        'driver_country': ('LEFT JOIN country dco ON d.nationality_country_id = dco.id', 'driver'),
+    },
+    always=('result_id',)
+)
+
+
 @races_bp.route("/api/race_results_full/<int:race_id>")
 def get_race_results_full(race_id):
     """Return full race results with complex 6-table join.
     Includes: race, circuit, country, race_data, driver, constructor, driver nationality.
-    Query params: page (int)
+    Query params: page (int), fields (comma-separated, see RACE_RESULT_FIELDS),
+    format=normalized (see _normalized_race_results)
     """
     raw_page = request.args.get('page', 1, type=int)
     per_page = 50
     offset = (raw_page - 1) * per_page
 
+    if request.args.get('format') == 'normalized':
+        return _normalized_race_results(race_id, raw_page, per_page)
+
+    fields, error = RACE_RESULT_FIELDS.parse(request.args.get('fields'))
+    if error:
+        return jsonify({'error': error}), 400
+
     params = {
         'race_id': race_id,
         'limit': per_page,
@@ -212,15 +311,13 @@ def get_race_results_full(race_id):
 
     db = DatabaseConnection()
     try:
-        sql_query = get_sql_query('select_race_results_full.sql')
-        db.execute(sql_query, params)
-        rows = db.fetchall()
-        data = [dict(row) for row in rows]
-        total_items = data[0]['full_count'] if data else 0
+        sql_query = RACE_RESULT_FIELDS.render(get_sql_query('select_race_results_full.sql'), fields)
+        description, rows = db.query_tuples(sql_query, params)
+        total_items = column_value(description, rows, 'full_count', 0)
         total_pages = (total_items + per_page - 1) // per_page
 
-        return jsonify({
-            'race_results': data,
+        return json_response({
+            'race_results': encode_rows(description, rows),
             'pagination': {
                 'current_page': raw_page,
                 'total_pages': total_pages,
@@ -234,6 +331,98 @@ def get_race_results_full(race_id):
         db.close()
 
 
+def _normalized_race_results(race_id, page, per_page):
+    """
+    Race results with the race/circuit/country sent once instead of on every row
+
+    Response:
+    {
+        "race": {...}, "circuit": {...}, "country": {...},
+        "constructors": [{"id", "name", "short_name"}],   # results.constructor indexes this
+        "nationalities": ["Dutch", ...],                  # results.nationality indexes this
+        "results": {"result_id": [...], "finish_position": [...], ...},   # one array per column
+        "pagination": {...}
+    }
+    """
+    db = DatabaseConnection()
+    try:
+        db.execute(get_sql_query('race_results_header.sql'), {'race_id': race_id})
+        header = db.fetchone()
+        if not header:
+            return jsonify({'error': 'Race not found'}), 404
+
+        description, rows = db.query_tuples(get_sql_query('race_results_rows.sql'), {
+            'race_id': race_id,
+            'limit': per_page,
+            'offset': (page - 1) * per_page
+        })
+        total_items = column_value(description, rows, 'full_count', 0)
+        columns = {column.name: [row[index] for row in rows] for index, column in enumerate(description)}
+        columns.pop('full_count')
+
+        # Dictionary-encode constructors and driver nationalities (first-seen order)
+        row_constructor_ids = columns.pop('constructor_id')
+        row_country_ids = columns.pop('nationality_country_id')
+        constructor_ids = list(dict.fromkeys(c for c in row_constructor_ids if c is not None))
+        country_ids = list(dict.fromkeys(c for c in row_country_ids if c is not None))
+
+        db.execute('SELECT id, full_name, name FROM constructor WHERE id = ANY(%s)', (constructor_ids,))
+        constructor_rows = {row['id']: row for row in db.fetchall()}
+        db.execute('SELECT id, name FROM country WHERE id = ANY(%s)', (country_ids,))
+        country_names = {row['id']: row['name'] for row in db.fetchall()}
+
+        constructor_index = {cid: i for i, cid in enumerate(constructor_ids)}
+        country_index = {cid: i for i, cid in enumerate(country_ids)}
+        columns['constructor'] = [None if cid is None else constructor_index[cid] for cid in row_constructor_ids]
+        columns['nationality'] = [None if cid is None else country_index[cid] for cid in row_country_ids]
+
+        return json_response({
+            'race': {
+                'id': header['race_id'],
+                'year': header['year'],
+                'round': header['round'],
+                'name': header['name'],
+                'date': header['date'],
+                'laps': header['laps'],
+                'qualifying_format': header['qualifying_format']
+            },
+            'circuit': {
+                'id': header['circuit_id'],
+                'name': header['circuit_name'],
+                'place': header['circuit_place'],
+                'type': header['circuit_type'],
+                'length_km': header['circuit_length_km'],
+                'turns': header['circuit_turns'],
+                'direction': header['circuit_direction']
+            },
+            'country': {
+                'id': header['country_id'],
+                'name': header['country_name'],
+                'code': header['country_code']
+            },
+            'constructors': [
+                {
+                    'id': cid,
+                    'name': constructor_rows[cid]['full_name'] if cid in constructor_rows else None,
+                    'short_name': constructor_rows[cid]['name'] if cid in constructor_rows else None
+                }
+                for cid in constructor_ids
+            ],
+            'nationalities': [country_names.get(cid) for cid in country_ids],
+            'results': columns,
+            'pagination': {
+                'current_page': page,
+                'total_pages': (total_items + per_page - 1) // per_page,
+                'total_items': total_items
+            }
+        })
+    except Exception as e:
+        print(f"Error fetching normalized race results: {e}")
+        return jsonify({'error': 'Internal Server Error'}), 500
+    finally:
+        db.close()
+
+
 @races_bp.route('/race-data/new')
 def add_race_data_form_page():
     """Render form to create a new race_data row"""
@@ -245,14 +434,14 @@ def add_race_data_form_page():
         user_id = session.get('user_id')
         # fetch only user-created races (is_real = FALSE) for dropdown
         db.execute("""SELECT id, official_name, year FROM race 
-                      WHERE is_real = FALSE AND user_id = %s 
+                      WHERE is_real = FALSE AND user_id = %s AND deleted_at IS NULL
                       ORDER BY year DESC, official_name ASC""", (user_id,))
         races = db.fetchall()
 
-        db.execute("SELECT id, full_name FROM driver ORDER BY full_name ASC")
+        db.execute("SELECT id, full_name FROM driver WHERE deleted_at IS NULL ORDER BY full_name ASC")
         drivers = db.fetchall()
 
-        db.execute("SELECT id, full_name FROM constructor ORDER BY full_name ASC")
+        db.execute("SELECT id, full_name FROM constructor WHERE deleted_at IS NULL ORDER BY full_name ASC")
         constructors = db.fetchall()
 
         return render_template('add_race_data_form.html', races=races, drivers=drivers, constructors=constructors, record=None)
@@ -280,12 +469,12 @@ def edit_race_data_form_page(race_data_id):
         user_id = session.get('user_id')
         # fetch only user-created races (is_real = FALSE) for dropdown
         db.execute("""SELECT id, official_name, year FROM race 
-                      WHERE is_real = FALSE AND user_id = %s 
+                      WHERE is_real = FALSE AND user_id = %s AND deleted_at IS NULL
                       ORDER BY year DESC, official_name ASC""", (user_id,))
         races = db.fetchall()
-        db.execute("SELECT id, full_name FROM driver ORDER BY full_name ASC")
+        db.execute("SELECT id, full_name FROM driver WHERE deleted_at IS NULL ORDER BY full_name ASC")
         drivers = db.fetchall()
-        db.execute("SELECT id, full_name FROM constructor ORDER BY full_name ASC")
+        db.execute("SELECT id, full_name FROM constructor WHERE deleted_at IS NULL ORDER BY full_name ASC")
         constructors = db.fetchall()
 
         return render_template('add_race_data_form.html', races=races, drivers=drivers, constructors=constructors, record=record)
@@ -293,6 +482,23 @@ def edit_race_data_form_page(race_data_id):
         db.close()
 
 
+# Upper bound for a user-entered finishing position (the standings countback is this deep)
+MAX_POSITION_DISPLAY_ORDER = 100
+
+
+def position_display_order_error(value):
+    """Error message when a position_display_order is not an integer in 1..MAX_POSITION_DISPLAY_ORDER"""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        return 'position_display_order must be an integer'
+    try:
+        position = int(value)
+    except ValueError:
+        return 'position_display_order must be an integer'
+    if not 1 <= position <= MAX_POSITION_DISPLAY_ORDER:
+        return f'position_display_order must be between 1 and {MAX_POSITION_DISPLAY_ORDER}'
+    return None
+
+
 @races_bp.route('/api/add-race-data', methods=['POST'])
 def add_race_data():
     if 'user_id' not in session:
@@ -304,6 +510,10 @@ def add_race_data():
 
         db = DatabaseConnection()
 
+        error = position_display_order_error(data.get('position_display_order'))
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+
         insert_query = """
             INSERT INTO race_data (
                 race_id, driver_id, constructor_id, user_id,
@@ -332,6 +542,8 @@ def add_race_data():
         db.execute(insert_query, params)
         new_id = db.fetchone()[0]
         db.commit()
+        notify_change('race_data')
+        schedule_recompute([params['race_id']])
 
         return jsonify({'success': True, 'race_data_id': new_id})
     except Exception as e:
@@ -351,6 +563,10 @@ def update_race_data(race_data_id):
         user_id = session.get('user_id')
         db = DatabaseConnection()
 
+        error = position_display_order_error(data.get('position_display_order'))
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+
         update_query = """
             UPDATE race_data SET
                 race_id = %(race_id)s,
@@ -369,11 +585,17 @@ def update_race_data(race_data_id):
         params['id'] = race_data_id
         params['user_id'] = user_id
 
+        # The row may move to another race; both need their standings rebuilt
+        db.execute("SELECT race_id FROM race_data WHERE id = %s AND user_id = %s", (race_data_id, user_id))
+        previous = db.fetchone()
+
         db.execute(update_query, params)
         if db.cursor.rowcount == 0:
             return jsonify({'success': False, 'error': 'Permission denied or record not found'}), 403
 
         db.commit()
+        notify_change('race_data')
+        schedule_recompute([previous['race_id'], params.get('race_id')])
         return jsonify({'success': True})
     except Exception as e:
         print(f"Error updating race_data: {e}")
@@ -390,12 +612,15 @@ def delete_race_data(race_data_id):
     db = DatabaseConnection()
     try:
         user_id = session.get('user_id')
-        query = "DELETE FROM race_data WHERE id = %s AND user_id = %s"
+        query = "DELETE FROM race_data WHERE id = %s AND user_id = %s RETURNING race_id"
         db.execute(query, (race_data_id, user_id))
-        if db.cursor.rowcount == 0:
+        deleted = db.fetchone()
+        if deleted is None:
             return jsonify({'success': False, 'error': 'Permission denied or record not found'}), 403
 
         db.commit()
+        notify_change('race_data')
+        schedule_recompute([deleted['race_id']])
         return jsonify({'success': True})
     except Exception as e:
         print(f"Error deleting race_data: {e}")
@@ -417,7 +642,7 @@ def add_race_page():
             "add_race.html",
             authenticated=authenticated,
             username=session.get('username'),
-            is_admin=session.get('is_admin', False),
+            is_admin=session_is_admin(),
             countries=countries
         )
     finally:
@@ -487,7 +712,7 @@ def edit_race_form_page(race_id):
     db = DatabaseConnection()
     try:
         # Fetch the existing record
-        db.execute("SELECT * FROM race WHERE id = %s", (race_id,))
+        db.execute("SELECT * FROM race WHERE id = %s AND deleted_at IS NULL", (race_id,))
         record = db.fetchone()
         
         if not record:
@@ -581,6 +806,8 @@ def add_race():
         
         db.execute(insert_query, params)
         db.commit()
+        notify_change('race')
+        invalidate_race_index()
         
         return jsonify({
             'success': True,
@@ -615,18 +842,26 @@ def update_race(race_id):
                 qualifying_format = %(qualifying_format)s,
                 laps = %(laps)s,
                 qualifying_date = %(qualifying_date)s
+            FROM (SELECT year AS old_year, round AS old_round FROM race WHERE id = %(id)s) old
             WHERE id = %(id)s AND user_id = %(user_id)s AND is_real = FALSE
+            RETURNING old.old_year, old.old_round
         """
         
         data['id'] = race_id
         data['user_id'] = session.get('user_id')
         
         db.execute(update_query, data)
+        previous = db.fetchone()
         
-        if db.cursor.rowcount == 0:
+        if previous is None:
             return jsonify({'success': False, 'error': 'Permission denied or record not found'}), 403
         
         db.commit()
+        notify_change('race')
+        invalidate_season_progression()
+        invalidate_race_index()
+        # Rebuild where the race is now and where it used to be
+        schedule_recompute([race_id], [(previous['old_year'], previous['old_round'])])
         
         return jsonify({'success': True, 'message': 'Race updated successfully'})
     except Exception as e:
@@ -646,15 +881,29 @@ def delete_race(race_id):
     try:
         user_id = session.get('user_id')
         
-        # Only allow deletion of user-created races (is_real = FALSE)
-        query = "DELETE FROM race WHERE id = %s AND user_id = %s AND is_real = FALSE"
+        # Only allow deletion of user-created races (is_real = FALSE); tombstone now
+        # and let the deletion worker remove the race and its results
+        query = """
+            UPDATE race SET deleted_at = NOW()
+            WHERE id = %s AND user_id = %s AND is_real = FALSE AND deleted_at IS NULL
+        """
         db.execute(query, (race_id, user_id))
         
         if db.cursor.rowcount == 0:
             return jsonify({'success': False, 'error': 'Permission denied or record not found'}), 403
             
+        job_id = enqueue_deletion(db, 'race', race_id, user_id)
         db.commit()
-        return jsonify({'success': True})
+        notify_change('race')
+        invalidate_season_progression()
+        invalidate_race_index()
+        schedule_recompute([race_id])
+        start_worker()
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('user.deletion_job_status', job_id=job_id)
+        }), 202
     except Exception as e:
         print(f"Error deleting race: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -664,34 +913,27 @@ def delete_race(race_id):
 
 @races_bp.route("/api/races/<int:race_id>")
 def get_race_by_id(race_id):
-    """Get a single race by ID"""
+    """Get a single race by ID (?fields= selects columns, see RACE_FIELDS)"""
+    raw_fields = request.args.get('fields')
+    # Without ?fields= keep the original detail payload (no is_real)
+    fields, error = RACE_FIELDS.parse(raw_fields or ','.join(f for f in RACE_FIELDS.fields if f != 'is_real'))
+    if error:
+        return jsonify({'error': error}), 400
+
     db = DatabaseConnection()
     try:
-        db.execute("""
-            SELECT 
-                r.id, r.circuit_id, r.year, r.round, r.date, r.official_name,
-                r.qualifying_format, r.laps, r.qualifying_date,
-                c.full_name AS circuit_name,
-                c.place_name AS circuit_place_name,
-                c.length AS circuit_length,
-                c.turns AS circuit_turns,
-                c.type AS circuit_type,
-                c.direction AS circuit_direction,
-                c.total_races_held AS circuit_total_races,
-                c.latitude AS circuit_latitude,
-                c.longitude AS circuit_longitude,
-                co.name AS circuit_country
+        description, rows = db.query_tuples(RACE_FIELDS.render("""
+            SELECT
+                {columns}
             FROM race r
-            LEFT JOIN circuit c ON r.circuit_id = c.id
-            LEFT JOIN country co ON c.country_id = co.id
-            WHERE r.id = %(race_id)s
-        """, {'race_id': race_id})
-        result = db.fetchone()
+            {joins}
+            WHERE r.id = %(race_id)s AND r.deleted_at IS NULL
+        """, fields), {'race_id': race_id})
         
-        if not result:
+        if not rows:
             return jsonify({'error': 'Race not found'}), 404
             
-        return jsonify(dict(result))
+        return json_response(encode_row(description, rows[0]))
     except Exception as e:
         print(f"Error fetching race: {e}")
         return jsonify({'error': str(e)}), 500
@@ -700,54 +942,15 @@ def get_race_by_id(race_id):
 
 @races_bp.route("/api/circuits/<circuit_id>")
 def get_circuit_by_id(circuit_id):
-    """Get circuit details by ID."""
-    db = DatabaseConnection()
+    """Get circuit details by ID (served from the circuit_snapshot cache)."""
     try:
-        sql_query = get_sql_query('get_circuit_detail.sql')
-        db.execute(sql_query, {'circuit_id': circuit_id})
-        row = db.fetchone()
-        if not row:
+        body, _ = get_circuit_snapshot(circuit_id)
+        if body is None:
             return jsonify({'error': 'Circuit not found'}), 404
-
-        payload = dict(row)
-        circuit = {
-            'id': payload.get('id'),
-            'name': payload.get('name'),
-            'full_name': payload.get('full_name'),
-            'place_name': payload.get('place_name'),
-            'type': payload.get('type'),
-            'direction': payload.get('direction'),
-            'length': payload.get('length'),
-            'turns': payload.get('turns'),
-            'total_races_held': payload.get('total_races_held'),
-            'latitude': payload.get('latitude'),
-            'longitude': payload.get('longitude'),
-            'country_name': payload.get('country_name')
-        }
-        stats = {
-            'total_races': payload.get('total_races') or 0,
-            'official_races': payload.get('official_races') or 0,
-            'simulated_races': payload.get('simulated_races') or 0,
-            'first_year': payload.get('first_year'),
-            'last_year': payload.get('last_year'),
-            'avg_laps': float(payload['avg_laps']) if payload.get('avg_laps') is not None else None,
-            'unique_winners': payload.get('unique_winners') or 0,
-            'home_drivers': payload.get('home_drivers') or 0,
-            'home_constructors': payload.get('home_constructors') or 0
-        }
-
-        response = {
-            'circuit': circuit,
-            'stats': stats,
-            'races': payload.get('races') or []
-        }
-
-        return jsonify(response)
+        return Response(body, mimetype='application/json')
     except Exception as e:
         print(f"Error fetching circuit: {e}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
 
 @races_bp.route("/api/circuits/<circuit_id>/races")
 def get_races_for_circuit(circuit_id):
@@ -755,10 +958,8 @@ def get_races_for_circuit(circuit_id):
     db = DatabaseConnection()
     try:
         query = get_sql_query('get_circuit_races.sql')
-        db.execute(query, {'circuit_id': circuit_id})
-        rows = db.fetchall()
-        data = [dict(row) for row in rows]
-        return jsonify({'races': data})
+        description, rows = db.query_tuples(query, {'circuit_id': circuit_id})
+        return json_response({'races': encode_rows(description, rows)})
     except Exception as e:
         print(f"Error fetching circuit races: {e}")
         return jsonify({'error': str(e)}), 500
@@ -770,7 +971,7 @@ def get_race_constructor_standings(race_id):
     """Get constructor championship standings after a specific race."""
     db = DatabaseConnection()
     try:
-        db.execute("""
+        description, rows = db.query_tuples("""
             SELECT 
                 rcs.position_number,
                 rcs.points,
@@ -778,13 +979,13 @@ def get_race_constructor_standings(race_id):
                 c.full_name AS constructor_name,
                 co.name AS country_name
             FROM race_constructor_standing rcs
-            JOIN constructor c ON rcs.constructor_id = c.id
+            JOIN race r ON rcs.race_id = r.id AND r.deleted_at IS NULL
+            JOIN constructor c ON rcs.constructor_id = c.id AND c.deleted_at IS NULL
             LEFT JOIN country co ON c.country_id = co.id
             WHERE rcs.race_id = %s
             ORDER BY rcs.position_number ASC
         """, (race_id,))
-        rows = db.fetchall()
-        return jsonify({'standings': [dict(r) for r in rows]})
+        return json_response({'standings': encode_rows(description, rows)})
     except Exception as e:
         print(f"Error fetching constructor standings: {e}")
         return jsonify({'error': str(e)}), 500
@@ -797,7 +998,7 @@ def get_race_driver_standings(race_id):
     """Get driver championship standings after a specific race."""
     db = DatabaseConnection()
     try:
-        db.execute("""
+        description, rows = db.query_tuples("""
             SELECT 
                 rds.position_number,
                 rds.points,
@@ -806,13 +1007,13 @@ def get_race_driver_standings(race_id):
                 d.abbreviation,
                 co.name AS nationality
             FROM race_driver_standing rds
-            JOIN driver d ON rds.driver_id = d.id
+            JOIN race r ON rds.race_id = r.id AND r.deleted_at IS NULL
+            JOIN driver d ON rds.driver_id = d.id AND d.deleted_at IS NULL
             LEFT JOIN country co ON d.nationality_country_id = co.id
             WHERE rds.race_id = %s
             ORDER BY rds.position_number ASC
         """, (race_id,))
-        rows = db.fetchall()
-        return jsonify({'standings': [dict(r) for r in rows]})
+        return json_response({'standings': encode_rows(description, rows)})
     except Exception as e:
         print(f"Error fetching driver standings: {e}")
         return jsonify({'error': str(e)}), 500
@@ -848,24 +1049,25 @@ def races_by_year():
         'race_count_max': int(raw_race_count_max) if raw_race_count_max else None,
         'avg_laps_min': float(raw_avg_laps_min) if raw_avg_laps_min else None,
         'avg_laps_max': float(raw_avg_laps_max) if raw_avg_laps_max else None,
-        'sort_by': raw_sort_by if raw_sort_by in ['year', 'race_count', 'avg_laps'] else 'year',
-        'sort_dir': raw_sort_dir if raw_sort_dir in ['ASC', 'DESC'] else 'DESC',
         'limit': per_page,
         'offset': offset
     }
 
+    # Whitelisted sort; year breaks ties so each order matches a rollup index
+    sort_by = raw_sort_by if raw_sort_by in ['year', 'race_count', 'avg_laps'] else 'year'
+    sort_dir = raw_sort_dir if raw_sort_dir in ['ASC', 'DESC'] else 'DESC'
+    order_by = f"year {sort_dir}" if sort_by == 'year' else f"{sort_by} {sort_dir}, year {sort_dir}"
+
     db = DatabaseConnection()
     try:
-        sql = get_sql_query('race_stats_by_year.sql')
-        db.execute(sql, params)
-        rows = db.fetchall()
-        data = [dict(r) for r in rows]
+        sql = get_sql_query('race_stats_by_year.sql').format(order_by=order_by)
+        description, rows = db.query_tuples(sql, params)
         
-        total_items = data[0]['full_count'] if data else 0
+        total_items = column_value(description, rows, 'full_count', 0)
         total_pages = (total_items + per_page - 1) // per_page
         
-        return jsonify({
-            'data': data,
+        return json_response({
+            'data': encode_rows(description, rows),
             'pagination': {
                 'current_page': page,
                 'total_pages': total_pages,
@@ -0,0 +1,164 @@
+from flask import Blueprint, current_app, jsonify, request
+from app.database import DatabaseConnection
+from app.cache_utils import TTLCache
+from app.title_projection import project_season
+import hashlib
+import os
+
+seasons_bp = Blueprint('seasons', __name__)
+
+# Path to SQL queries
+QUERIES_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'database', 'queries')
+
+
+def load_sql_query(filename):
+    """Load SQL query from file"""
+    filepath = os.path.join(QUERIES_DIR, filename)
+    with open(filepath, 'r') as f:
+        return f.read()
+
+
+# (year, type) -> (encoded body, etag); dropped when a season's standings are rewritten
+progression_cache = TTLCache(ttl_seconds=300, max_entries=128)
+PROGRESSION_MAX_AGE = 60
+
+
+def invalidate_season_progression(year=None):
+    """Drop cached progressions for one season, or all of them"""
+    if year is None:
+        progression_cache.invalidate()
+        return
+    for entity_type in ('driver', 'constructor'):
+        progression_cache.invalidate((year, entity_type))
+
+
+def build_standings_progression(db, year, entity_type):
+    """
+    Standings after every round of a season as rounds x competitors matrices
+
+    Returns:
+        dict: {'year', 'type', 'rounds', 'competitors', 'points', 'positions'};
+              points[i][j] / positions[i][j] belong to rounds[i] and competitors[j]
+              (None where the competitor has no standing yet). Competitors are
+              ordered by their standing after the last round.
+    """
+    db.execute(load_sql_query('season_standings_progression.sql'),
+               {'year': year, 'entity_type': entity_type})
+    rounds, round_index = [], {}
+    competitors, competitor_index = [], {}
+    cells = []
+    for row in db.fetchall():
+        if row['race_id'] not in round_index:
+            round_index[row['race_id']] = len(rounds)
+            rounds.append({
+                'race_id': row['race_id'],
+                'round': row['round'],
+                'name': row['official_name'],
+                'date': row['date'].isoformat() if row['date'] else None
+            })
+        if row['entity_id'] not in competitor_index:
+            competitor_index[row['entity_id']] = len(competitors)
+            competitors.append({'id': row['entity_id'], 'name': row['name']})
+        cells.append((round_index[row['race_id']], competitor_index[row['entity_id']],
+                      float(row['points']), row['position_number']))
+
+    points = [[None] * len(competitors) for _ in rounds]
+    positions = [[None] * len(competitors) for _ in rounds]
+    for round_i, competitor_i, round_points, position in cells:
+        points[round_i][competitor_i] = round_points
+        positions[round_i][competitor_i] = position
+
+    # Column order: final standing, then anyone missing from it by their last known points
+    if rounds:
+        final_positions = positions[-1]
+        last_points = [
+            next((row[j] for row in reversed(points) if row[j] is not None), 0)
+            for j in range(len(competitors))
+        ]
+        order = sorted(range(len(competitors)), key=lambda j: (
+            final_positions[j] is None, final_positions[j] or 0, -last_points[j], competitors[j]['id']
+        ))
+        competitors = [competitors[j] for j in order]
+        points = [[row[j] for j in order] for row in points]
+        positions = [[row[j] for j in order] for row in positions]
+
+    return {
+        'year': year,
+        'type': entity_type,
+        'rounds': rounds,
+        'competitors': competitors,
+        'points': points,
+        'positions': positions
+    }
+
+
+def _load_progression(year, entity_type):
+    db = DatabaseConnection()
+    try:
+        payload = build_standings_progression(db, year, entity_type)
+    finally:
+        db.close()
+    body = (current_app.json.dumps(payload) + '\n').encode('utf-8')
+    return body, hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+@seasons_bp.route('/api/seasons/<int:year>/standings-progression')
+def standings_progression(year):
+    """
+    Championship standings after every round of a season, in one response
+
+    Query params: type (driver|constructor, default driver)
+    Response:
+    {
+        "year": 2023, "type": "driver",
+        "rounds": [{"race_id", "round", "name", "date"}],
+        "competitors": [{"id", "name"}],
+        "points": [[...], ...],       # one row per round, one column per competitor
+        "positions": [[...], ...]
+    }
+    """
+    entity_type = request.args.get('type', 'driver')
+    if entity_type not in ('driver', 'constructor'):
+        return jsonify({'error': "type must be 'driver' or 'constructor'"}), 400
+    try:
+        body, etag = progression_cache.get_or_load(
+            (year, entity_type), lambda: _load_progression(year, entity_type)
+        )
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = PROGRESSION_MAX_AGE
+        return response.make_conditional(request)
+    except Exception as e:
+        print(f"Error fetching standings progression: {e}")
+        return jsonify({'error': 'Internal Server Error'}), 500
+
+
+@seasons_bp.route('/api/seasons/<int:year>/projection')
+def season_projection(year):
+    """
+    Monte Carlo title probabilities from the season's remaining rounds
+
+    Query params: budget_ms (time budget for the simulations, default 2000)
+    Response:
+    {
+        "year": 2023, "completed_rounds": 12, "remaining_rounds": 10,
+        "points_per_position": [...], "simulations": 50000, "elapsed_ms": 840,
+        "drivers": [{"driver_id", "driver_name", "points", "wins",
+                     "title_probability", "expected_points", "expected_position"}]
+    }
+    Results are cached until the data changes, whatever budget a later request asks for.
+    """
+    config = current_app.config
+    budget_ms = request.args.get('budget_ms', 2000, type=int)
+    budget_ms = min(max(budget_ms, 100), config['PROJECTION_MAX_BUDGET_MS'])
+    try:
+        projection = project_season(
+            year, budget_ms / 1000, config['PROJECTION_MAX_SIMULATIONS'], config['PROJECTION_WORKERS']
+        )
+        if projection is None:
+            return jsonify({'error': 'Season has no completed rounds to project from'}), 404
+        return jsonify(projection)
+    except Exception as e:
+        print(f"Error projecting season: {e}")
+        return jsonify({'error': 'Internal Server Error'}), 500
@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify, render_template, request, session
 from app.database import DatabaseConnection  # Import your wrapper
+from app.admin_utils import session_is_admin
+from app.deletion_jobs import get_deletion_job
 
 user_bp = Blueprint('user', __name__)
 
@@ -49,7 +51,7 @@ def user_constructors_list():
     
     try:
         user_id = session.get('user_id')
-        query = "SELECT * FROM constructor WHERE id LIKE 'uc-%%' AND user_id = %s ORDER BY name ASC"
+        query = "SELECT * FROM constructor WHERE id LIKE 'uc-%%' AND user_id = %s AND deleted_at IS NULL ORDER BY name ASC"
         db.execute(query, (user_id,))
         records = db.fetchall()
         
@@ -84,6 +86,7 @@ def user_drivers_list():
             FROM driver
             WHERE id LIKE 'ud-%%'
               AND user_id = %s
+              AND deleted_at IS NULL
             ORDER BY full_name ASC
         """
         db.execute(query, (user_id,))
@@ -119,7 +122,7 @@ def user_races_list():
         query = """SELECT r.*, c.full_name as circuit_name 
                    FROM race r 
                    LEFT JOIN circuit c ON r.circuit_id = c.id 
-                   WHERE r.is_real = FALSE AND r.user_id = %s 
+                   WHERE r.is_real = FALSE AND r.user_id = %s AND r.deleted_at IS NULL
                    ORDER BY r.year DESC, r.round DESC"""
         db.execute(query, (user_id,))
         records = db.fetchall()
@@ -166,6 +169,7 @@ def user_race_data_list():
                    LEFT JOIN driver d ON rd.driver_id = d.id
                    LEFT JOIN constructor c ON rd.constructor_id = c.id
                    WHERE rd.user_id = %s
+                     AND COALESCE(r.deleted_at, d.deleted_at, c.deleted_at) IS NULL
                    ORDER BY rd.created_at DESC NULLS LAST"""
         db.execute(query, (user_id,))
         records = db.fetchall()
@@ -179,4 +183,20 @@ def user_race_data_list():
     return render_template('user_table_list.html',
                            records=records,
                            schema=schema,
-                           title="My Race Data")
\ No newline at end of file
+                           title="My Race Data")
+
+
+@user_bp.route('/api/deletion-jobs/<int:job_id>')
+def deletion_job_status(job_id):
+    """Progress of a background deletion (requester or admin only)"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Not authenticated'}), 401
+
+    job = get_deletion_job(job_id)
+    if not job or (job['requested_by'] != session['user_id'] and not session_is_admin()):
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    for key in ('created_at', 'started_at', 'finished_at'):
+        if job[key] is not None:
+            job[key] = job[key].isoformat()
+    return jsonify({'success': True, 'job': job})
@@ -0,0 +1,145 @@
+"""
+Pre-serialized circuit detail responses
+
+`/api/circuits/<circuit_id>` is served from the circuit_snapshot table. Database
+triggers bump a circuit's snapshot version (and clear its payload) whenever a race,
+race_data row, the circuit itself, or any driver/constructor changes. A rebuilt
+payload is only stored if the version is still the one read before building, so a
+write that lands mid-build never leaves a stale snapshot behind.
+"""
+import os
+from flask import current_app
+from app.database import DatabaseConnection
+
+
+def _circuit_detail_sql():
+    query_path = os.path.join(current_app.root_path, '..', '..', 'database', 'queries', 'get_circuit_detail.sql')
+    with open(query_path, 'r') as file:
+        return file.read()
+
+
+def build_circuit_payload(db, circuit_id):
+    """
+    Run get_circuit_detail.sql and shape the API response
+
+    Returns:
+        dict: {'circuit', 'stats', 'races'} or None if the circuit does not exist
+    """
+    db.execute(_circuit_detail_sql(), {'circuit_id': circuit_id})
+    row = db.fetchone()
+    if not row:
+        return None
+
+    payload = dict(row)
+    circuit = {
+        'id': payload.get('id'),
+        'name': payload.get('name'),
+        'full_name': payload.get('full_name'),
+        'place_name': payload.get('place_name'),
+        'type': payload.get('type'),
+        'direction': payload.get('direction'),
+        'length': payload.get('length'),
+        'turns': payload.get('turns'),
+        'total_races_held': payload.get('total_races_held'),
+        'latitude': payload.get('latitude'),
+        'longitude': payload.get('longitude'),
+        'country_name': payload.get('country_name')
+    }
+    stats = {
+        'total_races': payload.get('total_races') or 0,
+        'official_races': payload.get('official_races') or 0,
+        'simulated_races': payload.get('simulated_races') or 0,
+        'first_year': payload.get('first_year'),
+        'last_year': payload.get('last_year'),
+        'avg_laps': float(payload['avg_laps']) if payload.get('avg_laps') is not None else None,
+        'unique_winners': payload.get('unique_winners') or 0,
+        'home_drivers': payload.get('home_drivers') or 0,
+        'home_constructors': payload.get('home_constructors') or 0
+    }
+
+    return {
+        'circuit': circuit,
+        'stats': stats,
+        'races': payload.get('races') or []
+    }
+
+
+def serialize_payload(payload):
+    """Encode a payload exactly as jsonify() would"""
+    return (current_app.json.dumps(payload) + '\n').encode('utf-8')
+
+
+def get_circuit_snapshot(circuit_id, db=None):
+    """
+    Return the serialized circuit detail response, rebuilding it on a miss
+
+    Args:
+        circuit_id: Circuit ID
+        db: Optional open DatabaseConnection (left open for the caller)
+
+    Returns:
+        tuple: (bytes or None if the circuit does not exist, bool rebuilt)
+    """
+    owns_db = db is None
+    db = db or DatabaseConnection()
+    try:
+        db.execute('SELECT version, payload FROM circuit_snapshot WHERE circuit_id = %s', (circuit_id,))
+        row = db.fetchone()
+        if row and row['payload'] is not None:
+            db.commit()
+            return bytes(row['payload']), False
+
+        if row is None:
+            # Commit an empty row first: the invalidate-all trigger only bumps
+            # existing rows, so a driver/constructor write during the build must
+            # find this one to be detected
+            db.execute("""
+                INSERT INTO circuit_snapshot (circuit_id, version)
+                SELECT id, 0 FROM circuit WHERE id = %s
+                ON CONFLICT (circuit_id) DO NOTHING
+            """, (circuit_id,))
+            db.execute('SELECT version FROM circuit_snapshot WHERE circuit_id = %s', (circuit_id,))
+            row = db.fetchone()
+            db.commit()
+            if row is None:
+                return None, False
+
+        payload = build_circuit_payload(db, circuit_id)
+        if payload is None:
+            db.commit()
+            return None, False
+        body = serialize_payload(payload)
+
+        db.execute("""
+            UPDATE circuit_snapshot
+            SET payload = %s, built_at = NOW()
+            WHERE circuit_id = %s AND version = %s
+        """, (body, circuit_id, row['version']))
+        db.commit()
+        return body, True
+    except Exception:
+        db.conn.rollback()
+        raise
+    finally:
+        if owns_db:
+            db.close()
+
+
+def warm_circuit_snapshots():
+    """
+    Build every missing circuit snapshot (run at deploy)
+
+    Returns:
+        tuple: (number rebuilt, number of circuits)
+    """
+    db = DatabaseConnection()
+    try:
+        db.execute('SELECT id FROM circuit ORDER BY id')
+        circuit_ids = [row['id'] for row in db.fetchall()]
+        rebuilt = 0
+        for circuit_id in circuit_ids:
+            _, was_built = get_circuit_snapshot(circuit_id, db)
+            rebuilt += was_built
+        return rebuilt, len(circuit_ids)
+    finally:
+        db.close()
@@ -0,0 +1,241 @@
+"""
+Championship standings for user simulation races
+
+Real seasons ship with official race_driver_standing / race_constructor_standing
+rows. User races (race.is_real = FALSE) only have race_data. Routes that change
+a user race's results call `schedule_recompute(race_ids)`. A background worker
+waits STANDINGS_DEBOUNCE_SECONDS so that a burst of uploads collapses into one
+pass. It then resolves the races to (season, first changed round) and rebuilds
+that season's standings from that round onward:
+
+  * One query reads the season's deduplicated results for every round, real and
+    user, because earlier rounds feed the running totals.
+  * Points and finishing counts are laid out as rounds x competitors matrices.
+    Cumulative sums and the per-round ranking (points, then countback on wins,
+    seconds, thirds, ...) are computed for all rounds at once.
+  * Rows for user races from the changed round onward are written with one
+    batched upsert per table. Rows for competitors that are no longer present
+    are removed. Official rows for real races are never touched.
+"""
+import threading
+import time
+from decimal import Decimal
+import numpy as np
+import psycopg2.extras
+from app.database import DatabaseConnection
+
+STANDINGS_DEBOUNCE_SECONDS = 2
+UPSERT_PAGE_SIZE = 1000
+
+_SEASON_RACES_SQL = """
+    SELECT id, round, COALESCE(is_real, FALSE) AS is_real
+    FROM race
+    WHERE year = %s AND deleted_at IS NULL
+    ORDER BY round
+"""
+# One row per (race, driver), picked like the other race_data readers
+_SEASON_RESULTS_SQL = """
+    WITH rd_dedup AS (
+        SELECT DISTINCT ON (rd.race_id, rd.driver_id) rd.*
+        FROM race_data rd
+        JOIN race r ON r.id = rd.race_id
+        WHERE r.year = %s AND r.deleted_at IS NULL
+        ORDER BY rd.race_id, rd.driver_id, rd.is_real DESC, rd.created_at DESC, rd.id DESC
+    )
+    SELECT rd.race_id, rd.driver_id, rd.constructor_id, rd.position_display_order,
+           COALESCE((rd.race_points * 100)::BIGINT, 0) AS points
+    FROM rd_dedup rd
+    JOIN driver d      ON d.id = rd.driver_id      AND d.deleted_at IS NULL
+    JOIN constructor c ON c.id = rd.constructor_id AND c.deleted_at IS NULL
+"""
+
+# table -> (entity column, result column it is built from)
+_STANDING_TABLES = {
+    'race_driver_standing': ('driver_id', 'driver_id'),
+    'race_constructor_standing': ('constructor_id', 'constructor_id'),
+}
+
+
+def compute_standings(round_of_row, entity_of_row, position_of_row, points_of_row, round_count, entity_count):
+    """
+    Standings after every round from per-result arrays
+
+    Args:
+        round_of_row / entity_of_row: round index and competitor code of each result
+        position_of_row: finishing position (values <= 0 or > entity_count take no part in countback)
+        points_of_row: points in hundredths
+        round_count / entity_count: matrix dimensions
+
+    Returns:
+        tuple: (cumulative points, positions, present) as rounds x competitors arrays;
+               positions are 1-based among competitors present after that round
+    """
+    shape = (round_count, entity_count)
+    cell = round_of_row.astype(np.int64) * entity_count + entity_of_row
+
+    points = np.bincount(cell, weights=points_of_row, minlength=round_count * entity_count)
+    points = np.cumsum(np.rint(points).astype(np.int64).reshape(shape), axis=0)
+    present = np.cumsum(np.bincount(cell, minlength=round_count * entity_count).reshape(shape), axis=0) > 0
+
+    # Countback: cumulative number of 1st, 2nd, 3rd, ... places. No race has more
+    # places than the season has competitors, so deeper positions are not counted.
+    depth = int(min(position_of_row.max(initial=0), entity_count))
+    placed = (position_of_row > 0) & (position_of_row <= depth)
+    finishes = np.zeros((max(depth, 1),) + shape, dtype=np.int64)
+    np.add.at(finishes, (position_of_row[placed] - 1, round_of_row[placed], entity_of_row[placed]), 1)
+    finishes = np.cumsum(finishes, axis=1)
+
+    # np.lexsort sorts by its last key first: absent last, then points, wins, seconds, ...
+    codes = np.broadcast_to(np.arange(entity_count), shape)
+    keys = [codes] + [-finishes[place] for place in range(depth - 1, -1, -1)] + [-points, ~present]
+    order = np.lexsort(keys, axis=1)
+    positions = np.empty(shape, dtype=np.int64)
+    np.put_along_axis(positions, order, np.arange(1, entity_count + 1)[None, :].repeat(round_count, 0), axis=1)
+    return points, positions, present
+
+
+def recompute_season(db, year, from_round=1):
+    """
+    Rebuild user-race standings of one season from `from_round` onward (caller commits)
+
+    Returns:
+        int: standings rows written
+    """
+    # Serialize rebuilds of one season across workers and processes
+    db.execute("SELECT pg_advisory_xact_lock(hashtext('season_standings'), %s)", (year,))
+    db.execute(_SEASON_RACES_SQL, (year,))
+    races = db.fetchall()
+    targets = [i for i, race in enumerate(races) if not race['is_real'] and race['round'] >= from_round]
+    if not targets:
+        return 0
+    db.execute(_SEASON_RESULTS_SQL, (year,))
+    results = db.fetchall()
+
+    race_index = {race['id']: i for i, race in enumerate(races)}
+    round_of_row = np.fromiter((race_index[row['race_id']] for row in results), dtype=np.int64, count=len(results))
+    raced = np.bincount(round_of_row, minlength=len(races)) > 0
+    position_of_row = np.fromiter((row['position_display_order'] for row in results), dtype=np.int64, count=len(results))
+    points_of_row = np.fromiter((row['points'] for row in results), dtype=np.int64, count=len(results))
+    target_race_ids = [races[i]['id'] for i in targets]
+
+    written = 0
+    for table, (entity_column, result_column) in _STANDING_TABLES.items():
+        entity_ids = sorted({row[result_column] for row in results})
+        entity_index = {entity_id: code for code, entity_id in enumerate(entity_ids)}
+        entity_of_row = np.fromiter((entity_index[row[result_column]] for row in results), dtype=np.int64,
+                                    count=len(results))
+        points, positions, present = compute_standings(
+            round_of_row, entity_of_row, position_of_row, points_of_row, len(races), len(entity_ids)
+        )
+
+        # Only rounds that have results get standings
+        rows = [
+            (races[i]['id'], entity_ids[code], int(positions[i, code]), Decimal(int(points[i, code])).scaleb(-2))
+            for i in targets if raced[i]
+            for code in np.flatnonzero(present[i]).tolist()
+        ]
+        if rows:
+            psycopg2.extras.execute_values(db.cursor, f"""
+                INSERT INTO {table} (race_id, {entity_column}, position_number, points)
+                VALUES %s
+                ON CONFLICT (race_id, {entity_column}) DO UPDATE
+                SET position_number = EXCLUDED.position_number, points = EXCLUDED.points
+                WHERE ({table}.position_number, {table}.points)
+                      IS DISTINCT FROM (EXCLUDED.position_number, EXCLUDED.points)
+            """, rows, page_size=UPSERT_PAGE_SIZE)
+        db.execute(f"""
+            DELETE FROM {table} s
+            WHERE s.race_id = ANY(%s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM unnest(%s::INT[], %s::VARCHAR[]) AS k(race_id, entity_id)
+                  WHERE k.race_id = s.race_id AND k.entity_id = s.{entity_column}
+              )
+        """, (target_race_ids, [row[0] for row in rows], [row[1] for row in rows]))
+        written += len(rows)
+    return written
+
+
+def _seasons_for_races(db, race_ids):
+    """{year: first round} for the given races (tombstoned races included)"""
+    db.execute("""
+        SELECT year, MIN(round) AS first_round
+        FROM race
+        WHERE id = ANY(%s)
+        GROUP BY year
+    """, (list(race_ids),))
+    return {row['year']: row['first_round'] for row in db.fetchall()}
+
+
+def _after_rebuild(years):
+    # Lazy imports: these modules import the routes layer
+    from app.analytics_engine import notify_change
+    from app.routes.seasons import invalidate_season_progression
+    notify_change('race_driver_standing')
+    for year in years:
+        invalidate_season_progression(year)
+
+
+def run_pending():
+    """Rebuild every season with pending changes; returns the seasons rebuilt"""
+    with _pending_lock:
+        race_ids, rounds = set(_pending_races), set(_pending_rounds)
+        _pending_races.clear()
+        _pending_rounds.clear()
+    if not race_ids and not rounds:
+        return []
+    db = DatabaseConnection()
+    try:
+        seasons = _seasons_for_races(db, race_ids) if race_ids else {}
+        for year, first_round in rounds:
+            seasons[year] = min(first_round, seasons.get(year, first_round))
+        for year, first_round in sorted(seasons.items()):
+            try:
+                written = recompute_season(db, year, first_round)
+                db.commit()
+                print(f"✓ Standings for {year} rebuilt from round {first_round} ({written} rows)")
+            except Exception as e:
+                db.conn.rollback()
+                print(f"✗ Standings rebuild for {year} failed: {e}")
+        _after_rebuild(seasons)
+        return sorted(seasons)
+    finally:
+        db.close()
+
+
+def _run_worker():
+    while True:
+        _wakeup.wait()
+        _wakeup.clear()
+        # Let a burst of uploads land before rebuilding
+        time.sleep(STANDINGS_DEBOUNCE_SECONDS)
+        try:
+            run_pending()
+        except Exception as e:
+            print(f"✗ Standings worker error: {e}")
+
+
+_pending_races = set()
+_pending_rounds = set()
+_pending_lock = threading.Lock()
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def schedule_recompute(race_ids=(), rounds=()):
+    """
+    Queue standings rebuilds (call after the write commits)
+
+    Args:
+        race_ids: races whose results changed
+        rounds: (year, round) pairs a race moved away from
+    """
+    global _worker
+    with _pending_lock:
+        _pending_races.update(int(race_id) for race_id in race_ids if race_id not in (None, ''))
+        _pending_rounds.update(rounds)
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name='standings-worker', daemon=True)
+            _worker.start()
+    _wakeup.set()
@@ -216,6 +216,7 @@ async function fetchRaceOptions(query){
   // Use backend API: /api/races?official_name=...
   const params = new URLSearchParams();
   params.append('page', '1');
+  params.append('fields', 'id,official_name,year,round');
   if (query) params.append('official_name', query);
 
   try{
@@ -329,6 +330,7 @@ async function fetchDriverOptions(query){
 
   const params = new URLSearchParams();
   params.append('page', '1');
+  params.append('fields', 'id,name,nationality');
   if (query) params.append('name', query);
 
   try{
@@ -6,6 +6,10 @@
  * 2. On each side: Year input appears
  * 3. After valid year (race exists): Constructor dropdown appears
  * 4. After constructor selected: Driver dropdown appears
+ *
+ * The (circuit, year) -> race index is loaded once; each race's entry list
+ * (constructors and their drivers) comes in a single request, so choosing
+ * constructors and drivers needs no further round trips.
  */
 
 document.addEventListener('DOMContentLoaded', function() {
@@ -16,8 +20,9 @@ document.addEventListener('DOMContentLoaded', function() {
         right: { raceId: null, year: null, constructorId: null, constructorName: null, driverId: null, driverName: null }
     };
 
-    // Cache for circuits and constructors
+    // Cache for circuits and the (circuit, year) -> race ids index
     let circuitsCache = [];
+    let raceIndex = null;
 
     // Toast notification function
     function showToast(message, type = 'success') {
@@ -41,6 +46,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Initialize
     // ============================================
     loadCircuits();
+    loadRaceIndex();
     setupCircuitDropdown();
     setupSide('left');
     setupSide('right');
@@ -77,6 +83,19 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    async function loadRaceIndex() {
+        try {
+            const response = await fetch('/api/race-index');
+            const data = await response.json();
+            if (data.success) {
+                raceIndex = data.races;
+            }
+        } catch (error) {
+            console.error('Failed to load race index:', error);
+        }
+        return raceIndex;
+    }
+
     function setupCircuitDropdown() {
         const searchInput = document.getElementById('circuit-search');
         const dropdown = document.getElementById('circuit-dropdown');
@@ -237,7 +256,26 @@ document.addEventListener('DOMContentLoaded', function() {
         }
 
         try {
-            const response = await fetch(`/api/validate-race?circuit_id=${state.circuit.id}&year=${year}`);
+            const index = raceIndex || await loadRaceIndex();
+            const raceIds = ((index || {})[state.circuit.id] || {})[year] || [];
+
+            if (raceIds.length === 0) {
+                // The index may predate a race created since; ask the server directly
+                const params = new URLSearchParams({ circuit_id: state.circuit.id, year });
+                const fallback = await (await fetch(`/api/validate-race?${params}`)).json();
+                if (fallback.success && fallback.race) {
+                    raceIds.push(fallback.race.id);
+                    raceIndex = null;
+                }
+            }
+
+            if (raceIds.length === 0) {
+                showError(side, `No race found at ${state.circuit.name} in ${year}`);
+                hideElement(`race-info-${side}`);
+                return;
+            }
+
+            const response = await fetch(`/api/races/${raceIds[0]}/entry-list`);
             const data = await response.json();
 
             if (data.success && data.race) {
@@ -250,8 +288,9 @@ document.addEventListener('DOMContentLoaded', function() {
                 showElement(`race-info-${side}`);
                 hideElement(`error-${side}`);
                 
-                // Load constructors and show field
-                await loadConstructors(side, data.race.id);
+                // The entry list already holds every constructor's drivers
+                constructorsCache[side] = data.constructors;
+                renderConstructorDropdown(side, data.constructors);
                 showField(`constructor-group-${side}`);
             } else {
                 showError(side, `No race found at ${state.circuit.name} in ${year}`);
@@ -265,20 +304,6 @@ document.addEventListener('DOMContentLoaded', function() {
 
     let constructorsCache = { left: [], right: [] };
 
-    async function loadConstructors(side, raceId) {
-        try {
-            const response = await fetch(`/api/constructors-by-race?race_id=${raceId}`);
-            const data = await response.json();
-            
-            if (data.success) {
-                constructorsCache[side] = data.constructors;
-                renderConstructorDropdown(side, data.constructors);
-            }
-        } catch (error) {
-            console.error('Failed to load constructors:', error);
-        }
-    }
-
     function renderConstructorDropdown(side, constructors) {
         const dropdown = document.getElementById(`constructor-dropdown-${side}`);
         
@@ -308,7 +333,7 @@ document.addEventListener('DOMContentLoaded', function() {
         renderConstructorDropdown(side, filtered);
     }
 
-    async function selectConstructor(side, item) {
+    function selectConstructor(side, item) {
         const id = item.dataset.id;
         const name = item.dataset.name;
         
@@ -324,32 +349,24 @@ document.addEventListener('DOMContentLoaded', function() {
         state[side].driverName = null;
         hideElement(`summary-${side}`);
 
-        // Load drivers
-        await loadDrivers(side, state[side].raceId, id);
+        // Drivers come from the entry list loaded with the race
+        renderDrivers(side, id);
         showField(`driver-group-${side}`);
         
         updateCompareButton();
     }
 
-    async function loadDrivers(side, raceId, constructorId) {
-        try {
-            const response = await fetch(`/api/drivers-by-race-constructor?race_id=${raceId}&constructor_id=${constructorId}`);
-            const data = await response.json();
-            
-            if (data.success) {
-                const select = document.getElementById(`driver-${side}`);
-                select.innerHTML = '<option value="">Select a driver</option>';
-                
-                data.drivers.forEach(d => {
-                    const option = document.createElement('option');
-                    option.value = d.id;
-                    option.textContent = `${d.name} (${d.abbreviation || 'N/A'})`;
-                    select.appendChild(option);
-                });
-            }
-        } catch (error) {
-            console.error('Failed to load drivers:', error);
-        }
+    function renderDrivers(side, constructorId) {
+        const constructor = constructorsCache[side].find(c => c.id === constructorId);
+        const select = document.getElementById(`driver-${side}`);
+        select.innerHTML = '<option value="">Select a driver</option>';
+        
+        (constructor ? constructor.drivers : []).forEach(d => {
+            const option = document.createElement('option');
+            option.value = d.id;
+            option.textContent = `${d.name} (${d.abbreviation || 'N/A'})`;
+            select.appendChild(option);
+        });
     }
 
     // ============================================
@@ -289,7 +289,7 @@ async function openTrackStatsModal() {
             tableHTML += `
                 <tr>
                     <td class="col-number" style="text-align:center; color: var(--f1-yellow); font-weight:800;">#${row.rank_position}</td>
-                    <td style="font-weight:700;">${row.constructor_name}</td>
+                    <td style="font-weight:700;">${row.name}</td>
                     <td style="color:var(--f1-grey); text-align:center;">${row.nationality}</td>
                     <td style="text-align:center;">${row.total_races}</td>
                     <td class="col-number" style="text-align:center; color: var(--f1-red);">${row.total_points}</td>
@@ -323,8 +323,8 @@ async function openActivityModal() {
     body.innerHTML = '<div style="text-align:center; padding:40px;">Checking database integrity...</div>';
 
     try {
-        const response = await fetch('/api/stats/activity-audit');
-        const data = await response.json();
+        const response = await fetch('/api/stats/activity-audit?dimension=constructor&per_page=200');
+        const { data } = await response.json();
 
         let tableHTML = `
             <table class="stats-table" style="width:100%; border-collapse: collapse;">
@@ -332,7 +332,6 @@ async function openActivityModal() {
                     <tr>
                         <th style="text-align:left">Constructor</th>
                         <th>Nationality</th>
-                        <th>Total Entries</th>
                         <th>Status</th>
                     </tr>
                 </thead>
@@ -340,18 +339,12 @@ async function openActivityModal() {
         `;
 
         data.forEach(row => {
-            // Determine if the constructor is inactive
-            const isInactive = row.total_race_entries === 0;
-            const rowStyle = isInactive ? 'opacity: 0.7;' : '';
-            const statusBadge = isInactive 
-                ? '<span class="badge" style="background:rgba(255,255,255,0.1); color:#ccc;">Never Raced</span>'
-                : '<span class="badge" style="background:var(--f1-green); color:#000;">Active</span>';
+            const statusBadge = `<span class="badge" style="background:rgba(255,255,255,0.1); color:#ccc;">${row.status}</span>`;
 
             tableHTML += `
-                <tr style="${rowStyle}">
-                    <td style="font-weight:700;">${row.constructor_name}</td>
+                <tr style="opacity: 0.7;">
+                    <td style="font-weight:700;">${row.name}</td>
                     <td style="color:var(--f1-grey); text-align:center;">${row.nationality}</td>
-                    <td style="text-align:center; font-weight:bold;">${row.total_race_entries}</td>
                     <td style="text-align:center;">${statusBadge}</td>
                 </tr>
             `;
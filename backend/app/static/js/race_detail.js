@@ -32,11 +32,10 @@ async function loadRaceDetail() {
       renderResults(rows);
     } else {
       // fallback to complex 6-table join endpoint
-      const fullResultsRes = await fetch(`/api/race_results_full/${raceId}`);
+      const fullResultsRes = await fetch(`/api/race_results_full/${raceId}?format=normalized`);
       if (fullResultsRes.ok) {
         const fullData = await fullResultsRes.json();
-        const fullRows = fullData?.race_results || [];
-        renderFullResults(fullRows);
+        renderFullResults(decodeNormalizedResults(fullData));
       } else {
         document.getElementById('resultsBox').innerHTML = '<p class="empty-state">No results available for this race.</p>';
       }
@@ -196,6 +195,27 @@ function renderResults(rows) {
   el.innerHTML = parts.join('');
 }
 
+// Expand the normalized race_results_full payload (header + columnar results with
+// constructor/nationality dictionary indexes) back into one object per row
+function decodeNormalizedResults(data) {
+  const columns = data?.results || {};
+  const count = (columns.result_id || []).length;
+  const rows = [];
+  for (let i = 0; i < count; i++) {
+    const row = {};
+    for (const [name, values] of Object.entries(columns)) row[name] = values[i];
+    const constructor = data.constructors?.[row.constructor];
+    row.constructor_id = constructor?.id;
+    row.constructor_name = constructor?.name;
+    row.driver_nationality = data.nationalities?.[row.nationality];
+    row.circuit_name = data.circuit?.name;
+    row.circuit_type = data.circuit?.type;
+    row.country_name = data.country?.name;
+    rows.push(row);
+  }
+  return rows;
+}
+
 // Full results renderer using 6-table join data (includes driver nationality, circuit info)
 function renderFullResults(rows) {
   const el = document.getElementById('resultsBox');
@@ -31,6 +31,8 @@ function renderStatsTable(rows){
     {k: 'year', label: 'Year', cls: 'col-year'},
     {k: 'race_count', label: 'Total Races', cls: 'col-highlight col-number'},
     {k: 'avg_laps', label: 'Average Laps', cls: 'col-number', format: 'decimal'},
+    {k: 'circuits_used', label: 'Circuits', cls: 'col-number'},
+    {k: 'distinct_winners', label: 'Winners', cls: 'col-number'},
     {k: 'sprint_races', label: 'Sprint', cls: 'col-badge', badge: 'sprint'},
     {k: 'knockout_races', label: 'Knockout', cls: 'col-badge', badge: 'knockout'},
     {k: 'one_session_races', label: 'One Session', cls: 'col-badge', badge: 'default'},
@@ -20,6 +20,8 @@ async function fetchRaces(page = 1) {
   // create URL parameters
   const params = new URLSearchParams();
   params.append('page', page);
+  // Only the columns the race cards render
+  params.append('fields', 'id,official_name,circuit_name,circuit_place_name,circuit_country,year,round,date');
   if (year) params.append('year', year);
   if (round) params.append('round', round);
   if (circuitId) params.append('circuit_id', circuitId);
@@ -0,0 +1,329 @@
+"""
+Monte Carlo championship projections for seasons in progress
+
+`project_season(year, ...)` simulates the season's remaining rounds many times
+and counts how often each driver ends up champion:
+
+  * The field is every driver with a result in the season's completed rounds.
+    Their points and wins so far come from the same deduplicated race_data rows
+    as the analytics snapshot (real and user races alike). The published
+    snapshot is used when it is current; otherwise only the season and its
+    field's recent history are read from the database.
+  * Each driver's finishing distribution over positions 1..field size comes from
+    their last HISTORY_RESULTS results up to now, any season, weighted toward
+    recent races and smoothed with a small uniform prior.
+  * The points per position are the season's own (median race_points per place
+    in the completed rounds), so older scoring systems project correctly.
+  * A simulated round samples a position for every driver from their
+    distribution and ranks the samples (random tie-break) into a finishing
+    order. Shards of SHARD_SIMULATIONS seasons are simulated as
+    simulations x drivers arrays in a ProcessPoolExecutor
+    (app.title_simulation). Shards keep being submitted until the time budget
+    or the simulation cap is reached.
+
+Results, including "nothing to project" (None), are cached per (season,
+data_version()); concurrent requests for one season share a single run.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from app.analytics_engine import get_snapshot, data_version
+from app.cache_utils import TTLCache
+from app.database import DatabaseConnection
+from app.points_whatif import POINTS_SYSTEMS
+from app.title_simulation import simulate_shard
+
+SHARD_SIMULATIONS = 5000
+HISTORY_RESULTS = 30
+HISTORY_HALF_LIFE = 10      # results
+PRIOR_PER_POSITION = 0.1
+
+# (year, data version) -> projection; the TTL bounds staleness from other processes
+projection_cache = TTLCache(ttl_seconds=300, max_entries=64)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# One row per calendar race of the season, joined with its results (picked like the snapshot's)
+_SEASON_RESULTS_SQL = """
+    WITH season AS (
+        SELECT id, round
+        FROM race
+        WHERE year = %(year)s AND deleted_at IS NULL
+    ),
+    rd_dedup AS (
+        SELECT DISTINCT ON (rd.race_id, rd.driver_id) rd.*
+        FROM race_data rd
+        JOIN season s ON s.id = rd.race_id
+        ORDER BY rd.race_id, rd.driver_id, rd.is_real DESC, rd.created_at DESC, rd.id DESC
+    ),
+    results AS (
+        SELECT rd.race_id, rd.driver_id, d.full_name, rd.position_display_order,
+               COALESCE((rd.race_points * 100)::BIGINT, 0) AS points,
+               rd.race_points IS NOT NULL AS has_points
+        FROM rd_dedup rd
+        JOIN driver d      ON d.id = rd.driver_id      AND d.deleted_at IS NULL
+        JOIN constructor c ON c.id = rd.constructor_id AND c.deleted_at IS NULL
+    )
+    SELECT s.id, s.round, res.driver_id, res.full_name, res.position_display_order,
+           res.points, res.has_points
+    FROM season s
+    LEFT JOIN results res ON res.race_id = s.id
+    ORDER BY s.round, s.id
+"""
+# The last %(limit)s results of each field driver up to the season's last completed round
+_HISTORY_SQL = """
+    SELECT f.driver_id, h.position_display_order
+    FROM unnest(%(driver_ids)s::VARCHAR[]) AS f(driver_id)
+    CROSS JOIN LATERAL (
+        SELECT rd.position_display_order, r.year, r.round, r.id
+        FROM (
+            SELECT DISTINCT ON (x.race_id) x.*
+            FROM race_data x
+            WHERE x.driver_id = f.driver_id
+            ORDER BY x.race_id, x.is_real DESC, x.created_at DESC, x.id DESC
+        ) rd
+        JOIN race r        ON r.id = rd.race_id        AND r.deleted_at IS NULL
+        JOIN constructor c ON c.id = rd.constructor_id AND c.deleted_at IS NULL
+        WHERE (r.year, r.round) <= (%(year)s, %(round)s)
+        ORDER BY r.year DESC, r.round DESC, r.id DESC
+        LIMIT %(limit)s
+    ) h
+    ORDER BY f.driver_id, h.year, h.round, h.id
+"""
+
+
+def _snapshot_season(snapshot, year):
+    """Season results and field histories from the published analytics snapshot"""
+    first = int(np.searchsorted(snapshot.race_year, year, 'left'))
+    last = int(np.searchsorted(snapshot.race_year, year, 'right'))
+    if first == last:
+        return None
+    raced = np.diff(snapshot.result_starts[first:last + 1]) > 0
+    if not raced.any():
+        return None
+    last_raced = first + int(np.flatnonzero(raced)[-1])
+    rows = slice(int(snapshot.result_starts[first]), int(snapshot.result_starts[last]))
+
+    field, local = np.unique(snapshot.res_driver[rows], return_inverse=True)
+    histories = []
+    for code in field.tolist():
+        history = snapshot.driver_order[snapshot.driver_starts[code]:snapshot.driver_starts[code + 1]]
+        history = history[snapshot.res_race[history] <= last_raced][-HISTORY_RESULTS:]
+        histories.append(snapshot.res_position[history])
+    return {
+        'driver_ids': [snapshot.driver_ids[code] for code in field.tolist()],
+        'driver_names': [snapshot.driver_full_names[code] for code in field.tolist()],
+        'raced': raced,
+        'driver': local,
+        'position': snapshot.res_position[rows],
+        'points': snapshot.res_points[rows],
+        'has_points': snapshot.res_has_points[rows],
+        'histories': histories,
+    }
+
+
+def _load_season(year):
+    """Same as _snapshot_season(), read from the database: only the season and its field's history"""
+    db = DatabaseConnection()
+    try:
+        _, rows = db.query_tuples(_SEASON_RESULTS_SQL, {'year': year})
+        races = list(dict.fromkeys((row[0], row[1]) for row in rows))
+        race_index = {race_id: index for index, (race_id, _) in enumerate(races)}
+        results = [row for row in rows if row[2] is not None]
+        if not results:
+            return None
+        raced = np.zeros(len(races), dtype=bool)
+        raced[[race_index[row[0]] for row in results]] = True
+        last_round = races[int(np.flatnonzero(raced)[-1])][1]
+
+        names = {row[2]: row[3] for row in results}
+        driver_ids = sorted(names)
+        local = {driver_id: i for i, driver_id in enumerate(driver_ids)}
+        _, history_rows = db.query_tuples(_HISTORY_SQL, {
+            'driver_ids': driver_ids, 'year': year, 'round': last_round, 'limit': HISTORY_RESULTS,
+        })
+        db.commit()
+    finally:
+        db.close()
+
+    histories = [[] for _ in driver_ids]
+    for driver_id, position in history_rows:
+        histories[local[driver_id]].append(position)
+    return {
+        'driver_ids': driver_ids,
+        'driver_names': [names[driver_id] for driver_id in driver_ids],
+        'raced': raced,
+        'driver': np.fromiter((local[row[2]] for row in results), dtype=np.int64, count=len(results)),
+        'position': np.fromiter((row[4] for row in results), dtype=np.int64, count=len(results)),
+        'points': np.fromiter((row[5] for row in results), dtype=np.int64, count=len(results)),
+        'has_points': np.fromiter((row[6] for row in results), dtype=bool, count=len(results)),
+        'histories': [np.array(places, dtype=np.int64) for places in histories],
+    }
+
+
+def _season_inputs(season):
+    """Standings so far, finishing distributions and points table of a season"""
+    size = len(season['driver_ids'])
+    local = season['driver']
+    season_position = season['position']
+    season_points = season['points']
+    base_points = np.bincount(local, weights=season_points, minlength=size)
+    base_wins = np.bincount(local, weights=season_position == 1, minlength=size)
+
+    # Points per place: the season's median, or the current system when none are recorded
+    points_table = np.zeros(size, dtype=np.int64)
+    scored = season['has_points'] & (season_position >= 1) & (season_position <= size)
+    if scored.any():
+        for place in np.unique(season_position[scored]).tolist():
+            points_table[place - 1] = np.median(season_points[scored & (season_position == place)])
+    else:
+        preset = np.array(POINTS_SYSTEMS['2010']['points'][:size], dtype=np.int64) * 100
+        points_table[:preset.size] = preset
+
+    # Finishing distributions from each driver's recent results, up to the last completed round
+    weights = np.full((size, size), PRIOR_PER_POSITION)
+    for i, history in enumerate(season['histories']):
+        places = np.clip(history, 1, size) - 1
+        decay = 0.5 ** (np.arange(places.size)[::-1] / HISTORY_HALF_LIFE)
+        weights[i] += np.bincount(places, weights=decay, minlength=size)
+    cdf = np.cumsum(weights, axis=1)
+    cdf /= cdf[:, -1:]
+
+    return {
+        'driver_ids': season['driver_ids'],
+        'driver_names': season['driver_names'],
+        'completed_rounds': int(season['raced'].sum()),
+        'remaining_rounds': int((~season['raced']).sum()),
+        'base_points': np.rint(base_points).astype(np.int64),
+        'base_wins': base_wins.astype(np.int64),
+        'points_table': points_table,
+        'cdf': cdf,
+    }
+
+
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the app process runs threads (DB pool, reloads) that fork would copy mid-state.
+            # Workers only import app.title_simulation; run.py skips create_app() in them.
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_shards(args, rounds, budget_seconds, max_simulations, workers):
+    """Simulate shards until the budget or cap is reached; returns the completed shard results"""
+    deadline = time.monotonic() + budget_seconds
+    seeds = np.random.SeedSequence()
+    results = []
+    shards = max(1, max_simulations // SHARD_SIMULATIONS)
+
+    if workers <= 0:
+        # In-process fallback, e.g. where worker processes cannot be started
+        while len(results) < shards and (not results or time.monotonic() < deadline):
+            results.append(simulate_shard(*args, rounds, SHARD_SIMULATIONS, seeds.spawn(1)[0]))
+        return results
+
+    pool = _get_pool(workers)
+    submitted = 0
+    pending = set()
+
+    def submit():
+        nonlocal submitted
+        pending.add(pool.submit(simulate_shard, *args, rounds, SHARD_SIMULATIONS, seeds.spawn(1)[0]))
+        submitted += 1
+
+    try:
+        while submitted < min(workers, shards):
+            submit()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and results:
+                break
+            # Always wait for at least one shard, however small the budget
+            done, pending = wait(pending, timeout=remaining if results else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                results.append(future.result())
+                if submitted < shards and time.monotonic() < deadline:
+                    submit()
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+    for future in pending:
+        future.cancel()
+    return results
+
+
+def _project(year, budget_seconds, max_simulations, workers):
+    snapshot = get_snapshot()
+    season = _snapshot_season(snapshot, year) if snapshot is not None else _load_season(year)
+    if season is None:
+        return None
+    inputs = _season_inputs(season)
+    args = (inputs['cdf'], inputs['points_table'], inputs['base_points'], inputs['base_wins'])
+    rounds = inputs['remaining_rounds']
+
+    started = time.monotonic()
+    if rounds:
+        shards = _run_shards(args, rounds, budget_seconds, max_simulations, workers)
+        simulations = len(shards) * SHARD_SIMULATIONS
+    else:
+        # Season over: one pass settles the order
+        shards = [simulate_shard(*args, 0, 1, None)]
+        simulations = 0
+    points_sum = sum(shard[0] for shard in shards)
+    positions = sum(shard[1] for shard in shards)
+    runs = positions[0].sum()
+
+    expected_position = (positions * np.arange(1, positions.shape[1] + 1)).sum(axis=1) / runs
+    drivers = [
+        {
+            'driver_id': driver_id,
+            'driver_name': inputs['driver_names'][i],
+            'points': int(inputs['base_points'][i]) / 100,
+            'wins': int(inputs['base_wins'][i]),
+            'title_probability': round(float(positions[i, 0] / runs), 4),
+            'expected_points': round(float(points_sum[i] / runs / 100), 2),
+            'expected_position': round(float(expected_position[i]), 2),
+        }
+        for i, driver_id in enumerate(inputs['driver_ids'])
+    ]
+    drivers.sort(key=lambda d: (-d['title_probability'], d['expected_position'], d['driver_id']))
+    return {
+        'year': year,
+        'completed_rounds': inputs['completed_rounds'],
+        'remaining_rounds': rounds,
+        'points_per_position': [int(cents) / 100 for cents in inputs['points_table']],
+        'simulations': simulations,
+        'elapsed_ms': int((time.monotonic() - started) * 1000),
+        'drivers': drivers,
+    }
+
+
+def project_season(year, budget_seconds, max_simulations, workers):
+    """
+    Title probabilities for `year` (cached per season and data version)
+
+    Args:
+        budget_seconds: wall-clock budget for the simulations of a cache miss
+        max_simulations: cap on simulated seasons
+        workers: worker processes (0 simulates in the calling process)
+
+    Returns:
+        dict or None: None when the season has no completed round to project from
+    """
+    key = (year, data_version())
+    return projection_cache.get_or_load(key, lambda: _project(year, budget_seconds, max_simulations, workers))
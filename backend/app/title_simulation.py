@@ -0,0 +1,34 @@
+"""
+Season simulation kernel for title projections (runs in worker processes)
+
+Kept apart from app.title_projection and free of app imports: worker processes
+only import this module and NumPy, not the database or analytics code.
+"""
+import numpy as np
+
+
+def simulate_shard(cdf, points_table, base_points, base_wins, rounds, simulations, seed):
+    """
+    Simulate `simulations` season endings
+
+    Returns:
+        tuple: (points sum per driver, drivers x final positions count matrix)
+    """
+    rng = np.random.default_rng(seed)
+    drivers = cdf.shape[0]
+    totals = np.repeat(base_points[None, :], simulations, axis=0)
+    wins = np.repeat(base_wins[None, :], simulations, axis=0)
+    for _ in range(rounds):
+        # Inverse CDF sampling of every driver's position, then rank the samples
+        sampled = (rng.random((simulations, drivers, 1)) > cdf[None, :, :]).sum(axis=2)
+        order = np.argsort(sampled + rng.random((simulations, drivers)), axis=1)
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(drivers)[None, :], axis=1)
+        totals += points_table[rank]
+        wins += rank == 0
+
+    # Final order: points, then wins, then a coin toss
+    final = np.lexsort((rng.random((simulations, drivers)), -wins, -totals), axis=1)
+    cells = final * drivers + np.arange(drivers)[None, :]
+    positions = np.bincount(cells.ravel(), minlength=drivers * drivers).reshape(drivers, drivers)
+    return totals.sum(axis=0), positions
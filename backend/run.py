@@ -5,7 +5,10 @@ Main application entry point
 
 from app import create_app
 
-app = create_app()
+# Worker processes started with 'spawn' (title projections) re-import this file
+# as __mp_main__; they must not build an app, its DB pool and threads
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
\ No newline at end of file
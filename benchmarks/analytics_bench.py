@@ -0,0 +1,159 @@
+"""
+Analytics engine benchmark: NumPy snapshot vs the SQL query files.
+
+Loads the engine snapshot from the benchmark dataset, then runs the leaderboard,
+season totals, circuit history and head-to-head scenarios on both paths. It checks
+that the JSON bodies are identical and reports the median time per request. The
+SQL time includes fetching and encoding the rows; the engine time includes
+encoding. The snapshot load time is reported separately.
+
+Usage:
+    python benchmarks/analytics_bench.py                  # temp cluster, seeds, --scale 10
+    python benchmarks/analytics_bench.py --dsn "host=... dbname=..."
+    python benchmarks/analytics_bench.py --repeat 50
+"""
+import argparse
+import contextlib
+import statistics
+import sys
+import time
+
+import psycopg2
+
+from local_pg import LocalPostgres, load_schema_and_seeds, REPO_ROOT
+from generate_data import generate
+
+BACKEND_DIR = REPO_ROOT / 'backend'
+QUERIES_DIR = REPO_ROOT / 'database' / 'queries'
+
+
+def load_context(conn):
+    """Busiest season, circuit and driver pair in the dataset"""
+    cur = conn.cursor()
+    cur.execute('SELECT MIN(year), MAX(year) FROM race WHERE is_real = TRUE')
+    year_from, year_to = cur.fetchone()
+    cur.execute("""
+        SELECT r.year FROM race_data rd JOIN race r ON r.id = rd.race_id
+        GROUP BY r.year ORDER BY COUNT(*) DESC, r.year LIMIT 1
+    """)
+    year = cur.fetchone()[0]
+    cur.execute("""
+        SELECT r.circuit_id FROM race_data rd JOIN race r ON r.id = rd.race_id
+        GROUP BY r.circuit_id ORDER BY COUNT(*) DESC, r.circuit_id LIMIT 1
+    """)
+    circuit_id = cur.fetchone()[0]
+    cur.execute("""
+        SELECT driver_id FROM race_data
+        GROUP BY driver_id ORDER BY COUNT(*) DESC, driver_id LIMIT 2
+    """)
+    driver_a, driver_b = [row[0] for row in cur.fetchall()]
+    cur.close()
+    return {
+        'year_from': year_from, 'year_to': year_to, 'year': year,
+        'circuit_id': circuit_id, 'driver_a': driver_a, 'driver_b': driver_b,
+    }
+
+
+def scenarios(ctx):
+    """(label, query file, params, engine call)"""
+    return [
+        ('leaderboard', 'driver_leaderboard.sql',
+         {'year_from': ctx['year_from'], 'year_to': ctx['year_to'], 'limit': 50},
+         lambda s: s.leaderboard(ctx['year_from'], ctx['year_to'], 50)),
+        ('season totals (driver)', 'analytics_season_totals.sql',
+         {'year': ctx['year'], 'entity_type': 'driver'},
+         lambda s: s.season_totals(ctx['year'], 'driver')),
+        ('season totals (constructor)', 'analytics_season_totals.sql',
+         {'year': ctx['year'], 'entity_type': 'constructor'},
+         lambda s: s.season_totals(ctx['year'], 'constructor')),
+        ('circuit history', 'analytics_circuit_history.sql',
+         {'circuit_id': ctx['circuit_id'], 'limit': 25},
+         lambda s: s.circuit_history(ctx['circuit_id'], 25)),
+        ('head-to-head', 'analytics_head_to_head.sql',
+         {'driver_a': ctx['driver_a'], 'driver_b': ctx['driver_b'], 'year_from': None, 'year_to': None},
+         lambda s: s.head_to_head(ctx['driver_a'], ctx['driver_b'], None, None)),
+    ]
+
+
+def median_ms(run, repeat):
+    """Median wall time of run() in ms and its last result"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the analytics engine with the SQL path')
+    parser.add_argument('--dsn', help='benchmark an existing database instead of a temp cluster')
+    parser.add_argument('--scale', type=float, default=10, help='generated data scale for the temp cluster')
+    parser.add_argument('--seed', type=int, default=317)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    from flask import Flask
+    from app.analytics_engine import AnalyticsSnapshot
+    from app.json_rows import encode_rows, json_response
+
+    with contextlib.ExitStack() as stack:
+        dsn = args.dsn
+        if not dsn:
+            pg = stack.enter_context(LocalPostgres())
+            print("Loading schema and seeds...")
+            load_schema_and_seeds(pg.dsn)
+            print(f"Generating synthetic data at {args.scale}x...")
+            generate(pg.dsn, args.scale, seed=args.seed)
+            dsn = pg.dsn
+
+        conn = psycopg2.connect(dsn)
+        stack.callback(conn.close)
+        ctx = load_context(conn)
+
+        app = Flask('analytics_bench')
+        stack.enter_context(app.app_context())
+
+        def load():
+            snapshot = AnalyticsSnapshot(conn, 0)
+            conn.rollback()
+            return snapshot
+        load_ms, snapshot = median_ms(load, max(1, args.repeat // 10))
+        print(f"\nSnapshot load: {load_ms:.1f} ms ({snapshot.res_race.size} results, "
+              f"{len(snapshot.race_ids)} races, {len(snapshot.driver_ids)} drivers)")
+
+        print(f"\n{'scenario':<28} {'rows':>6} {'sql ms':>10} {'engine ms':>10} {'speedup':>8}")
+        mismatches = 0
+        for label, filename, params, engine_call in scenarios(ctx):
+            sql = (QUERIES_DIR / filename).read_text(encoding='utf-8')
+
+            def sql_path():
+                with conn.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    description, rows = cursor.description, cursor.fetchall()
+                conn.rollback()
+                return json_response({'rows': encode_rows(description, rows)}).get_data()
+
+            def engine_path():
+                return json_response({'rows': engine_call(snapshot)}).get_data()
+
+            sql_ms, sql_body = median_ms(sql_path, args.repeat)
+            engine_ms, engine_body = median_ms(engine_path, args.repeat)
+            same = sql_body == engine_body
+            mismatches += not same
+            row_count = len(engine_call(snapshot))
+            speedup = sql_ms / engine_ms if engine_ms else float('inf')
+            print(f"{label:<28} {row_count:>6} {sql_ms:>10.2f} {engine_ms:>10.2f} {speedup:>7.1f}x"
+                  f"{'' if same else '  ✗ OUTPUT DIFFERS'}")
+
+    if mismatches:
+        # Ties ordered by name or id can legitimately differ between collations
+        print(f"\n✗ {mismatches} scenario(s) produced different JSON")
+        sys.exit(1)
+    print("\n✓ Engine and SQL produce identical JSON")
+
+
+if __name__ == '__main__':
+    main()
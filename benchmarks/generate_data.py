@@ -0,0 +1,371 @@
+"""
+Synthetic data scaler for benchmark databases.
+
+The seeds ship no race_data rows, so everything that reads race_data looks fast in
+development. This tool fills a seeded database with:
+
+  * real race results (race_data.is_real = TRUE), one row per driver listed in the
+    race's race_driver_standing rows, so real-history queries have data to work on
+  * user simulation data at `--scale` times the volume of real history: users,
+    user drivers (ud-N), user constructors (uc-N), user races (is_real = FALSE) and
+    their race_data rows, including re-uploaded duplicates per (race, driver)
+
+Everything is loaded with COPY in chunks, so 1000x runs stay within memory.
+User seasons are numbered from --first-sim-year (default 3000) so they never collide
+with real (year, round) pairs.
+
+Usage:
+    python benchmarks/generate_data.py --scale 10                 # DB_* from env / database/.env
+    python benchmarks/generate_data.py --dsn "host=... dbname=..." --scale 100 --duplicate-rate 0.1
+"""
+import argparse
+import csv
+import io
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import psycopg2
+
+from local_pg import REPO_ROOT
+
+POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+QUALIFYING_FORMATS = ['KNOCKOUT', 'SPRINT_RACE', 'ONE_SESSION', 'TWO_SESSION']
+ROUNDS_PER_SEASON = 20
+GRID_SIZE = 20
+CHUNK_ROWS = 100_000
+
+RACE_DATA_COLUMNS = (
+    'race_id', 'driver_id', 'constructor_id', 'user_id', 'position_display_order',
+    'driver_number', 'race_points', 'race_pole_position',
+    'race_qualification_position_number', 'race_grid_position_number', 'is_real', 'created_at'
+)
+USER_COLUMNS = ('id', 'country_id', 'username', 'password_hash', 'email', 'email_verified', 'date_joined', 'is_admin')
+DRIVER_COLUMNS = (
+    'id', 'user_id', 'name', 'first_name', 'last_name', 'full_name', 'abbreviation',
+    'permanent_number', 'gender', 'date_of_birth', 'place_of_birth',
+    'country_of_birth_country_id', 'nationality_country_id', 'total_championship_wins',
+    'total_race_starts', 'total_race_wins', 'total_race_laps', 'total_podiums',
+    'total_points', 'total_pole_positions', 'is_real'
+)
+CONSTRUCTOR_COLUMNS = (
+    'id', 'user_id', 'country_id', 'name', 'full_name', 'total_championship_wins',
+    'total_race_starts', 'total_podiums', 'total_points', 'total_pole_positions', 'is_real'
+)
+RACE_COLUMNS = (
+    'id', 'circuit_id', 'year', 'round', 'date', 'official_name', 'qualifying_format',
+    'laps', 'is_real', 'user_id'
+)
+
+# Not a real bcrypt hash; synthetic users are never meant to log in
+DUMMY_PASSWORD_HASH = '$2b$12$benchmarkbenchmarkbenchmarkbenchmarkbenchmarkbenchmark'
+
+
+class CopyWriter:
+    """Buffer CSV rows and flush them to a table with COPY every CHUNK_ROWS rows"""
+
+    def __init__(self, conn, table, columns, depends_on=None):
+        self.conn = conn
+        self.depends_on = depends_on
+        self.table = table
+        self.columns = columns
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.pending = 0
+        self.total = 0
+
+    def write(self, row):
+        self.writer.writerow(['\\N' if value is None else value for value in row])
+        self.pending += 1
+        if self.pending >= CHUNK_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # Referenced rows must be copied before the rows pointing at them
+        if self.depends_on:
+            self.depends_on.flush()
+        self.buffer.seek(0)
+        columns = ', '.join(self.columns)
+        with self.conn.cursor() as cur:
+            # Fresh statistics for the rollup triggers' plans (they run inside the COPY)
+            cur.execute(f'ANALYZE "{self.table}"')
+            cur.copy_expert(
+                f'COPY "{self.table}" ({columns}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')',
+                self.buffer
+            )
+        self.conn.commit()
+        self.total += self.pending
+        self.pending = 0
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+
+def _finishing_order(entries, rng, noise):
+    """Shuffle a list of (key, strength) pairs into a plausible finishing order"""
+    return [key for key, _ in sorted(entries, key=lambda e: e[1] + rng.gauss(0, noise))]
+
+
+def _race_rows(race_id, order, constructor_of, user_id, is_real, created_at, rng):
+    """race_data rows for one classified race"""
+    quali = sorted(order, key=lambda d: order.index(d) + rng.gauss(0, 2.5))
+    rows = []
+    for position, driver_id in enumerate(order, start=1):
+        quali_position = quali.index(driver_id) + 1
+        rows.append((
+            race_id, driver_id, constructor_of(driver_id), user_id, position,
+            str(rng.randint(1, 99)), POINTS[position - 1] if position <= len(POINTS) else 0,
+            quali_position == 1, quali_position, quali_position, is_real, created_at
+        ))
+    return rows
+
+
+def generate_real_results(conn, rng):
+    """One is_real race_data row per (race, driver) in race_driver_standing"""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT r.id, r.year, r.date, rds.driver_id, rds.position_number
+        FROM race_driver_standing rds
+        JOIN race r ON r.id = rds.race_id
+        WHERE r.is_real = TRUE
+          AND NOT EXISTS (SELECT 1 FROM race_data rd WHERE rd.race_id = r.id AND rd.is_real = TRUE)
+        ORDER BY r.id, rds.position_number
+    """)
+    standings = cur.fetchall()
+    cur.execute("""
+        SELECT DISTINCT r.year, rcs.constructor_id
+        FROM race_constructor_standing rcs
+        JOIN race r ON r.id = rcs.race_id
+    """)
+    constructors_by_year = {}
+    for year, constructor_id in cur.fetchall():
+        constructors_by_year.setdefault(year, []).append(constructor_id)
+    cur.execute("SELECT id FROM constructor WHERE is_real = TRUE AND total_race_starts > 0 ORDER BY id")
+    fallback_constructors = [r[0] for r in cur.fetchall()]
+    cur.close()
+
+    races = {}
+    for race_id, year, race_date, driver_id, position in standings:
+        races.setdefault((race_id, year, race_date), []).append((driver_id, position))
+
+    writer = CopyWriter(conn, 'race_data', RACE_DATA_COLUMNS)
+    season_teams = {}
+    for (race_id, year, race_date), entries in races.items():
+        teams = season_teams.get(year)
+        if teams is None:
+            pool = constructors_by_year.get(year) or rng.sample(
+                fallback_constructors, min(12, len(fallback_constructors))
+            )
+            pool = sorted(pool)
+            teams = season_teams[year] = {'pool': pool, 'assigned': {}}
+
+        def constructor_of(driver_id, teams=teams):
+            # Keep a driver with one team for the whole season
+            if driver_id not in teams['assigned']:
+                teams['assigned'][driver_id] = teams['pool'][len(teams['assigned']) // 2 % len(teams['pool'])]
+            return teams['assigned'][driver_id]
+
+        # Excluded drivers (NULL standing position) start from the back
+        back = len(entries) + 1
+        entries = [(driver_id, back if position is None else position) for driver_id, position in entries]
+        order = _finishing_order(entries, rng, noise=3.0)
+        created_at = datetime.combine(race_date, datetime.min.time())
+        for row in _race_rows(race_id, order, constructor_of, None, True, created_at, rng):
+            writer.write(row)
+    writer.flush()
+    return writer.total
+
+
+def generate_user_data(conn, rng, target_rows, duplicate_rate, first_sim_year, users_hint):
+    """User simulation seasons with roughly `target_rows` race_data rows"""
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM circuit ORDER BY id")
+    circuits = [r[0] for r in cur.fetchall()]
+    cur.execute("SELECT id FROM country ORDER BY id")
+    countries = [r[0] for r in cur.fetchall()]
+    cur.execute("SELECT id FROM driver WHERE is_real = TRUE ORDER BY id")
+    real_drivers = [r[0] for r in cur.fetchall()]
+    cur.execute("SELECT COALESCE(MAX(id), 0) FROM race")
+    next_race_id = cur.fetchone()[0] + 1
+    cur.execute("SELECT COALESCE(MAX(year), %s - 1) FROM race WHERE year >= %s", (first_sim_year, first_sim_year))
+    next_year = cur.fetchone()[0] + 1
+    cur.execute("SELECT COALESCE(MAX(CAST(SUBSTRING(id FROM '[0-9]+') AS INTEGER)), 0) FROM driver WHERE id ~ '^ud-[0-9]+$'")
+    next_driver = cur.fetchone()[0] + 1
+    cur.execute("SELECT COALESCE(MAX(CAST(SUBSTRING(id FROM '[0-9]+') AS INTEGER)), 0) FROM constructor WHERE id ~ '^uc-[0-9]+$'")
+    next_constructor = cur.fetchone()[0] + 1
+    cur.execute("SELECT COUNT(*) FROM \"user\" WHERE id LIKE 'bench-user-%'")
+    next_user = cur.fetchone()[0] + 1
+    cur.close()
+
+    rows_per_season = ROUNDS_PER_SEASON * GRID_SIZE * (1 + duplicate_rate)
+    seasons = max(1, int(round(target_rows / rows_per_season)))
+    user_count = users_hint or max(1, seasons // 5)
+
+    user_writer = CopyWriter(conn, 'user', USER_COLUMNS)
+    driver_writer = CopyWriter(conn, 'driver', DRIVER_COLUMNS)
+    constructor_writer = CopyWriter(conn, 'constructor', CONSTRUCTOR_COLUMNS)
+    race_writer = CopyWriter(conn, 'race', RACE_COLUMNS)
+    data_writer = CopyWriter(conn, 'race_data', RACE_DATA_COLUMNS, depends_on=race_writer)
+
+    users = []
+    for n in range(next_user, next_user + user_count):
+        user_id = f'bench-user-{n}'
+        users.append(user_id)
+        user_writer.write((
+            user_id, rng.choice(countries), f'bench_user_{n}', DUMMY_PASSWORD_HASH,
+            f'bench_user_{n}@example.com', True, datetime(2024, 1, 1), False
+        ))
+    user_writer.flush()
+
+    # Each user owns a small stable of drivers and teams reused across their seasons
+    user_drivers, user_constructors = {}, {}
+    for user_id in users:
+        drivers = []
+        for _ in range(rng.randint(2, 8)):
+            driver_id = f'ud-{next_driver}'
+            next_driver += 1
+            country = rng.choice(countries)
+            driver_writer.write((
+                driver_id, user_id, f'Sim Driver {driver_id}', 'Sim', f'Driver {driver_id}',
+                f'Sim Driver {driver_id}', 'SIM', rng.randint(1, 99), 'MALE',
+                date(1990, 1, 1) + timedelta(days=rng.randint(0, 5000)), 'Simville',
+                country, country, 0, 0, 0, 0, 0, 0, 0, False
+            ))
+            drivers.append(driver_id)
+        constructors = []
+        for _ in range(rng.randint(1, 4)):
+            constructor_id = f'uc-{next_constructor}'
+            next_constructor += 1
+            constructor_writer.write((
+                constructor_id, user_id, rng.choice(countries), f'Sim Team {constructor_id}',
+                f'Sim Team {constructor_id}', 0, 0, 0, 0, 0, False
+            ))
+            constructors.append(constructor_id)
+        user_drivers[user_id] = drivers
+        user_constructors[user_id] = constructors
+    driver_writer.flush()
+    constructor_writer.flush()
+
+    for season in range(seasons):
+        user_id = users[season % len(users)]
+        year = next_year + season
+        own = user_drivers[user_id]
+        grid = own + rng.sample(real_drivers, GRID_SIZE - len(own))
+        strengths = {driver_id: rng.uniform(0, GRID_SIZE) for driver_id in grid}
+        team_pool = user_constructors[user_id]
+        teams = {driver_id: team_pool[i // 2 % len(team_pool)] for i, driver_id in enumerate(grid)}
+        for round_number in range(1, ROUNDS_PER_SEASON + 1):
+            race_id = next_race_id
+            next_race_id += 1
+            # Simulation years can exceed Python's date range; PostgreSQL takes them as text
+            race_date = date(2000, 3, 1) + timedelta(days=14 * round_number)
+            race_writer.write((
+                race_id, rng.choice(circuits), year, round_number,
+                f'{year}-{race_date:%m-%d}', f'{year} Simulation Grand Prix {round_number}',
+                rng.choice(QUALIFYING_FORMATS), rng.randint(44, 78), False, user_id
+            ))
+            uploaded_at = datetime(2024, 1, 1) + timedelta(minutes=race_id)
+            order = _finishing_order(list(strengths.items()), rng, noise=4.0)
+            rows = _race_rows(race_id, order, teams.get, user_id, False, uploaded_at, rng)
+            for row in rows:
+                data_writer.write(row)
+            # Re-uploads: same (race, driver) again with a later timestamp and a different result
+            for row in rows:
+                if rng.random() < duplicate_rate:
+                    position = max(1, min(GRID_SIZE, row[4] + rng.randint(-3, 3)))
+                    data_writer.write(row[:4] + (position,) + row[5:6] +
+                                      (POINTS[position - 1] if position <= len(POINTS) else 0,) +
+                                      row[7:11] + (uploaded_at + timedelta(hours=1),))
+    race_writer.flush()
+    data_writer.flush()
+
+    return {
+        'users': user_writer.total,
+        'drivers': driver_writer.total,
+        'constructors': constructor_writer.total,
+        'races': race_writer.total,
+        'race_data': data_writer.total,
+    }
+
+
+def _set_autovacuum(conn, enabled):
+    """Toggle autovacuum on every table in the public schema"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public' ORDER BY tablename")
+        for (table,) in cur.fetchall():
+            if enabled:
+                cur.execute(f'ALTER TABLE "{table}" RESET (autovacuum_enabled)')
+            else:
+                cur.execute(f'ALTER TABLE "{table}" SET (autovacuum_enabled = false)')
+    conn.commit()
+
+
+def generate(dsn, scale, duplicate_rate=0.05, seed=317, first_sim_year=3000,
+             users=None, skip_real=False):
+    """Fill the database at `dsn`; returns a dict of inserted row counts"""
+    rng = random.Random(seed)
+    conn = psycopg2.connect(dsn)
+    try:
+        counts = {}
+        started = time.perf_counter()
+        # Same seed, same database: autovacuum timing would otherwise change the
+        # rollups' page layout, and a 300k-row ANALYZE sample covers race_data at
+        # --scale 10, so plans (and the plan_check snapshots) don't drift
+        with conn.cursor() as cur:
+            cur.execute('SET default_statistics_target = 1000')
+        _set_autovacuum(conn, False)
+        if not skip_real:
+            counts['real_race_data'] = generate_real_results(conn, rng)
+            print(f"  real race_data: {counts['real_race_data']} rows")
+
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM race_data WHERE is_real = TRUE")
+        real_rows = cur.fetchone()[0] or 1
+        cur.close()
+
+        if scale > 0:
+            user_counts = generate_user_data(
+                conn, rng, real_rows * scale, duplicate_rate, first_sim_year, users
+            )
+            counts.update({f'user_{k}': v for k, v in user_counts.items()})
+            print(f"  user data: {user_counts}")
+
+        _set_autovacuum(conn, True)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute('VACUUM ANALYZE')
+        print(f"✓ Generated data in {time.perf_counter() - started:.1f}s")
+        return counts
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scale up race_data and user data for benchmarks')
+    parser.add_argument('--dsn', help='libpq connection string (default: DB_* settings)')
+    parser.add_argument('--scale', type=float, default=10,
+                        help='user race_data volume as a multiple of real history (10 - 1000)')
+    parser.add_argument('--duplicate-rate', type=float, default=0.05,
+                        help='share of user rows re-uploaded for the same (race, driver)')
+    parser.add_argument('--users', type=int, help='number of synthetic users (default: seasons / 5)')
+    parser.add_argument('--first-sim-year', type=int, default=3000,
+                        help='first year used for simulation seasons')
+    parser.add_argument('--skip-real', action='store_true', help='do not generate real race results')
+    parser.add_argument('--seed', type=int, default=317)
+    args = parser.parse_args()
+
+    dsn = args.dsn
+    if not dsn:
+        sys.path.insert(0, str(REPO_ROOT / 'backend'))
+        from app.config import Config
+        dsn = (f"host={Config.DB_HOST} port={Config.DB_PORT} dbname={Config.DB_NAME} "
+               f"user={Config.DB_USER} password={Config.DB_PASSWORD}")
+
+    generate(dsn, args.scale, args.duplicate_rate, args.seed, args.first_sim_year,
+             args.users, args.skip_real)
+
+
+if __name__ == '__main__':
+    main()
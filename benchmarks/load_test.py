@@ -0,0 +1,344 @@
+"""
+HTTP load test for the F1 Analytics API.
+
+Starts the Flask app in-process against a database (by default a throwaway
+local PostgreSQL loaded with schema + seeds), drives the hot API endpoints with
+a concurrent load generator and reports p50/p95/p99 latency and throughput.
+Each run is compared against a saved JSON baseline.
+
+Usage:
+    python benchmarks/load_test.py                        # temp cluster + seeds
+    python benchmarks/load_test.py --use-env-db           # DB_* from env / database/.env
+    python benchmarks/load_test.py --save-baseline        # overwrite the baseline
+    python benchmarks/load_test.py --requests 500 --concurrency 16
+    python benchmarks/load_test.py --scale 100           # seeds + generated race_data
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import psycopg2
+
+from local_pg import LocalPostgres, load_schema_and_seeds, REPO_ROOT
+from generate_data import generate
+
+BACKEND_DIR = REPO_ROOT / 'backend'
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+
+# ============================================
+# Scenario parameters
+# ============================================
+
+def collect_params(dsn, rng, pool_size=50):
+    """Pick representative ids from the database so every request hits real rows"""
+    conn = psycopg2.connect(dsn)
+    try:
+        cur = conn.cursor()
+        cur.execute('SELECT id FROM race ORDER BY id')
+        race_ids = [r[0] for r in cur.fetchall()]
+        # Prefer races that actually have results
+        cur.execute('SELECT DISTINCT race_id FROM race_data')
+        result_race_ids = [r[0] for r in cur.fetchall()] or race_ids
+        cur.execute('SELECT id FROM circuit ORDER BY id')
+        circuit_ids = [r[0] for r in cur.fetchall()]
+        cur.execute('SELECT MIN(year), MAX(year) FROM race')
+        min_year, max_year = cur.fetchone()
+
+        # Two drivers from the same race give a valid compare payload
+        cur.execute("""
+            SELECT r.circuit_id, rd.race_id, array_agg(DISTINCT rd.driver_id)
+            FROM race_data rd
+            JOIN race r ON r.id = rd.race_id
+            GROUP BY r.circuit_id, rd.race_id
+            HAVING COUNT(DISTINCT rd.driver_id) >= 2
+            LIMIT 500
+        """)
+        compare_pairs = []
+        for circuit_id, race_id, drivers in cur.fetchall():
+            d1, d2 = rng.sample(drivers, 2)
+            compare_pairs.append({
+                'driver_1_id': d1, 'race_1_id': race_id,
+                'driver_2_id': d2, 'race_2_id': race_id,
+                'circuit_id': circuit_id
+            })
+        cur.close()
+    finally:
+        conn.close()
+
+    def sample(values):
+        return rng.sample(values, min(pool_size, len(values))) if values else []
+
+    return {
+        'race_ids': sample(result_race_ids),
+        'circuit_ids': sample(circuit_ids),
+        'compare_pairs': sample(compare_pairs),
+        'min_year': min_year or 1950,
+        'max_year': max_year or 2024,
+    }
+
+
+def build_scenarios(params):
+    """Each scenario is (name, request factory); factories return (method, path, body)"""
+    race_ids = params['race_ids']
+    circuit_ids = params['circuit_ids']
+    pairs = params['compare_pairs']
+    min_year, max_year = params['min_year'], params['max_year']
+
+    def races(rng):
+        query = f"page={rng.randint(1, 20)}"
+        if rng.random() < 0.5:
+            query += f"&year={rng.randint(min_year, max_year)}"
+        return 'GET', f'/api/races?{query}', None
+
+    def race_results(rng):
+        return 'GET', f'/api/race_results_full/{rng.choice(race_ids)}', None
+
+    def leaderboard(rng):
+        year_from = rng.randint(min_year, max_year)
+        year_to = rng.randint(year_from, max_year)
+        limit = rng.choice((10, 25, 50))
+        return 'GET', f'/api/driver-leaderboard?year_from={year_from}&year_to={year_to}&limit={limit}', None
+
+    def compare(rng):
+        return 'POST', '/api/compare-drivers', json.dumps(rng.choice(pairs))
+
+    def circuit_detail(rng):
+        return 'GET', f'/api/circuits/{rng.choice(circuit_ids)}', None
+
+    scenarios = [('races', races), ('driver_leaderboard', leaderboard)]
+    if race_ids:
+        scenarios.append(('race_results_full', race_results))
+    if circuit_ids:
+        scenarios.append(('circuit_detail', circuit_detail))
+    if pairs:
+        scenarios.append(('compare_drivers', compare))
+    else:
+        print("! No race_data rows with two drivers in one race; skipping compare_drivers")
+    return scenarios
+
+
+# ============================================
+# Load generator
+# ============================================
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def _send(port, method, path, body):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        headers = {'Content-Type': 'application/json'} if body else {}
+        started = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return time.perf_counter() - started, response.status
+    finally:
+        conn.close()
+
+
+def run_scenario(port, factory, total_requests, concurrency, warmup, seed):
+    """Fire `total_requests` requests from `concurrency` workers; return summary stats"""
+    rng = random.Random(seed)
+    planned = [factory(rng) for _ in range(warmup + total_requests)]
+    for method, path, body in planned[:warmup]:
+        _send(port, method, path, body)
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    cursor = iter(planned[warmup:])
+
+    def worker():
+        while True:
+            with lock:
+                item = next(cursor, None)
+            if item is None:
+                return
+            elapsed, status = _send(port, *item)
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status >= 500)
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+        'p50_ms': _ms(percentile(latencies, 50)),
+        'p95_ms': _ms(percentile(latencies, 95)),
+        'p99_ms': _ms(percentile(latencies, 99)),
+        'rps': round(len(latencies) / wall, 1) if wall else None,
+    }
+
+
+def start_app_server(env):
+    """Run the Flask app on a free port in a background thread"""
+    from werkzeug.serving import make_server
+
+    os.environ.update(env)
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app import create_app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = create_app()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+# ============================================
+# Reporting
+# ============================================
+
+def print_report(results, baseline, threshold):
+    """Print a result table and return the names of regressed scenarios"""
+    header = f"{'scenario':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'err':>5}  vs baseline"
+    print()
+    print(header)
+    print('-' * len(header))
+    regressions = []
+    for name, stats in results.items():
+        cells = {key: '-' if stats[key] is None else stats[key] for key in ('p50_ms', 'p95_ms', 'p99_ms', 'rps')}
+        line = (f"{name:<20} {cells['p50_ms']:>9} {cells['p95_ms']:>9} "
+                f"{cells['p99_ms']:>9} {cells['rps']:>8} {stats['errors']:>5}")
+        base = (baseline or {}).get(name)
+        if not stats['count']:
+            line += '  (no requests measured)'
+        elif base and base.get('p95_ms') is not None:
+            p95_delta = (stats['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0
+            rps_delta = (stats['rps'] - base['rps']) / base['rps'] * 100 if base['rps'] else 0
+            flag = ''
+            if p95_delta > threshold or rps_delta < -threshold:
+                flag = '  REGRESSION'
+                regressions.append(name)
+            line += f"  p95 {p95_delta:+.1f}%  rps {rps_delta:+.1f}%{flag}"
+        else:
+            line += '  (no baseline)'
+        print(line)
+    print()
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the F1 Analytics API')
+    parser.add_argument('--use-env-db', action='store_true',
+                        help='use DB_* settings from the environment instead of a temp cluster')
+    parser.add_argument('--keep-cluster', action='store_true', help='do not delete the temp cluster')
+    parser.add_argument('--scale', type=float, default=0,
+                        help='generate user race_data at this multiple of real history (temp cluster only)')
+    parser.add_argument('--requests', type=int, default=300, help='measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=317)
+    parser.add_argument('--only', nargs='*', help='run only these scenarios')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='write this run as the new baseline')
+    parser.add_argument('--output', type=Path, help='write this run as JSON')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='percent change in p95 or throughput that counts as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        pool_size = str(max(args.concurrency + 2, 20))
+        if args.use_env_db:
+            # Config reads the environment at import time
+            os.environ['DB_MAX_CONNECTIONS'] = pool_size
+            sys.path.insert(0, str(BACKEND_DIR))
+            from app.config import Config
+            env = {}
+            dsn = (f"host={Config.DB_HOST} port={Config.DB_PORT} dbname={Config.DB_NAME} "
+                   f"user={Config.DB_USER} password={Config.DB_PASSWORD}")
+        else:
+            pg = stack.enter_context(LocalPostgres(keep=args.keep_cluster))
+            print("Loading schema and seeds...")
+            load_schema_and_seeds(pg.dsn)
+            if args.scale:
+                print(f"Generating synthetic data at {args.scale}x...")
+                generate(pg.dsn, args.scale, seed=args.seed)
+            env = pg.env()
+            dsn = pg.dsn
+
+        env['DB_MAX_CONNECTIONS'] = pool_size
+        rng = random.Random(args.seed)
+        params = collect_params(dsn, rng)
+        scenarios = build_scenarios(params)
+        if args.only:
+            scenarios = [s for s in scenarios if s[0] in args.only]
+
+        server = start_app_server(env)
+        port = server.server_port
+        results = {}
+        try:
+            for index, (name, factory) in enumerate(scenarios):
+                print(f"Running {name} ({args.requests} requests, concurrency {args.concurrency})...")
+                # The routes print SQL paths per request; keep the report readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results[name] = run_scenario(
+                        port, factory, args.requests, args.concurrency, args.warmup, args.seed + index
+                    )
+        finally:
+            server.shutdown()
+
+    baseline = None
+    if args.baseline.exists():
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results')
+
+    regressions = print_report(results, baseline, args.threshold)
+
+    run = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+            'scale': args.scale,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"✓ Baseline saved to {args.baseline}")
+
+    if regressions and args.fail_on_regression:
+        print(f"✗ Regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Throwaway local PostgreSQL cluster for benchmarks.
+
+Creates a cluster with `initdb` in a temp directory, starts it on a free port,
+loads database/schema.sql plus the seed files and tears everything down on exit.
+"""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import psycopg2
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCHEMA_FILE = REPO_ROOT / 'database' / 'schema.sql'
+SEED_DIR = REPO_ROOT / 'database' / 'seed'
+
+# Seed files in foreign key order
+SEED_FILES = [
+    'country.sql',
+    'circuit.sql',
+    'constructor.sql',
+    'driver.sql',
+    'race.sql',
+    'race_driver_standing.sql',
+    'race_constructor_standing.sql',
+]
+
+DB_NAME = 'f1_bench'
+DB_USER = 'postgres'
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _pg_bin(name):
+    """Locate a PostgreSQL server binary (PG_BIN overrides PATH lookup)."""
+    pg_bin = os.getenv('PG_BIN')
+    if pg_bin:
+        return str(Path(pg_bin) / name)
+    found = shutil.which(name)
+    if found:
+        return found
+    # Debian/Ubuntu keep server binaries out of PATH
+    candidates = sorted(Path('/usr/lib/postgresql').glob(f'*/bin/{name}'), reverse=True)
+    if candidates:
+        return str(candidates[0])
+    raise RuntimeError(f"Could not find '{name}'. Install PostgreSQL or set PG_BIN.")
+
+
+def load_sql_file(conn, path):
+    """Execute a whole .sql file in one round trip"""
+    with open(path, 'r', encoding='utf-8') as f:
+        sql = f.read()
+    with conn.cursor() as cur:
+        cur.execute(sql)
+    conn.commit()
+
+
+def load_schema_and_seeds(dsn):
+    """Create the schema and load every seed file into the database at `dsn`"""
+    conn = psycopg2.connect(dsn)
+    try:
+        load_sql_file(conn, SCHEMA_FILE)
+        for filename in SEED_FILES:
+            started = time.perf_counter()
+            load_sql_file(conn, SEED_DIR / filename)
+            print(f"  loaded {filename} in {time.perf_counter() - started:.1f}s")
+        with conn.cursor() as cur:
+            cur.execute('ANALYZE')
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class LocalPostgres:
+    """
+    Context manager around a temporary PostgreSQL cluster
+
+    Usage:
+        with LocalPostgres() as pg:
+            pg.env()   # DB_* variables for app.config
+            pg.dsn     # libpq connection string
+    """
+
+    def __init__(self, keep=False):
+        self.keep = keep
+        self.port = _free_port()
+        self.base_dir = None
+        self.data_dir = None
+
+    @property
+    def dsn(self):
+        return f"host=127.0.0.1 port={self.port} dbname={DB_NAME} user={DB_USER}"
+
+    def env(self):
+        """Environment variables understood by app.config.Config"""
+        return {
+            'DB_HOST': '127.0.0.1',
+            'DB_PORT': str(self.port),
+            'DB_NAME': DB_NAME,
+            'DB_USER': DB_USER,
+            'DB_PASSWORD': '',
+        }
+
+    def start(self):
+        self.base_dir = tempfile.mkdtemp(prefix='f1-bench-pg-')
+        self.data_dir = os.path.join(self.base_dir, 'data')
+        subprocess.run(
+            [_pg_bin('initdb'), '-D', self.data_dir, '-U', DB_USER, '-A', 'trust', '-E', 'UTF8'],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        options = (
+            f"-c listen_addresses=127.0.0.1 -c port={self.port} "
+            f"-c unix_socket_directories={self.base_dir} "
+            "-c fsync=off -c synchronous_commit=off -c full_page_writes=off "
+            "-c max_connections=200"
+        )
+        subprocess.run(
+            [_pg_bin('pg_ctl'), '-D', self.data_dir, '-o', options,
+             '-l', os.path.join(self.base_dir, 'server.log'), '-w', 'start'],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        admin = psycopg2.connect(host='127.0.0.1', port=self.port, dbname='postgres', user=DB_USER)
+        admin.autocommit = True
+        with admin.cursor() as cur:
+            cur.execute(f'CREATE DATABASE {DB_NAME}')
+        admin.close()
+        print(f"✓ Local PostgreSQL running on port {self.port} ({self.data_dir})")
+        return self
+
+    def stop(self):
+        if not self.data_dir:
+            return
+        subprocess.run(
+            [_pg_bin('pg_ctl'), '-D', self.data_dir, '-m', 'fast', '-w', 'stop'],
+            check=False, stdout=subprocess.DEVNULL
+        )
+        if self.keep:
+            print(f"Cluster kept at {self.data_dir}")
+        else:
+            shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
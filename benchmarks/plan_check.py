@@ -0,0 +1,330 @@
+"""
+Query-plan regression checks for every file in database/queries/.
+
+Runs `EXPLAIN (FORMAT JSON)` for each named query with representative parameters
+against the benchmark dataset (schema + seeds + generated data) and checks:
+
+  * race-scoped queries never Seq Scan race_data / race_driver_standing
+  * the planner's estimated total cost stays under the query's budget
+  * the plan shape (node types, relations, indexes) matches the stored snapshot
+    in benchmarks/plans/<query>.json, so plan changes show up in review
+
+Usage:
+    python benchmarks/plan_check.py                       # temp cluster, seeds, --scale 10
+    python benchmarks/plan_check.py --update-snapshots    # accept the current plans
+    python benchmarks/plan_check.py --dsn "host=... dbname=..."
+"""
+import argparse
+import contextlib
+import difflib
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import psycopg2
+
+from local_pg import LocalPostgres, load_schema_and_seeds, REPO_ROOT
+from generate_data import generate
+
+QUERIES_DIR = REPO_ROOT / 'database' / 'queries'
+BACKEND_DIR = REPO_ROOT / 'backend'
+SNAPSHOT_DIR = Path(__file__).resolve().parent / 'plans'
+
+RACE_SCOPED_TABLES = ('race_data', 'race_driver_standing')
+
+
+# ============================================
+# Representative parameters
+# ============================================
+
+def load_context(conn):
+    """Pick ids that exercise the queries the way production traffic does"""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT rd.race_id, r.circuit_id, r.year
+        FROM race_data rd
+        JOIN race r ON r.id = rd.race_id
+        WHERE r.is_real = TRUE
+        GROUP BY rd.race_id, r.circuit_id, r.year
+        ORDER BY COUNT(*) DESC, rd.race_id
+        LIMIT 1
+    """)
+    row = cur.fetchone()
+    if row is None:
+        raise RuntimeError('No race_data rows; generate benchmark data first (generate_data.py)')
+    race_id, circuit_id, year = row
+    cur.execute("""
+        SELECT driver_id FROM race_data
+        WHERE race_id = %s
+        ORDER BY position_display_order
+        LIMIT 2
+    """, (race_id,))
+    drivers = [r[0] for r in cur.fetchall()]
+    cur.close()
+    return {
+        'race_id': race_id,
+        'circuit_id': circuit_id,
+        'year': year,
+        'driver_1_id': drivers[0],
+        'driver_2_id': drivers[-1],
+    }
+
+
+def _compare_params(ctx):
+    d1, d2, r, c = ctx['driver_1_id'], ctx['driver_2_id'], ctx['race_id'], ctx['circuit_id']
+    # Positional order documented in compare_driver_performance.sql
+    return (r, d1, r, d2, d1, c, d2, c, d1, r, d1, r, d1, r, d2, r, d2, r, d2, r, c)
+
+
+def _paged(**extra):
+    return lambda ctx: dict({'limit': 12, 'offset': 0}, **extra)
+
+
+# Every file in database/queries/ needs an entry here.
+#   params:   callable(ctx) -> dict or tuple for the query placeholders
+#   format:   values for {placeholders} the route fills in with str.format (optional)
+#   projection: (module, name) of the route's Projection; checked with every field (optional)
+#   race_scoped: forbid Seq Scans on race_data / race_driver_standing
+#   max_cost: budget for the planner's total cost estimate
+QUERY_SPECS = {
+    'activity_audit.sql': {
+        'params': lambda ctx: None,
+        'race_scoped': False,
+        'max_cost': 50_000,
+    },
+    'analytics_circuit_history.sql': {
+        'params': lambda ctx: {'circuit_id': ctx['circuit_id'], 'limit': 25},
+        'race_scoped': False,
+        'max_cost': 20_000,
+    },
+    'analytics_head_to_head.sql': {
+        'params': lambda ctx: {'driver_a': ctx['driver_1_id'], 'driver_b': ctx['driver_2_id'],
+                               'year_from': None, 'year_to': None},
+        'race_scoped': True,
+        'max_cost': 10_000,
+    },
+    'analytics_season_totals.sql': {
+        'params': lambda ctx: {'year': ctx['year'], 'entity_type': 'driver'},
+        'race_scoped': False,
+        'max_cost': 20_000,
+    },
+    'compare_driver_performance.sql': {
+        'params': _compare_params,
+        'race_scoped': True,
+        'max_cost': 5_000,
+    },
+    'constructors_above_avg.sql': {
+        'params': _paged(name=None, nationality=None, champs_min=None, total_points_min=None,
+                         total_points_max=None, is_real=None, top_pct=None),
+        'race_scoped': False,
+        'max_cost': 20_000,
+    },
+    'driver_leaderboard.sql': {
+        'params': lambda ctx: {'year_from': ctx['year'] - 10, 'year_to': ctx['year'], 'limit': 10},
+        'race_scoped': False,
+        'max_cost': 500_000,
+    },
+    'get_circuit_detail.sql': {
+        'params': lambda ctx: {'circuit_id': ctx['circuit_id']},
+        'race_scoped': True,
+        'max_cost': 20_000,
+    },
+    'get_circuit_races.sql': {
+        'params': lambda ctx: {'circuit_id': ctx['circuit_id']},
+        'race_scoped': True,
+        'max_cost': 10_000,
+    },
+    'race_stats_by_year.sql': {
+        'params': lambda ctx: {
+            'year': None, 'year_from': None, 'year_to': None,
+            'race_count_min': None, 'race_count_max': None,
+            'avg_laps_min': None, 'avg_laps_max': None, 'limit': 10, 'offset': 0
+        },
+        'format': {'order_by': 'race_count DESC, year DESC'},
+        'race_scoped': False,
+        'max_cost': 50_000,
+    },
+    'race_results_header.sql': {
+        'params': lambda ctx: {'race_id': ctx['race_id']},
+        'race_scoped': True,
+        'max_cost': 100,
+    },
+    'race_results_rows.sql': {
+        'params': lambda ctx: {'race_id': ctx['race_id'], 'limit': 50, 'offset': 0},
+        'race_scoped': True,
+        'max_cost': 2_000,
+    },
+    'season_standings_progression.sql': {
+        'params': lambda ctx: {'year': ctx['year'], 'entity_type': 'driver'},
+        'race_scoped': True,
+        'max_cost': 5_000,
+    },
+    'select_constructors.sql': {
+        'params': _paged(name=None, nationality=None, champs_min=None, total_points_min=None,
+                         total_points_max=None, is_real=None),
+        'race_scoped': False,
+        'max_cost': 5_000,
+    },
+    'select_drivers.sql': {
+        'projection': ('app.routes.drivers', 'DRIVER_FIELDS'),
+        'params': _paged(name=None, nationality=None, place_of_birth=None, wins_min=None,
+                         podiums_min=None, points_min=None, poles_min=None,
+                         birth_from=None, birth_to=None, is_real=None),
+        'race_scoped': False,
+        'max_cost': 20_000,
+    },
+    'select_race_data.sql': {
+        'params': lambda ctx: {'race_id': ctx['race_id'], 'is_real': None, 'limit': 50, 'offset': 0},
+        'race_scoped': True,
+        'max_cost': 5_000,
+    },
+    'select_race_results_full.sql': {
+        'projection': ('app.routes.races', 'RACE_RESULT_FIELDS'),
+        'params': lambda ctx: {'race_id': ctx['race_id'], 'limit': 50, 'offset': 0},
+        'race_scoped': True,
+        'max_cost': 5_000,
+    },
+    'select_races.sql': {
+        'projection': ('app.routes.races', 'RACE_FIELDS'),
+        'params': _paged(year=None, round=None, circuit_id=None, official_name=None,
+                         laps_min=None, laps_max=None, date_from=None, date_to=None,
+                         qualifying_format=None, is_real=None),
+        'race_scoped': False,
+        'max_cost': 50_000,
+    },
+    'track_type_performance.sql': {
+        'params': lambda ctx: {'entity_type': 'constructor', 'track_type': 'STREET',
+                               'year_from': None, 'year_to': None, 'limit': 10},
+        'race_scoped': False,
+        'max_cost': 5_000,
+    },
+}
+
+
+# ============================================
+# Plan inspection
+# ============================================
+
+def explain(conn, sql, params):
+    with conn.cursor() as cur:
+        cur.execute('EXPLAIN (FORMAT JSON)\n' + sql, params)
+        plan = cur.fetchone()[0]
+    conn.rollback()
+    return plan[0]['Plan']
+
+
+def walk(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk(child)
+
+
+def plan_shape(node):
+    """Cost-free plan skeleton that stays stable across data refreshes"""
+    shape = {'node': node['Node Type']}
+    for key, label in (('Relation Name', 'relation'), ('Index Name', 'index'),
+                       ('Join Type', 'join'), ('Strategy', 'strategy'),
+                       ('Parent Relationship', 'parent'), ('Subplan Name', 'subplan'),
+                       ('CTE Name', 'cte')):
+        if key in node:
+            shape[label] = node[key]
+    children = [plan_shape(child) for child in node.get('Plans', [])]
+    if children:
+        shape['children'] = children
+    return shape
+
+
+def check_query(conn, filename, spec, ctx, update_snapshots):
+    """Return a list of failure messages for one query file"""
+    with open(QUERIES_DIR / filename, 'r', encoding='utf-8') as f:
+        sql = f.read().strip().rstrip(';')
+    if 'format' in spec:
+        sql = sql.format(**spec['format'])
+    if 'projection' in spec:
+        if str(BACKEND_DIR) not in sys.path:
+            sys.path.insert(0, str(BACKEND_DIR))
+        module, name = spec['projection']
+        projection = getattr(importlib.import_module(module), name)
+        sql = projection.render(sql, list(projection.fields))
+    plan = explain(conn, sql, spec['params'](ctx))
+    failures = []
+
+    if spec['race_scoped']:
+        for node in walk(plan):
+            if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in RACE_SCOPED_TABLES:
+                failures.append(f"Seq Scan on {node['Relation Name']} in a race-scoped query")
+
+    total_cost = plan['Total Cost']
+    if total_cost > spec['max_cost']:
+        failures.append(f"estimated cost {total_cost:,.0f} exceeds budget {spec['max_cost']:,}")
+
+    snapshot_path = SNAPSHOT_DIR / (Path(filename).stem + '.json')
+    current = json.dumps(plan_shape(plan), indent=2) + '\n'
+    if update_snapshots:
+        SNAPSHOT_DIR.mkdir(exist_ok=True)
+        snapshot_path.write_text(current, encoding='utf-8')
+    elif not snapshot_path.exists():
+        # A missing snapshot would otherwise pass silently on every fresh checkout
+        failures.append(f'no stored plan: run with --update-snapshots and commit {SNAPSHOT_DIR.name}/{snapshot_path.name}')
+    else:
+        stored = snapshot_path.read_text(encoding='utf-8')
+        if stored != current:
+            diff = difflib.unified_diff(
+                stored.splitlines(), current.splitlines(),
+                fromfile=f'{snapshot_path.name} (stored)', tofile=f'{snapshot_path.name} (current)',
+                lineterm=''
+            )
+            failures.append('plan shape changed:\n' + '\n'.join(diff))
+
+    return total_cost, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check query plans for database/queries/*.sql')
+    parser.add_argument('--dsn', help='check an existing database instead of a temp cluster')
+    parser.add_argument('--scale', type=float, default=10, help='generated data scale for the temp cluster')
+    parser.add_argument('--seed', type=int, default=317)
+    parser.add_argument('--update-snapshots', action='store_true', help='rewrite benchmarks/plans/*.json')
+    parser.add_argument('--only', nargs='*', help='check only these query files')
+    args = parser.parse_args()
+
+    missing = sorted(p.name for p in QUERIES_DIR.glob('*.sql') if p.name not in QUERY_SPECS)
+    if missing:
+        print(f"✗ No plan spec for: {', '.join(missing)} (add them to QUERY_SPECS)")
+        sys.exit(1)
+
+    with contextlib.ExitStack() as stack:
+        dsn = args.dsn
+        if not dsn:
+            pg = stack.enter_context(LocalPostgres())
+            print("Loading schema and seeds...")
+            load_schema_and_seeds(pg.dsn)
+            print(f"Generating synthetic data at {args.scale}x...")
+            generate(pg.dsn, args.scale, seed=args.seed)
+            dsn = pg.dsn
+
+        conn = psycopg2.connect(dsn)
+        stack.callback(conn.close)
+        ctx = load_context(conn)
+        conn.rollback()
+
+        failed = 0
+        for filename, spec in sorted(QUERY_SPECS.items()):
+            if args.only and filename not in args.only:
+                continue
+            total_cost, failures = check_query(conn, filename, spec, ctx, args.update_snapshots)
+            status = '✗' if failures else '✓'
+            print(f"{status} {filename:<40} cost {total_cost:>12,.0f}")
+            for failure in failures:
+                print('    ' + failure.replace('\n', '\n    '))
+            failed += bool(failures)
+
+    if failed:
+        print(f"\n✗ {failed} query plan check(s) failed")
+        sys.exit(1)
+    print("\n✓ All query plans within limits")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Row fetching + JSON encoding benchmark: DictCursor/dict/jsonify vs tuples/encode_rows.
+
+Runs the large list queries the API serves on both paths against the benchmark
+dataset, checks that both produce byte-identical responses, and reports the median
+time per response split into fetch and encode.
+
+Usage:
+    python benchmarks/serialize_bench.py                  # temp cluster, seeds, --scale 10
+    python benchmarks/serialize_bench.py --dsn "host=... dbname=..."
+    python benchmarks/serialize_bench.py --rows 2000 --repeat 50
+"""
+import argparse
+import contextlib
+import statistics
+import sys
+import time
+
+import psycopg2
+import psycopg2.extras
+
+from local_pg import LocalPostgres, load_schema_and_seeds, REPO_ROOT
+from generate_data import generate
+
+BACKEND_DIR = REPO_ROOT / 'backend'
+QUERIES_DIR = REPO_ROOT / 'database' / 'queries'
+
+# query file -> (response key, params); limit is filled from --rows
+SCENARIOS = {
+    'select_race_data.sql': ('race_data', {'race_id': None, 'is_real': None, 'offset': 0}),
+    'select_races.sql': ('races', {
+        'year': None, 'round': None, 'circuit_id': None, 'official_name': None,
+        'laps_min': None, 'laps_max': None, 'date_from': None, 'date_to': None,
+        'qualifying_format': None, 'is_real': None, 'offset': 0
+    }),
+    'select_drivers.sql': ('drivers', {
+        'name': None, 'nationality': None, 'place_of_birth': None, 'wins_min': None,
+        'podiums_min': None, 'points_min': None, 'poles_min': None,
+        'birth_from': None, 'birth_to': None, 'is_real': None, 'offset': 0
+    }),
+}
+
+
+def time_path(conn, run_query, encode, repeat):
+    """Median (fetch ms, encode ms) and the last response body"""
+    fetch_times, encode_times = [], []
+    body = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fetched = run_query(conn)
+        middle = time.perf_counter()
+        body = encode(fetched)
+        end = time.perf_counter()
+        fetch_times.append((middle - start) * 1000)
+        encode_times.append((end - middle) * 1000)
+    return statistics.median(fetch_times), statistics.median(encode_times), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the DictCursor and tuple JSON paths')
+    parser.add_argument('--dsn', help='benchmark an existing database instead of a temp cluster')
+    parser.add_argument('--scale', type=float, default=10, help='generated data scale for the temp cluster')
+    parser.add_argument('--seed', type=int, default=317)
+    parser.add_argument('--rows', type=int, default=1000, help='LIMIT for every query')
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    from flask import Flask, jsonify
+    from app.json_rows import encode_rows, json_response
+    from app.routes.races import RACE_FIELDS
+    from app.routes.drivers import DRIVER_FIELDS
+    projections = {'select_races.sql': RACE_FIELDS, 'select_drivers.sql': DRIVER_FIELDS}
+
+    with contextlib.ExitStack() as stack:
+        dsn = args.dsn
+        if not dsn:
+            pg = stack.enter_context(LocalPostgres())
+            print("Loading schema and seeds...")
+            load_schema_and_seeds(pg.dsn)
+            print(f"Generating synthetic data at {args.scale}x...")
+            generate(pg.dsn, args.scale, seed=args.seed)
+            dsn = pg.dsn
+
+        conn = psycopg2.connect(dsn)
+        stack.callback(conn.close)
+        cur = conn.cursor()
+        cur.execute('SELECT race_id FROM race_data GROUP BY race_id ORDER BY COUNT(*) DESC LIMIT 1')
+        busiest_race = cur.fetchone()
+        cur.close()
+
+        app = Flask('serialize_bench')
+        stack.enter_context(app.app_context())
+
+        print(f"\n{'query':<24} {'path':<8} {'rows':>6} {'fetch ms':>10} {'encode ms':>10} {'total ms':>10}")
+        mismatches = 0
+        for filename, (key, base_params) in SCENARIOS.items():
+            sql = (QUERIES_DIR / filename).read_text(encoding='utf-8')
+            if filename in projections:
+                projection = projections[filename]
+                sql = projection.render(sql, list(projection.fields))
+            params = dict(base_params, limit=args.rows)
+            if 'race_id' in params:
+                params['race_id'] = busiest_race[0] if busiest_race else None
+
+            def dict_query(conn):
+                with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cursor:
+                    cursor.execute(sql, params)
+                    rows = cursor.fetchall()
+                conn.rollback()
+                return rows
+
+            def tuple_query(conn):
+                with conn.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    result = cursor.description, cursor.fetchall()
+                conn.rollback()
+                return result
+
+            def dict_encode(rows):
+                return jsonify({key: [dict(row) for row in rows]}).get_data()
+
+            def tuple_encode(result):
+                description, rows = result
+                return json_response({key: encode_rows(description, rows)}).get_data()
+
+            results = {}
+            for path, run_query, encode in (('dict', dict_query, dict_encode),
+                                            ('tuple', tuple_query, tuple_encode)):
+                fetch_ms, encode_ms, body = time_path(conn, run_query, encode, args.repeat)
+                results[path] = (fetch_ms + encode_ms, body)
+                row_count = len(run_query(conn) if path == 'dict' else run_query(conn)[1])
+                print(f"{filename:<24} {path:<8} {row_count:>6} {fetch_ms:>10.2f} {encode_ms:>10.2f} "
+                      f"{fetch_ms + encode_ms:>10.2f}")
+
+            speedup = results['dict'][0] / results['tuple'][0] if results['tuple'][0] else float('inf')
+            same = results['dict'][1] == results['tuple'][1]
+            mismatches += not same
+            print(f"{'':<24} {'speedup':<8} {speedup:>6.2f}x  {'identical output' if same else '✗ OUTPUT DIFFERS'}")
+
+    if mismatches:
+        print(f"\n✗ {mismatches} scenario(s) produced different JSON")
+        sys.exit(1)
+    print("\n✓ Both paths produce identical JSON")
+
+
+if __name__ == '__main__':
+    main()
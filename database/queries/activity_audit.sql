@@ -0,0 +1,96 @@
+-- Data audit: one row per inactive or orphaned entity, all dimensions in one pass
+-- Each check is a NOT EXISTS anti-join served by an index (rcda_*_idx, race_circuit_id_idx,
+-- deletion_job_open_idx)
+-- Dimensions: constructor / driver (never raced), circuit (no races), user_data (orphaned
+-- simulation rows). Owner FKs cascade, so an orphan is data whose account or own deletion
+-- is in progress but that the deletion jobs will not remove.
+SELECT 'constructor' AS dimension, c.id, c.name, co.name AS nationality, 'Never Raced' AS status
+FROM constructor c
+JOIN country co ON c.country_id = co.id
+WHERE c.deleted_at IS NULL
+  AND NOT EXISTS (SELECT 1 FROM race_data rd WHERE rd.constructor_id = c.id)
+
+UNION ALL
+
+SELECT 'driver', d.id, d.name, co.name, 'Never Raced'
+FROM driver d
+JOIN country co ON d.nationality_country_id = co.id
+WHERE d.deleted_at IS NULL
+  AND NOT EXISTS (SELECT 1 FROM race_data rd WHERE rd.driver_id = d.id)
+
+UNION ALL
+
+SELECT 'circuit', ci.id, ci.name, co.name, 'No Races'
+FROM circuit ci
+JOIN country co ON ci.country_id = co.id
+WHERE NOT EXISTS (SELECT 1 FROM race r WHERE r.circuit_id = ci.id AND r.deleted_at IS NULL)
+
+UNION ALL
+
+-- Simulated races that never received results
+SELECT 'user_data', r.id::TEXT, r.official_name, NULL, 'Simulated Race Without Results'
+FROM race r
+WHERE r.is_real = FALSE AND r.deleted_at IS NULL
+  AND NOT EXISTS (SELECT 1 FROM race_data rd WHERE rd.race_id = r.id)
+
+UNION ALL
+
+-- Live simulation data of a tombstoned account (created after the account's deletion was
+-- queued, so still visible until the job removes it, or for good if the job failed)
+SELECT 'user_data', d.id, d.name, NULL, 'Simulated Driver Of Deleted Account'
+FROM driver d
+JOIN "user" u ON u.id = d.user_id
+WHERE d.is_real = FALSE AND d.deleted_at IS NULL AND u.deleted_at IS NOT NULL
+
+UNION ALL
+
+SELECT 'user_data', c.id, c.name, NULL, 'Simulated Constructor Of Deleted Account'
+FROM constructor c
+JOIN "user" u ON u.id = c.user_id
+WHERE c.is_real = FALSE AND c.deleted_at IS NULL AND u.deleted_at IS NOT NULL
+
+UNION ALL
+
+SELECT 'user_data', r.id::TEXT, r.official_name, NULL, 'Simulated Race Of Deleted Account'
+FROM race r
+JOIN "user" u ON u.id = r.user_id
+WHERE r.is_real = FALSE AND r.deleted_at IS NULL AND u.deleted_at IS NOT NULL
+
+UNION ALL
+
+-- Tombstoned simulation data that no open deletion job will remove
+SELECT 'user_data', d.id, d.name, NULL, 'Deleted Driver Awaiting Cleanup'
+FROM driver d
+WHERE d.is_real = FALSE AND d.deleted_at IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM deletion_job j
+      WHERE j.status IN ('queued', 'running')
+        AND ((j.entity_type = 'driver' AND j.entity_id = d.id)
+             OR (j.entity_type = 'user' AND j.entity_id = d.user_id))
+  )
+
+UNION ALL
+
+SELECT 'user_data', c.id, c.name, NULL, 'Deleted Constructor Awaiting Cleanup'
+FROM constructor c
+WHERE c.is_real = FALSE AND c.deleted_at IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM deletion_job j
+      WHERE j.status IN ('queued', 'running')
+        AND ((j.entity_type = 'constructor' AND j.entity_id = c.id)
+             OR (j.entity_type = 'user' AND j.entity_id = c.user_id))
+  )
+
+UNION ALL
+
+SELECT 'user_data', r.id::TEXT, r.official_name, NULL, 'Deleted Race Awaiting Cleanup'
+FROM race r
+WHERE r.is_real = FALSE AND r.deleted_at IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM deletion_job j
+      WHERE j.status IN ('queued', 'running')
+        AND ((j.entity_type = 'race' AND j.entity_id = r.id::TEXT)
+             OR (j.entity_type = 'user' AND j.entity_id = r.user_id))
+  )
+
+ORDER BY dimension, name;
@@ -0,0 +1,29 @@
+-- Every driver's record at one circuit (all seasons)
+-- SQL path of AnalyticsSnapshot.circuit_history (app/analytics_engine.py); keep both in step
+-- Params: circuit_id, limit
+WITH rd_dedup AS (
+    SELECT DISTINCT ON (rd.race_id, rd.driver_id) rd.*, r.year
+    FROM race_data rd
+    JOIN race r ON r.id = rd.race_id
+    WHERE r.circuit_id = %(circuit_id)s
+      AND r.deleted_at IS NULL
+    ORDER BY rd.race_id, rd.driver_id, rd.is_real DESC, rd.created_at DESC, rd.id DESC
+)
+SELECT
+    rd.driver_id,
+    d.full_name AS driver_name,
+    COUNT(*) AS races,
+    COUNT(*) FILTER (WHERE rd.position_display_order = 1) AS wins,
+    COUNT(*) FILTER (WHERE rd.position_display_order <= 3) AS podiums,
+    COUNT(*) FILTER (WHERE rd.race_pole_position) AS poles,
+    MIN(rd.position_display_order) AS best_finish,
+    ROUND(AVG(rd.position_display_order), 1) AS avg_finish,
+    COALESCE(SUM(rd.race_points), 0)::NUMERIC(10,2) AS points,
+    MIN(rd.year) AS first_year,
+    MAX(rd.year) AS last_year
+FROM rd_dedup rd
+JOIN driver d      ON d.id = rd.driver_id      AND d.deleted_at IS NULL
+JOIN constructor c ON c.id = rd.constructor_id AND c.deleted_at IS NULL
+GROUP BY rd.driver_id, d.full_name
+ORDER BY wins DESC, podiums DESC, points DESC, rd.driver_id COLLATE "C"
+LIMIT %(limit)s;
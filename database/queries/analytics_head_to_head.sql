@@ -0,0 +1,30 @@
+-- Two drivers in the races they both took part in, per season
+-- SQL path of AnalyticsSnapshot.head_to_head (app/analytics_engine.py); keep both in step
+-- Params: driver_a, driver_b, year_from, year_to (NULL = open)
+WITH rd_dedup AS (
+    SELECT DISTINCT ON (rd.race_id, rd.driver_id) rd.*
+    FROM race_data rd
+    WHERE rd.driver_id IN (%(driver_a)s, %(driver_b)s)
+    ORDER BY rd.race_id, rd.driver_id, rd.is_real DESC, rd.created_at DESC, rd.id DESC
+),
+scope AS (
+    SELECT rd.race_id, rd.driver_id, rd.position_display_order, rd.race_points, r.year
+    FROM rd_dedup rd
+    JOIN race r        ON r.id = rd.race_id        AND r.deleted_at IS NULL
+    JOIN driver d      ON d.id = rd.driver_id      AND d.deleted_at IS NULL
+    JOIN constructor c ON c.id = rd.constructor_id AND c.deleted_at IS NULL
+    WHERE (%(year_from)s IS NULL OR r.year >= %(year_from)s)
+      AND (%(year_to)s IS NULL OR r.year <= %(year_to)s)
+)
+SELECT
+    a.year,
+    COUNT(*) AS races,
+    COUNT(*) FILTER (WHERE a.position_display_order < b.position_display_order) AS a_ahead,
+    COUNT(*) FILTER (WHERE b.position_display_order < a.position_display_order) AS b_ahead,
+    COALESCE(SUM(a.race_points), 0)::NUMERIC(10,2) AS a_points,
+    COALESCE(SUM(b.race_points), 0)::NUMERIC(10,2) AS b_points
+FROM scope a
+JOIN scope b ON b.race_id = a.race_id AND b.driver_id = %(driver_b)s
+WHERE a.driver_id = %(driver_a)s
+GROUP BY a.year
+ORDER BY a.year;
@@ -0,0 +1,86 @@
+-- Per-driver or per-constructor totals for one season, with the championship standing
+-- after the season's last round that has standings
+-- SQL path of AnalyticsSnapshot.season_totals (app/analytics_engine.py); keep both in step
+-- Params: year, entity_type ('driver' or 'constructor')
+WITH rd_dedup AS (
+    SELECT DISTINCT ON (rd.race_id, rd.driver_id) rd.*
+    FROM race_data rd
+    JOIN race r ON r.id = rd.race_id
+    WHERE r.year = %(year)s
+      AND r.deleted_at IS NULL
+    ORDER BY rd.race_id, rd.driver_id, rd.is_real DESC, rd.created_at DESC, rd.id DESC
+),
+scope AS (
+    SELECT
+        CASE WHEN %(entity_type)s = 'driver' THEN rd.driver_id ELSE rd.constructor_id END AS entity_id,
+        rd.race_id,
+        rd.position_display_order,
+        rd.race_points,
+        rd.race_pole_position
+    FROM rd_dedup rd
+    JOIN driver d      ON d.id = rd.driver_id      AND d.deleted_at IS NULL
+    JOIN constructor c ON c.id = rd.constructor_id AND c.deleted_at IS NULL
+),
+totals AS (
+    SELECT
+        entity_id,
+        COUNT(DISTINCT race_id) AS races,
+        COUNT(*) FILTER (WHERE position_display_order = 1) AS wins,
+        COUNT(*) FILTER (WHERE position_display_order <= 3) AS podiums,
+        COUNT(*) FILTER (WHERE race_pole_position) AS poles,
+        COALESCE(SUM(race_points), 0)::NUMERIC(10,2) AS points
+    FROM scope
+    GROUP BY entity_id
+),
+final_driver_round AS (
+    SELECT r.id
+    FROM race r
+    WHERE r.year = %(year)s
+      AND r.deleted_at IS NULL
+      AND EXISTS (
+          SELECT 1 FROM race_driver_standing s
+          JOIN driver d ON d.id = s.driver_id AND d.deleted_at IS NULL
+          WHERE s.race_id = r.id
+      )
+    ORDER BY r.round DESC
+    LIMIT 1
+),
+final_constructor_round AS (
+    SELECT r.id
+    FROM race r
+    WHERE r.year = %(year)s
+      AND r.deleted_at IS NULL
+      AND EXISTS (
+          SELECT 1 FROM race_constructor_standing s
+          JOIN constructor c ON c.id = s.constructor_id AND c.deleted_at IS NULL
+          WHERE s.race_id = r.id
+      )
+    ORDER BY r.round DESC
+    LIMIT 1
+),
+standing AS (
+    SELECT s.driver_id AS entity_id, s.position_number, s.points
+    FROM race_driver_standing s
+    WHERE %(entity_type)s = 'driver'
+      AND s.race_id = (SELECT id FROM final_driver_round)
+    UNION ALL
+    SELECT s.constructor_id, s.position_number, s.points
+    FROM race_constructor_standing s
+    WHERE %(entity_type)s = 'constructor'
+      AND s.race_id = (SELECT id FROM final_constructor_round)
+)
+SELECT
+    t.entity_id,
+    COALESCE(d.name, c.name) AS name,
+    t.races,
+    t.wins,
+    t.podiums,
+    t.poles,
+    t.points,
+    s.position_number AS championship_position,
+    s.points AS championship_points
+FROM totals t
+LEFT JOIN driver d      ON %(entity_type)s = 'driver' AND d.id = t.entity_id
+LEFT JOIN constructor c ON %(entity_type)s = 'constructor' AND c.id = t.entity_id
+LEFT JOIN standing s    ON s.entity_id = t.entity_id
+ORDER BY t.points DESC, t.wins DESC, t.entity_id COLLATE "C";
@@ -11,6 +11,7 @@
 -- - GROUP BY with aggregate functions (COUNT, AVG, SUM, MIN)
 -- - LEFT JOINs for championship standings
 -- - CTEs (Common Table Expressions) for readability
+-- - Tombstoned races, drivers and constructors (deleted_at set) are left out
 --
 -- Parameters (21 total, in order of appearance):
 -- 1: race_1_id, 2: driver_1_id
@@ -42,8 +43,9 @@ race_1_all_positions AS (
         -- Use RANK to get actual position within this race
         RANK() OVER (ORDER BY rd.position_display_order ASC) AS finish_position
     FROM race_data rd
-    INNER JOIN race r ON rd.race_id = r.id
-    INNER JOIN constructor c ON rd.constructor_id = c.id
+    INNER JOIN race r ON rd.race_id = r.id AND r.deleted_at IS NULL
+    INNER JOIN constructor c ON rd.constructor_id = c.id AND c.deleted_at IS NULL
+    INNER JOIN driver dr ON rd.driver_id = dr.id AND dr.deleted_at IS NULL
     WHERE rd.race_id = %s
 ),
 
@@ -72,8 +74,9 @@ race_2_all_positions AS (
         c.name AS constructor_name,
         RANK() OVER (ORDER BY rd.position_display_order ASC) AS finish_position
     FROM race_data rd
-    INNER JOIN race r ON rd.race_id = r.id
-    INNER JOIN constructor c ON rd.constructor_id = c.id
+    INNER JOIN race r ON rd.race_id = r.id AND r.deleted_at IS NULL
+    INNER JOIN constructor c ON rd.constructor_id = c.id AND c.deleted_at IS NULL
+    INNER JOIN driver dr ON rd.driver_id = dr.id AND dr.deleted_at IS NULL
     WHERE rd.race_id = %s
 ),
 
@@ -103,7 +106,7 @@ driver_1_circuit_history AS (
         SUM(COALESCE(rd.race_points, 0)) AS total_points_at_circuit,
         ROUND(AVG(COALESCE(rd.race_points, 0))::numeric, 1) AS avg_points_per_race
     FROM race_data rd
-    INNER JOIN race r ON rd.race_id = r.id
+    INNER JOIN race r ON rd.race_id = r.id AND r.deleted_at IS NULL
     WHERE rd.driver_id = %s 
       AND r.circuit_id = %s
     GROUP BY rd.driver_id
@@ -124,7 +127,7 @@ driver_2_circuit_history AS (
         SUM(COALESCE(rd.race_points, 0)) AS total_points_at_circuit,
         ROUND(AVG(COALESCE(rd.race_points, 0))::numeric, 1) AS avg_points_per_race
     FROM race_data rd
-    INNER JOIN race r ON rd.race_id = r.id
+    INNER JOIN race r ON rd.race_id = r.id AND r.deleted_at IS NULL
     WHERE rd.driver_id = %s 
       AND r.circuit_id = %s
     GROUP BY rd.driver_id
@@ -144,7 +147,7 @@ driver_1_season_stats AS (
         (
             SELECT COUNT(*) 
             FROM race_data rd2 
-            INNER JOIN race r2 ON rd2.race_id = r2.id
+            INNER JOIN race r2 ON rd2.race_id = r2.id AND r2.deleted_at IS NULL
             WHERE rd2.driver_id = %s
               AND rd2.position_display_order = 1
               AND r2.year = (SELECT year FROM race WHERE id = %s)
@@ -153,7 +156,7 @@ driver_1_season_stats AS (
         (
             SELECT COUNT(*) 
             FROM race_data rd3 
-            INNER JOIN race r3 ON rd3.race_id = r3.id
+            INNER JOIN race r3 ON rd3.race_id = r3.id AND r3.deleted_at IS NULL
             WHERE rd3.driver_id = %s
               AND rd3.position_display_order <= 3
               AND r3.year = (SELECT year FROM race WHERE id = %s)
@@ -174,7 +177,7 @@ driver_2_season_stats AS (
         (
             SELECT COUNT(*) 
             FROM race_data rd2 
-            INNER JOIN race r2 ON rd2.race_id = r2.id
+            INNER JOIN race r2 ON rd2.race_id = r2.id AND r2.deleted_at IS NULL
             WHERE rd2.driver_id = %s
               AND rd2.position_display_order = 1
               AND r2.year = (SELECT year FROM race WHERE id = %s)
@@ -182,7 +185,7 @@ driver_2_season_stats AS (
         (
             SELECT COUNT(*) 
             FROM race_data rd3 
-            INNER JOIN race r3 ON rd3.race_id = r3.id
+            INNER JOIN race r3 ON rd3.race_id = r3.id AND r3.deleted_at IS NULL
             WHERE rd3.driver_id = %s
               AND rd3.position_display_order <= 3
               AND r3.year = (SELECT year FROM race WHERE id = %s)
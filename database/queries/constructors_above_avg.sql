@@ -1,14 +1,17 @@
 -- constructors with above average performance within their country
+-- country figures come from constructor_country_stats (kept current by triggers, see schema.sql)
+-- top_pct (10, 25 or 50) narrows the result to the top share of each country
 SELECT 
     c.*, 
     co.name AS nationality,
-    -- calculate country average total points
-    (SELECT AVG(c2.total_points) 
-     FROM constructor c2 
-     WHERE c2.country_id = c.country_id) AS country_avg,
+    s.avg_points AS country_avg,
+    s.median_points AS country_median,
+    s.stddev_points AS country_stddev,
+    s.constructor_count AS country_constructor_count,
     COUNT(*) OVER() as full_count
 FROM constructor c
 JOIN country co ON c.country_id = co.id
+JOIN constructor_country_stats s ON s.country_id = c.country_id
 WHERE
     (%(name)s IS NULL OR c.full_name ILIKE '%%' || %(name)s || '%%')
     AND
@@ -21,13 +24,15 @@ WHERE
     (%(total_points_max)s IS NULL OR c.total_points <= %(total_points_max)s)
     AND
     (%(is_real)s IS NULL OR c.is_real = %(is_real)s)
--- grouping by constructor and country
-GROUP BY c.id, co.name
--- only include constructors with above average total points in their country
-HAVING c.total_points > (
-    SELECT AVG(c3.total_points) 
-    FROM constructor c3 
-    WHERE c3.country_id = c.country_id
-)
+    AND
+    c.deleted_at IS NULL
+    -- only include constructors with above average total points in their country
+    AND c.total_points > s.avg_points
+    AND
+    (%(top_pct)s IS NULL OR c.total_points >= CASE %(top_pct)s::INT
+        WHEN 10 THEN s.p90_points
+        WHEN 25 THEN s.p75_points
+        ELSE s.median_points
+    END)
 ORDER BY c.total_points DESC
-LIMIT %(limit)s OFFSET %(offset)s;
\ No newline at end of file
+LIMIT %(limit)s OFFSET %(offset)s;
@@ -23,8 +23,9 @@ scope AS (
         COALESCE(rd.race_points, 0) AS race_points,
         rd.position_display_order
     FROM rd_dedup rd
-    JOIN race r   ON r.id = rd.race_id
-    JOIN driver d ON d.id = rd.driver_id
+    JOIN race r        ON r.id = rd.race_id        AND r.deleted_at IS NULL
+    JOIN driver d      ON d.id = rd.driver_id      AND d.deleted_at IS NULL
+    JOIN constructor c ON c.id = rd.constructor_id AND c.deleted_at IS NULL
     WHERE
         r.year BETWEEN %(year_from)s AND %(year_to)s
         AND rd.is_real = TRUE
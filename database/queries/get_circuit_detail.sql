@@ -27,16 +27,16 @@ race_rollup AS (
         MAX(r.year) AS last_year,
         AVG(r.laps)::NUMERIC(10,2) AS avg_laps
     FROM race r
-    WHERE r.circuit_id = %(circuit_id)s
+    WHERE r.circuit_id = %(circuit_id)s AND r.deleted_at IS NULL
     GROUP BY r.circuit_id
 ),
 winner_stats AS (
     SELECT 
         r.circuit_id,
-        COUNT(DISTINCT CASE WHEN rd.position_display_order = 1 THEN rd.driver_id END) AS unique_winners
+        COUNT(DISTINCT rs.winner_driver_id) AS unique_winners
     FROM race r
-    LEFT JOIN race_data rd ON rd.race_id = r.id
-    WHERE r.circuit_id = %(circuit_id)s
+    LEFT JOIN race_summary rs ON rs.race_id = r.id
+    WHERE r.circuit_id = %(circuit_id)s AND r.deleted_at IS NULL
     GROUP BY r.circuit_id
 ),
 home_driver_counts AS (
@@ -45,7 +45,7 @@ home_driver_counts AS (
         COUNT(DISTINCT d.id) AS home_drivers
     FROM circuit c
     LEFT JOIN country co ON c.country_id = co.id
-    LEFT JOIN driver d ON d.nationality_country_id = co.id
+    LEFT JOIN driver d ON d.nationality_country_id = co.id AND d.deleted_at IS NULL
     WHERE c.id = %(circuit_id)s
     GROUP BY c.id
 ),
@@ -55,7 +55,7 @@ home_constructor_counts AS (
         COUNT(DISTINCT cons.id) AS home_constructors
     FROM circuit c
     LEFT JOIN country co ON c.country_id = co.id
-    LEFT JOIN constructor cons ON cons.country_id = co.id
+    LEFT JOIN constructor cons ON cons.country_id = co.id AND cons.deleted_at IS NULL
     WHERE c.id = %(circuit_id)s
     GROUP BY c.id
 ),
@@ -72,29 +72,22 @@ race_payload AS (
                 'qualifying_format', r.qualifying_format,
                 'laps', r.laps,
                 'is_real', r.is_real,
-                'participant_count', (
-                    SELECT COUNT(*) 
-                    FROM race_data rd 
-                    WHERE rd.race_id = r.id
-                ),
-                'winner', (
-                    SELECT json_build_object(
-                        'driver_id', d.id,
-                        'driver_name', d.full_name,
-                        'constructor_name', cons.full_name
-                    )
-                    FROM race_data rd2
-                    JOIN driver d ON rd2.driver_id = d.id
-                    LEFT JOIN constructor cons ON cons.id = rd2.constructor_id
-                    WHERE rd2.race_id = r.id
-                    ORDER BY rd2.position_display_order ASC
-                    LIMIT 1
-                )
+                'participant_count', COALESCE(rs.participant_count, 0),
+                'winner', CASE WHEN wd.id IS NOT NULL THEN json_build_object(
+                    'driver_id', wd.id,
+                    'driver_name', wd.full_name,
+                    'constructor_name', wc.full_name
+                ) END,
+                'pole_driver_id', rs.pole_driver_id
             )
             ORDER BY r.year DESC, r.round DESC
         ) AS races
     FROM race r
-    WHERE r.circuit_id = %(circuit_id)s
+    -- Per-race figures from race_summary (kept current by triggers, see schema.sql)
+    LEFT JOIN race_summary rs ON rs.race_id = r.id
+    LEFT JOIN driver wd ON wd.id = rs.winner_driver_id AND wd.deleted_at IS NULL
+    LEFT JOIN constructor wc ON wc.id = rs.winner_constructor_id AND wc.deleted_at IS NULL
+    WHERE r.circuit_id = %(circuit_id)s AND r.deleted_at IS NULL
     GROUP BY r.circuit_id
 )
 SELECT 
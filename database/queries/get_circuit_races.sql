@@ -1,3 +1,4 @@
+-- Races at a circuit; participant counts come from race_summary (kept current by triggers, see schema.sql)
 SELECT 
     r.id,
     r.year,
@@ -7,11 +8,8 @@ SELECT
     r.qualifying_format,
     r.laps,
     r.is_real,
-    (
-        SELECT COUNT(*) 
-        FROM race_data rd 
-        WHERE rd.race_id = r.id
-    ) AS participant_count
+    COALESCE(rs.participant_count, 0) AS participant_count
 FROM race r
-WHERE r.circuit_id = %(circuit_id)s
+LEFT JOIN race_summary rs ON rs.race_id = r.id
+WHERE r.circuit_id = %(circuit_id)s AND r.deleted_at IS NULL
 ORDER BY r.year DESC, r.round DESC;
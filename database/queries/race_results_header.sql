@@ -0,0 +1,24 @@
+-- Header for the normalized race results payload: race + circuit + circuit country, once
+-- Params: race_id
+SELECT
+    r.id AS race_id,
+    r.year,
+    r.round,
+    r.official_name AS name,
+    r.date,
+    r.laps,
+    r.qualifying_format,
+    cir.id AS circuit_id,
+    cir.full_name AS circuit_name,
+    cir.place_name AS circuit_place,
+    cir.type AS circuit_type,
+    cir.length AS circuit_length_km,
+    cir.turns AS circuit_turns,
+    cir.direction AS circuit_direction,
+    co.id AS country_id,
+    co.name AS country_name,
+    co.alpha3_code AS country_code
+FROM race r
+JOIN circuit cir ON cir.id = r.circuit_id
+JOIN country co ON co.id = cir.country_id
+WHERE r.id = %(race_id)s AND r.deleted_at IS NULL;
@@ -0,0 +1,28 @@
+-- Result rows for the normalized race results payload (header comes from race_results_header.sql)
+-- One row per driver (duplicate uploads collapsed to the best placed one); constructor and
+-- nationality are returned as ids and dictionary-encoded by the route
+-- Params: race_id, limit, offset
+SELECT
+    rd.id AS result_id,
+    rd.position_display_order AS finish_position,
+    rd.driver_number,
+    rd.race_points,
+    rd.race_pole_position,
+    rd.race_qualification_position_number AS quali_position,
+    rd.race_grid_position_number AS grid_position,
+    rd.driver_id,
+    d.full_name AS driver_name,
+    d.abbreviation AS driver_abbr,
+    d.nationality_country_id,
+    rd.constructor_id,
+    COUNT(*) OVER() AS full_count
+FROM (
+    SELECT DISTINCT ON (driver_id) *
+    FROM race_data x
+    WHERE x.race_id = %(race_id)s
+      AND NOT EXISTS (SELECT 1 FROM constructor xc WHERE xc.id = x.constructor_id AND xc.deleted_at IS NOT NULL)
+    ORDER BY driver_id, position_display_order ASC NULLS LAST
+) rd
+JOIN driver d ON d.id = rd.driver_id AND d.deleted_at IS NULL
+ORDER BY rd.position_display_order ASC NULLS LAST, rd.race_points DESC NULLS LAST
+LIMIT %(limit)s OFFSET %(offset)s;
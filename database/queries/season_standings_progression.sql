@@ -0,0 +1,34 @@
+-- Championship standings after every round of one season, for the progression chart
+-- Reads the season's races through race_year_idx, then each race's standings rows through
+-- rds_race_id_idx / rcst_race_id_idx; only the branch for entity_type runs
+-- Params: year, entity_type ('driver' or 'constructor')
+WITH season_race AS (
+    SELECT r.id, r.round, r.official_name, r.date
+    FROM race r
+    WHERE r.year = %(year)s
+      AND r.deleted_at IS NULL
+)
+SELECT
+    sr.id AS race_id,
+    sr.round,
+    sr.official_name,
+    sr.date,
+    s.entity_id,
+    s.name,
+    s.position_number,
+    s.points
+FROM season_race sr
+JOIN (
+    SELECT rds.race_id, rds.driver_id AS entity_id, d.full_name AS name, rds.position_number, rds.points
+    FROM race_driver_standing rds
+    JOIN driver d ON d.id = rds.driver_id AND d.deleted_at IS NULL
+    WHERE %(entity_type)s = 'driver'
+      AND rds.race_id IN (SELECT id FROM season_race)
+    UNION ALL
+    SELECT rcs.race_id, rcs.constructor_id, c.name, rcs.position_number, rcs.points
+    FROM race_constructor_standing rcs
+    JOIN constructor c ON c.id = rcs.constructor_id AND c.deleted_at IS NULL
+    WHERE %(entity_type)s = 'constructor'
+      AND rcs.race_id IN (SELECT id FROM season_race)
+) s ON s.race_id = sr.id
+ORDER BY sr.round, s.position_number NULLS LAST, s.entity_id;
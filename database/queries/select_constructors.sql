@@ -27,4 +27,6 @@ WHERE
     (%(total_points_max)s IS NULL OR c.total_points <= %(total_points_max)s)
     AND
     (%(is_real)s IS NULL OR c.is_real = %(is_real)s)
+    AND
+    c.deleted_at IS NULL
 LIMIT %(limit)s OFFSET %(offset)s;
\ No newline at end of file
@@ -1,40 +1,17 @@
+-- The select list and joins are filled in from DRIVER_FIELDS in routes/drivers.py;
+-- filters only reference driver d so unused joins can be dropped
 SELECT
-    d.id,
-    d.name,
-    d.first_name,
-    d.last_name,
-    d.full_name,
-    d.abbreviation,
-    d.permanent_number,
-    d.gender,
-    d.date_of_birth,
-    d.date_of_death,
-    d.place_of_birth,
-
-    cb.name AS country_of_birth,
-    n.name AS nationality,
-
-    d.best_championship_position,
-    d.best_race_result,
-    d.total_championship_wins,
-    d.total_race_starts,
-    d.total_race_wins,
-    d.total_race_laps,
-    d.total_podiums,
-    d.total_points,
-    d.total_pole_positions,
-
-    d.is_real,
-
+    {columns},
     COUNT(*) OVER() AS full_count
 
 FROM driver d
-JOIN country cb ON cb.id = d.country_of_birth_country_id
-JOIN country n  ON n.id  = d.nationality_country_id
+{joins}
 
 WHERE
     (%(name)s IS NULL OR d.full_name ILIKE '%%' || %(name)s || '%%')
-    AND (%(nationality)s IS NULL OR n.name ILIKE '%%' || %(nationality)s || '%%')
+    AND (%(nationality)s IS NULL OR d.nationality_country_id IN (
+        SELECT id FROM country WHERE name ILIKE '%%' || %(nationality)s || '%%'
+    ))
     AND (%(place_of_birth)s IS NULL OR d.place_of_birth ILIKE '%%' || %(place_of_birth)s || '%%')
 
     AND (%(wins_min)s IS NULL OR d.total_race_wins >= %(wins_min)s)
@@ -47,4 +24,7 @@ WHERE
 
     AND (%(is_real)s IS NULL OR d.is_real = %(is_real)s)
 
+    -- tombstoned drivers are hidden while their deletion job runs
+    AND d.deleted_at IS NULL
+
 LIMIT %(limit)s OFFSET %(offset)s;
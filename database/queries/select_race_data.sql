@@ -21,8 +21,9 @@ FROM (
   FROM race_data
   ORDER BY race_id, driver_id, position_display_order NULLS LAST
 ) rd
-JOIN driver d ON rd.driver_id = d.id
-JOIN constructor c ON rd.constructor_id = c.id
+JOIN race r ON rd.race_id = r.id AND r.deleted_at IS NULL
+JOIN driver d ON rd.driver_id = d.id AND d.deleted_at IS NULL
+JOIN constructor c ON rd.constructor_id = c.id AND c.deleted_at IS NULL
 WHERE (%(race_id)s IS NULL OR rd.race_id = %(race_id)s)
   AND (%(is_real)s IS NULL OR rd.is_real = %(is_real)s)
 ORDER BY rd.race_points DESC NULLS LAST, rd.position_display_order NULLS LAST, rd.id
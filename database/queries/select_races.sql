@@ -1,31 +1,11 @@
-SELECT 
-    r.id,
-    r.circuit_id,
-    r.year,
-    r.round,
-    r.date,
-    r.official_name,
-    r.qualifying_format,
-    r.laps,
-    r.qualifying_date,
-    r.is_real,
-    c.full_name AS circuit_name,
-    co.name AS circuit_country,
-    c.place_name AS circuit_place_name,
-    c.length AS circuit_length,
-    c.turns AS circuit_turns,
-    c.type AS circuit_type,
-    c.direction AS circuit_direction,
-    c.total_races_held AS circuit_total_races,
-    c.latitude AS circuit_latitude,
-    c.longitude AS circuit_longitude,
+-- The select list and joins are filled in from RACE_FIELDS in routes/races.py;
+-- filters only reference race r so unused joins can be dropped
+SELECT
+    {columns},
     COUNT(*) OVER() as full_count
 FROM
     race r
-LEFT JOIN
-    circuit c ON r.circuit_id = c.id
-LEFT JOIN
-    country co ON c.country_id = co.id
+{joins}
 WHERE
     (%(year)s IS NULL OR r.year = %(year)s)
     AND
@@ -46,4 +26,6 @@ WHERE
     (%(qualifying_format)s IS NULL OR r.qualifying_format = %(qualifying_format)s)
     AND
     (%(is_real)s::boolean IS NULL OR r.is_real = %(is_real)s::boolean)
+    AND
+    r.deleted_at IS NULL
 LIMIT %(limit)s OFFSET %(offset)s;
@@ -0,0 +1,34 @@
+-- Track-type rankings read from the track_type_performance rollup (kept current by triggers, see schema.sql)
+-- Params: entity_type ('constructor' or 'driver'), track_type, year_from, year_to, limit
+WITH totals AS (
+    SELECT
+        p.entity_id,
+        SUM(p.races) AS total_races,
+        SUM(p.points) AS total_points,
+        MIN(p.best_position) AS best_position
+    FROM track_type_performance p
+    WHERE p.entity_type = %(entity_type)s
+      AND p.track_type = %(track_type)s
+      AND (%(year_from)s IS NULL OR p.year >= %(year_from)s)
+      AND (%(year_to)s IS NULL OR p.year <= %(year_to)s)
+    GROUP BY p.entity_id
+    -- Only include entries with points on this track type
+    HAVING SUM(p.points) > 0
+)
+SELECT
+    RANK() OVER (ORDER BY t.total_points DESC) AS rank_position,
+    t.entity_id,
+    COALESCE(c.name, d.name) AS name,
+    co.name AS nationality,
+    %(track_type)s AS track_type,
+    t.total_races,
+    t.total_points,
+    t.best_position
+FROM totals t
+LEFT JOIN constructor c ON %(entity_type)s = 'constructor' AND c.id = t.entity_id
+LEFT JOIN driver d ON %(entity_type)s = 'driver' AND d.id = t.entity_id
+LEFT JOIN country co ON co.id = COALESCE(c.country_id, d.nationality_country_id)
+-- Tombstoned entities stay in the rollup until their deletion job removes their results
+WHERE COALESCE(c.deleted_at, d.deleted_at) IS NULL
+ORDER BY t.total_points DESC
+LIMIT %(limit)s;
@@ -5,6 +5,12 @@
 -- ============================================
 
 -- Drop tables if they exist (for clean setup during development)
+DROP TABLE IF EXISTS deletion_job CASCADE;
+DROP TABLE IF EXISTS circuit_snapshot CASCADE;
+DROP TABLE IF EXISTS race_summary CASCADE;
+DROP TABLE IF EXISTS race_year_stats CASCADE;
+DROP TABLE IF EXISTS track_type_performance CASCADE;
+DROP TABLE IF EXISTS constructor_country_stats CASCADE;
 DROP TABLE IF EXISTS race_constructor_standing CASCADE;
 DROP TABLE IF EXISTS race_driver_standing CASCADE;
 DROP TABLE IF EXISTS race_data CASCADE;
@@ -36,7 +42,8 @@ CREATE TABLE "user" (
     email_verification_token VARCHAR(255),
     verification_sent_at TIMESTAMP,
     date_joined   TIMESTAMP    NOT NULL DEFAULT NOW(),
-    is_admin      BOOLEAN      NOT NULL DEFAULT FALSE
+    is_admin      BOOLEAN      NOT NULL DEFAULT FALSE,
+    deleted_at    TIMESTAMP                -- tombstone: set while a deletion job runs
 );
 
 CREATE INDEX user_username_idx ON "user"(username);
@@ -79,6 +86,7 @@ CREATE TABLE constructor (
     total_points                 DECIMAL(8,2)  NOT NULL,
     total_pole_positions         INTEGER       NOT NULL,
     is_real                      BOOLEAN       DEFAULT TRUE,
+    deleted_at                   TIMESTAMP,    -- tombstone: set while a deletion job runs
     PRIMARY KEY (id),
     FOREIGN KEY (country_id) REFERENCES country(id) ON DELETE CASCADE,
     FOREIGN KEY (user_id)    REFERENCES "user"(id) ON DELETE CASCADE
@@ -114,6 +122,7 @@ CREATE TABLE driver (
     total_pole_positions            INT          NOT NULL,
     is_real                         BOOLEAN      DEFAULT TRUE,
     user_id                         VARCHAR(100)  DEFAULT NULL,
+    deleted_at                      TIMESTAMP,   -- tombstone: set while a deletion job runs
 
     FOREIGN KEY (country_of_birth_country_id) REFERENCES country(id) ON DELETE CASCADE,
     FOREIGN KEY (nationality_country_id)      REFERENCES country(id) ON DELETE CASCADE,
@@ -139,6 +148,7 @@ CREATE TABLE race (
     qualifying_date      DATE,
     is_real              BOOLEAN      DEFAULT TRUE,
     user_id              VARCHAR(100)  DEFAULT NULL,
+    deleted_at           TIMESTAMP,   -- tombstone: set while a deletion job runs
 
     FOREIGN KEY (user_id)    REFERENCES "user"(id) ON DELETE CASCADE,
     UNIQUE (year, round)
@@ -176,6 +186,7 @@ CREATE INDEX rcda_race_id_idx                ON race_data(race_id);
 CREATE INDEX rcda_position_display_order_idx ON race_data(position_display_order);
 CREATE INDEX rcda_driver_id_idx              ON race_data(driver_id);
 CREATE INDEX rcda_constructor_id_idx         ON race_data(constructor_id);
+CREATE INDEX rcda_user_id_idx                ON race_data(user_id);
 
 
 -- Race driver standings
@@ -183,7 +194,7 @@ CREATE TABLE race_driver_standing (
     race_id             INT          NOT NULL,          
     driver_id           VARCHAR(100) NOT NULL,         
 
-    position_number     INT          NOT NULL,          
+    position_number     INT,                            -- NULL when excluded (e.g. 1997 Schumacher)
     points              DECIMAL(8,2) NOT NULL,          
 
     PRIMARY KEY (race_id, driver_id),
@@ -206,3 +217,388 @@ CREATE TABLE race_constructor_standing (
 );
 
 CREATE INDEX rcst_race_id_idx ON race_constructor_standing(race_id);
+CREATE INDEX rcst_constructor_id_idx ON race_constructor_standing(constructor_id);
+
+
+-- ============================================
+-- Rollups (maintained by triggers, read by the stats endpoints)
+-- ============================================
+
+-- Per-race participants, winner and pole sitter (rows only for races with results)
+CREATE TABLE race_summary (
+    race_id                 INT           PRIMARY KEY REFERENCES race(id) ON DELETE CASCADE,
+    participant_count       INT           NOT NULL,
+    winner_driver_id        VARCHAR(100)  REFERENCES driver(id) ON DELETE SET NULL,
+    winner_constructor_id   VARCHAR(100)  REFERENCES constructor(id) ON DELETE SET NULL,
+    pole_driver_id          VARCHAR(100)  REFERENCES driver(id) ON DELETE SET NULL,
+    refreshed_at            TIMESTAMP     NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX rsum_winner_driver_id_idx ON race_summary(winner_driver_id);
+
+-- Recompute the summary rows for the given races; the latest upload wins ties on position
+CREATE OR REPLACE FUNCTION refresh_race_summary(p_race_ids INT[]) RETURNS VOID AS $$
+BEGIN
+    DELETE FROM race_summary WHERE race_id = ANY(p_race_ids);
+
+    INSERT INTO race_summary (
+        race_id, participant_count, winner_driver_id, winner_constructor_id, pole_driver_id
+    )
+    SELECT
+        counts.race_id,
+        counts.participant_count,
+        winner.driver_id,
+        winner.constructor_id,
+        pole.driver_id
+    FROM (
+        SELECT rd.race_id, COUNT(*) AS participant_count
+        FROM race_data rd
+        WHERE rd.race_id = ANY(p_race_ids)
+        GROUP BY rd.race_id
+    ) counts
+    LEFT JOIN (
+        SELECT DISTINCT ON (rd.race_id) rd.race_id, rd.driver_id, rd.constructor_id
+        FROM race_data rd
+        WHERE rd.race_id = ANY(p_race_ids)
+        ORDER BY rd.race_id, rd.position_display_order, rd.created_at DESC, rd.id DESC
+    ) winner ON winner.race_id = counts.race_id
+    LEFT JOIN (
+        SELECT DISTINCT ON (rd.race_id) rd.race_id, rd.driver_id
+        FROM race_data rd
+        WHERE rd.race_id = ANY(p_race_ids)
+          AND (rd.race_pole_position OR rd.race_qualification_position_number = 1)
+        ORDER BY rd.race_id, rd.race_pole_position DESC NULLS LAST, rd.created_at DESC, rd.id DESC
+    ) pole ON pole.race_id = counts.race_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Yearly race statistics for /api/stats/races-by-year
+CREATE TABLE race_year_stats (
+    year                INT           PRIMARY KEY,
+    decade              INT           NOT NULL,
+    race_count          INT           NOT NULL,
+    avg_laps            DECIMAL(8,3)  NOT NULL,
+    sprint_races        INT           NOT NULL,
+    knockout_races      INT           NOT NULL,
+    one_session_races   INT           NOT NULL,
+    two_session_races   INT           NOT NULL,
+    four_laps_races     INT           NOT NULL,
+    aggregate_races     INT           NOT NULL,
+    circuits_used       INT           NOT NULL,
+    distinct_winners    INT           NOT NULL,
+    refreshed_at        TIMESTAMP     NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX rys_race_count_idx ON race_year_stats(race_count, year);
+CREATE INDEX rys_avg_laps_idx   ON race_year_stats(avg_laps, year);
+CREATE INDEX rys_decade_idx     ON race_year_stats(decade);
+
+-- Recompute the rollup rows for the given years (years without races are removed);
+-- tombstoning a race is an UPDATE, so its season is refreshed without it
+CREATE OR REPLACE FUNCTION refresh_race_year_stats(p_years INT[]) RETURNS VOID AS $$
+BEGIN
+    DELETE FROM race_year_stats WHERE year = ANY(p_years);
+
+    INSERT INTO race_year_stats (
+        year, decade, race_count, avg_laps,
+        sprint_races, knockout_races, one_session_races,
+        two_session_races, four_laps_races, aggregate_races,
+        circuits_used, distinct_winners
+    )
+    SELECT
+        r.year,
+        (r.year / 10) * 10,
+        COUNT(*),
+        ROUND(AVG(r.laps), 3),
+        COUNT(*) FILTER (WHERE r.qualifying_format = 'SPRINT_RACE'),
+        COUNT(*) FILTER (WHERE r.qualifying_format = 'KNOCKOUT'),
+        COUNT(*) FILTER (WHERE r.qualifying_format = 'ONE_SESSION'),
+        COUNT(*) FILTER (WHERE r.qualifying_format = 'TWO_SESSION'),
+        COUNT(*) FILTER (WHERE r.qualifying_format = 'FOUR_LAPS'),
+        COUNT(*) FILTER (WHERE r.qualifying_format = 'AGGREGATE'),
+        COUNT(DISTINCT r.circuit_id),
+        COALESCE(w.distinct_winners, 0)
+    FROM race r
+    LEFT JOIN (
+        SELECT wr.year, COUNT(DISTINCT rd.driver_id) AS distinct_winners
+        FROM race wr
+        JOIN race_data rd ON rd.race_id = wr.id
+        WHERE wr.year = ANY(p_years)
+          AND wr.deleted_at IS NULL
+          AND rd.position_display_order = 1
+        GROUP BY wr.year
+    ) w ON w.year = r.year
+    WHERE r.year = ANY(p_years)
+      AND r.deleted_at IS NULL
+    GROUP BY r.year, w.distinct_winners;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Track-type results per constructor / driver and season for /api/stats/track-performance
+CREATE TABLE track_type_performance (
+    entity_type     VARCHAR(11)   NOT NULL CHECK (entity_type IN ('constructor', 'driver')),
+    track_type      VARCHAR(6)    NOT NULL,
+    year            INT           NOT NULL,
+    entity_id       VARCHAR(100)  NOT NULL,
+    races           INT           NOT NULL,
+    points          DECIMAL(10,2) NOT NULL,
+    best_position   INT           NOT NULL,
+
+    PRIMARY KEY (entity_type, track_type, year, entity_id)
+);
+
+-- Recompute the track-type rows for the given seasons
+CREATE OR REPLACE FUNCTION refresh_track_type_performance(p_years INT[]) RETURNS VOID AS $$
+BEGIN
+    DELETE FROM track_type_performance WHERE year = ANY(p_years);
+
+    INSERT INTO track_type_performance (
+        entity_type, track_type, year, entity_id, races, points, best_position
+    )
+    SELECT
+        'constructor', UPPER(cir.type), r.year, rd.constructor_id,
+        COUNT(DISTINCT r.id),
+        SUM(COALESCE(rd.race_points, 0)),
+        MIN(rd.position_display_order)
+    FROM race_data rd
+    JOIN race r ON r.id = rd.race_id
+    JOIN circuit cir ON cir.id = r.circuit_id
+    WHERE r.year = ANY(p_years)
+      AND r.deleted_at IS NULL
+    GROUP BY UPPER(cir.type), r.year, rd.constructor_id
+    UNION ALL
+    SELECT
+        'driver', UPPER(cir.type), r.year, rd.driver_id,
+        COUNT(DISTINCT r.id),
+        SUM(COALESCE(rd.race_points, 0)),
+        MIN(rd.position_display_order)
+    FROM race_data rd
+    JOIN race r ON r.id = rd.race_id
+    JOIN circuit cir ON cir.id = r.circuit_id
+    WHERE r.year = ANY(p_years)
+      AND r.deleted_at IS NULL
+    GROUP BY UPPER(cir.type), r.year, rd.driver_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Serialized /api/circuits/<id> responses. Writes bump version and clear payload;
+-- the app only stores a rebuilt payload if version is unchanged since it started building.
+CREATE TABLE circuit_snapshot (
+    circuit_id   VARCHAR(100)  PRIMARY KEY REFERENCES circuit(id) ON DELETE CASCADE,
+    version      BIGINT        NOT NULL DEFAULT 0,
+    payload      BYTEA,                             -- NULL until rebuilt
+    built_at     TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION invalidate_circuit_snapshots(p_circuit_ids VARCHAR[]) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO circuit_snapshot (circuit_id, version)
+    SELECT c.id, 1 FROM circuit c WHERE c.id = ANY(p_circuit_ids)
+    ON CONFLICT (circuit_id) DO UPDATE
+        SET version = circuit_snapshot.version + 1, payload = NULL, built_at = NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Driver and constructor names / countries feed every circuit page (winners, home counts)
+CREATE OR REPLACE FUNCTION invalidate_all_circuit_snapshots() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE circuit_snapshot
+    SET version = version + 1, payload = NULL, built_at = NULL;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Every rollup keyed by season
+CREATE OR REPLACE FUNCTION refresh_race_rollups(p_years INT[]) RETURNS VOID AS $$
+BEGIN
+    PERFORM refresh_race_year_stats(p_years);
+    PERFORM refresh_track_type_performance(p_years);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level triggers: one refresh per statement, scoped to the touched years
+CREATE OR REPLACE FUNCTION race_rollups_on_race() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_race_rollups(ARRAY(SELECT DISTINCT year FROM new_rows));
+        PERFORM invalidate_circuit_snapshots(ARRAY(SELECT DISTINCT circuit_id FROM new_rows));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM refresh_race_rollups(ARRAY(
+            SELECT year FROM new_rows UNION SELECT year FROM old_rows
+        ));
+        PERFORM invalidate_circuit_snapshots(ARRAY(
+            SELECT circuit_id FROM new_rows UNION SELECT circuit_id FROM old_rows
+        ));
+    ELSE
+        PERFORM refresh_race_rollups(ARRAY(SELECT DISTINCT year FROM old_rows));
+        PERFORM invalidate_circuit_snapshots(ARRAY(SELECT DISTINCT circuit_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Races removed by a cascading race delete are already gone here; race_rollups_on_race covers them
+CREATE OR REPLACE FUNCTION race_rollups_on_race_data() RETURNS TRIGGER AS $$
+DECLARE
+    v_race_ids INT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        v_race_ids := ARRAY(SELECT DISTINCT race_id FROM new_rows);
+    ELSIF TG_OP = 'UPDATE' THEN
+        v_race_ids := ARRAY(SELECT race_id FROM new_rows UNION SELECT race_id FROM old_rows);
+    ELSE
+        v_race_ids := ARRAY(SELECT DISTINCT race_id FROM old_rows);
+    END IF;
+
+    PERFORM refresh_race_summary(v_race_ids);
+    PERFORM refresh_race_rollups(ARRAY(
+        SELECT DISTINCT r.year FROM race r WHERE r.id = ANY(v_race_ids)
+    ));
+    PERFORM invalidate_circuit_snapshots(ARRAY(
+        SELECT DISTINCT r.circuit_id FROM race r WHERE r.id = ANY(v_race_ids)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A circuit changing type moves every race held there; any change invalidates its page
+CREATE OR REPLACE FUNCTION race_rollups_on_circuit() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_race_rollups(ARRAY(
+        SELECT DISTINCT r.year FROM race r
+        WHERE r.circuit_id IN (
+            SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.type IS DISTINCT FROM o.type
+        )
+    ));
+    PERFORM invalidate_circuit_snapshots(ARRAY(SELECT id FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER race_rollups_race_ins AFTER INSERT ON race
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION race_rollups_on_race();
+CREATE TRIGGER race_rollups_race_upd AFTER UPDATE ON race
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION race_rollups_on_race();
+CREATE TRIGGER race_rollups_race_del AFTER DELETE ON race
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION race_rollups_on_race();
+
+CREATE TRIGGER race_rollups_race_data_ins AFTER INSERT ON race_data
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION race_rollups_on_race_data();
+CREATE TRIGGER race_rollups_race_data_upd AFTER UPDATE ON race_data
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION race_rollups_on_race_data();
+CREATE TRIGGER race_rollups_race_data_del AFTER DELETE ON race_data
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION race_rollups_on_race_data();
+
+CREATE TRIGGER race_rollups_circuit_upd AFTER UPDATE ON circuit
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION race_rollups_on_circuit();
+
+CREATE TRIGGER circuit_snapshot_driver_write AFTER INSERT OR UPDATE OR DELETE ON driver
+    FOR EACH STATEMENT EXECUTE FUNCTION invalidate_all_circuit_snapshots();
+CREATE TRIGGER circuit_snapshot_constructor_write AFTER INSERT OR UPDATE OR DELETE ON constructor
+    FOR EACH STATEMENT EXECUTE FUNCTION invalidate_all_circuit_snapshots();
+
+-- Backfill for databases that already hold races:
+--   SELECT refresh_race_summary(ARRAY(SELECT DISTINCT race_id FROM race_data));
+--   SELECT refresh_race_rollups(ARRAY(SELECT DISTINCT year FROM race));
+
+
+-- Per-country constructor points distribution for /api/constructors?above_avg=true
+CREATE TABLE constructor_country_stats (
+    country_id          VARCHAR(100)  PRIMARY KEY REFERENCES country(id) ON DELETE CASCADE,
+    constructor_count   INT           NOT NULL,
+    avg_points          DECIMAL(12,4) NOT NULL,
+    median_points       DECIMAL(12,4) NOT NULL,
+    p75_points          DECIMAL(12,4) NOT NULL,
+    p90_points          DECIMAL(12,4) NOT NULL,
+    stddev_points       DECIMAL(12,4),                  -- NULL for single-constructor countries
+    refreshed_at        TIMESTAMP     NOT NULL DEFAULT NOW()
+);
+
+-- Recompute the stats rows for the given countries (countries without constructors are removed)
+CREATE OR REPLACE FUNCTION refresh_constructor_country_stats(p_countries VARCHAR[]) RETURNS VOID AS $$
+BEGIN
+    DELETE FROM constructor_country_stats WHERE country_id = ANY(p_countries);
+
+    INSERT INTO constructor_country_stats (
+        country_id, constructor_count, avg_points, median_points,
+        p75_points, p90_points, stddev_points
+    )
+    SELECT
+        c.country_id,
+        COUNT(*),
+        AVG(c.total_points),
+        percentile_cont(0.5)  WITHIN GROUP (ORDER BY c.total_points),
+        percentile_cont(0.75) WITHIN GROUP (ORDER BY c.total_points),
+        percentile_cont(0.9)  WITHIN GROUP (ORDER BY c.total_points),
+        STDDEV_SAMP(c.total_points)
+    FROM constructor c
+    WHERE c.country_id = ANY(p_countries)
+      AND c.deleted_at IS NULL
+    GROUP BY c.country_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION constructor_country_stats_on_constructor() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_constructor_country_stats(ARRAY(SELECT DISTINCT country_id FROM new_rows));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM refresh_constructor_country_stats(ARRAY(
+            SELECT country_id FROM new_rows UNION SELECT country_id FROM old_rows
+        ));
+    ELSE
+        PERFORM refresh_constructor_country_stats(ARRAY(SELECT DISTINCT country_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER constructor_country_stats_ins AFTER INSERT ON constructor
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION constructor_country_stats_on_constructor();
+CREATE TRIGGER constructor_country_stats_upd AFTER UPDATE ON constructor
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION constructor_country_stats_on_constructor();
+CREATE TRIGGER constructor_country_stats_del AFTER DELETE ON constructor
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION constructor_country_stats_on_constructor();
+
+-- Backfill for databases that already hold constructors:
+--   SELECT refresh_constructor_country_stats(ARRAY(SELECT DISTINCT country_id FROM constructor));
+
+
+-- ============================================
+-- Background deletion jobs
+-- ============================================
+-- Deleting a user, driver, constructor or race sets its deleted_at tombstone and
+-- queues a job here. A worker (app/deletion_jobs.py) then removes dependent rows in
+-- small batches, pausing between them, and finally deletes the entity itself.
+CREATE TABLE deletion_job (
+    id             SERIAL        PRIMARY KEY,
+    entity_type    VARCHAR(20)   NOT NULL CHECK (entity_type IN ('user', 'driver', 'constructor', 'race')),
+    entity_id      VARCHAR(100)  NOT NULL,
+    requested_by   VARCHAR(100),              -- no FK: the job outlives a deleted account
+    status         VARCHAR(20)   NOT NULL DEFAULT 'queued'
+                                 CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    rows_deleted   INT           NOT NULL DEFAULT 0,
+    attempts       INT           NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP,               -- a failed attempt is retried after a backoff
+    error          TEXT,
+    created_at     TIMESTAMP     NOT NULL DEFAULT NOW(),
+    started_at     TIMESTAMP,
+    updated_at     TIMESTAMP,                 -- bumped after every batch (stale-job detection)
+    finished_at    TIMESTAMP
+);
+
+-- One open job per entity; the worker claims the oldest queued job first
+CREATE UNIQUE INDEX deletion_job_open_idx ON deletion_job(entity_type, entity_id)
+    WHERE status IN ('queued', 'running');
+CREATE INDEX deletion_job_queue_idx ON deletion_job(created_at) WHERE status = 'queued';